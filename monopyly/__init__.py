@@ -21,9 +21,10 @@ def create_app(config=None):
     # Create and configure the app
     app = DryFlask(__name__, app_name="Monopyly")
     app.configure(config)
-    # Register blueprints and error handlers specific to this app
+    # Register blueprints, error handlers, and commands specific to this app
     register_blueprints(app)
     register_errorhandlers(app)
+    register_commands(app)
     return app
 
 
@@ -68,6 +69,21 @@ def register_errorhandlers(app):
         app.register_error_handler(code, render_error_template)
 
 
+def register_commands(app):
+    """Register command line interface commands with the app."""
+    from monopyly.core.internal_transactions import (
+        link_transfers_command,
+        run_transfer_linking_command,
+    )
+    from monopyly.core.rollups import rebuild_rollups_command
+    from monopyly.database.migrations import migrate_db_command
+
+    app.cli.add_command(migrate_db_command)
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(link_transfers_command)
+    app.cli.add_command(run_transfer_linking_command)
+
+
 def main():
     """The entry point to the Monopyly application."""
     interact(__name__)
@@ -1,6 +1,10 @@
 """Module describing logical authorization actions (to be used in routes)."""
 
-from flask import current_app
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import current_app, session
 from sqlalchemy import select
 
 from ..database.models import User
@@ -23,3 +27,97 @@ def identify_user(username):
     user_query = select(User).where(User.username == username)
     user = current_app.db.session.scalar(user_query)
     return user
+
+
+class UserCache:
+    """
+    A least-recently-used (LRU) cache of users for the current process.
+
+    Users are stored (detached from any database session) alongside a
+    stamp identifying their current password and the version of their
+    data. An entry is recognized as outdated when a session was
+    established (or updated) using a different password, or when the
+    user's data (including the password) has since been changed by any
+    process.
+
+    Parameters
+    ----------
+    max_size : int
+        The maximum number of users to keep in the cache. The default
+        is 128.
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._users)
+
+    def get(self, user_id, password_stamp, data_version):
+        """
+        Get a user from the cache.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user to get.
+        password_stamp : str
+            The stamp identifying the user's current password.
+        data_version : int
+            The current version of the user's data.
+
+        Returns
+        -------
+        user : database.models.User
+            The cached user, or `None` if the user is not cached (or
+            was cached with a different password or data version).
+        """
+        with self._lock:
+            user, stamp, version = self._users.get(user_id, (None, None, None))
+            if user is None or (stamp, version) != (password_stamp, data_version):
+                return None
+            self._users.move_to_end(user_id)
+            return user
+
+    def add(self, user, data_version):
+        """Add a (detached) user to the cache, given their data version."""
+        with self._lock:
+            self._users[user.id] = (user, get_password_stamp(user), data_version)
+            self._users.move_to_end(user.id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def discard(self, user_id):
+        """Remove a user from the cache (if present)."""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+
+def get_user_cache():
+    """Get the user cache for the current app (creating it if necessary)."""
+    extensions = current_app.extensions
+    if "user_cache" not in extensions:
+        max_size = current_app.config.get("USER_CACHE_SIZE", 128)
+        extensions["user_cache"] = UserCache(max_size=max_size)
+    return extensions["user_cache"]
+
+
+def get_password_stamp(user):
+    """Get a stamp identifying the user's current password (hash)."""
+    return hashlib.sha256(user.password.encode()).hexdigest()[:16]
+
+
+def remember_user(user):
+    """
+    Record the authenticated user in the (signed) session.
+
+    Parameters
+    ----------
+    user : database.models.User
+        The user to be recorded as logged in.
+    """
+    session["user_id"] = user.id
+    session["password_stamp"] = get_password_stamp(user)
+    get_user_cache().discard(user.id)
@@ -16,7 +16,7 @@ from flask import (
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from ..database.models import User
-from .actions import get_username_and_password, identify_user
+from .actions import get_username_and_password, identify_user, remember_user
 from .blueprint import bp
 
 
@@ -61,7 +61,7 @@ def login():
         else:
             # Set the user ID securely for a new session
             session.clear()
-            session["user_id"] = user.id
+            remember_user(user)
             return redirect(url_for("core.index"))
         flash(error)
     # Display the login page
@@ -85,6 +85,7 @@ def change_password():
             # Merge the user item (dissociated from the current session) for updating
             g.user = current_app.db.session.merge(g.user)
             g.user.password = generate_password_hash(new_password)
+            remember_user(g.user)
             flash("Password updated successfully.", category="success")
             return redirect(url_for("core.load_profile"))
         else:
@@ -7,7 +7,9 @@ import functools
 from flask import current_app, g, redirect, session, url_for
 from sqlalchemy import select
 
+from ..common.cache import DataVersionHandler
 from ..database.models import User
+from .actions import get_password_stamp, get_user_cache, remember_user
 from .blueprint import bp
 
 
@@ -16,10 +18,36 @@ def load_logged_in_user():
     # Match the user's information with the session
     if (user_id := session.get("user_id")) is None:
         g.user = None
+        return
+    user_cache = get_user_cache()
+    password_stamp = session.get("password_stamp")
+    # Users are cached with their data version, which changes with any write
+    # (e.g., a password change) made in any process
+    with current_app.db.session:
+        data_version = DataVersionHandler.get_version(user_id)
+    if (user := user_cache.get(user_id, password_stamp, data_version)) is None:
+        g.user = _load_user(user_id, password_stamp)
+        if g.user:
+            user_cache.add(g.user, data_version)
     else:
-        query = select(User).where(User.id == user_id)
-        with current_app.db.session as db_session:
-            g.user = db_session.scalar(query)
+        g.user = user
+
+
+def _load_user(user_id, password_stamp):
+    query = select(User).where(User.id == user_id)
+    # Load the user in a separate session context (leaving the user detached)
+    with current_app.db.session as db_session:
+        user = db_session.scalar(query)
+    if user is None:
+        return None
+    if password_stamp is None:
+        # Sessions established before password stamps were recorded
+        remember_user(user)
+    elif password_stamp != get_password_stamp(user):
+        # The password was changed since the session was established
+        session.clear()
+        return None
+    return user
 
 
 def login_required(view):
@@ -2,18 +2,25 @@
 Tools for interacting with bank accounts in the database.
 """
 
+import datetime
+
 import sqlalchemy.sql.functions as sql_func
-from dry_foundation.database.handler import DatabaseViewHandler
 from flask import abort
 
+from ..common.cache import DataVersionHandler
 from ..common.forms.utils import execute_on_form_validation
+from ..database.handler import DatabaseViewHandler
 from ..database.models import (
     Bank,
     BankAccount,
     BankAccountType,
     BankAccountTypeView,
     BankAccountView,
+    BankSubtransaction,
+    BankTransaction,
 )
+from .balances import BalanceIndex
+from .transactions import BankTransactionHandler
 
 
 class BankAccountTypeHandler(
@@ -111,6 +118,9 @@ class BankAccountTypeHandler(
         entry_id : int
             The ID of the account type to be deleted.
         """
+        BankTransactionHandler.update_spending_rollups(
+            [BankAccount.account_type_id == entry_id], remove=True
+        )
         super().delete_entry(entry_id)
 
     @classmethod
@@ -186,6 +196,85 @@ class BankAccountHandler(
             abort(404, abort_msg)
         return balance
 
+    @classmethod
+    def get_balance_index(cls, account_ids=None):
+        """
+        Get an index of the combined daily balances of bank accounts.
+
+        Parameters
+        ----------
+        account_ids : tuple of int, optional
+            A sequence of bank account IDs for which balances will be
+            combined (if `None`, all of the user's accounts will be
+            included).
+
+        Returns
+        -------
+        balance_index : BalanceIndex
+            An index of the accounts' combined balance on each date
+            that the balance changed.
+
+        Notes
+        -----
+        The index is built from the transaction history with a single
+        query and then reused until the user's data next changes (as
+        indicated by the version of the user's data), so that balances
+        on individual dates are found by binary search alone. Indexes
+        are kept for each combination of accounts requested, subject to
+        the bound on the number of values the database caches.
+        """
+        if account_ids is not None:
+            account_ids = tuple(sorted(set(account_ids)))
+        key = (
+            "balance_index",
+            cls.user_id,
+            DataVersionHandler.get_version(),
+            account_ids,
+        )
+        return cls._db.cache_until_write(
+            key, lambda: cls._build_balance_index(account_ids)
+        )
+
+    @classmethod
+    def _build_balance_index(cls, account_ids):
+        transaction_date = BankTransaction.transaction_date
+        query = (
+            cls._model.select_for_user(
+                transaction_date, sql_func.sum(BankSubtransaction.subtotal)
+            )
+            .join(BankTransaction, BankTransaction.account_id == cls._model.id)
+            .join(
+                BankSubtransaction,
+                BankSubtransaction.transaction_id == BankTransaction.id,
+            )
+            .group_by(transaction_date)
+            .order_by(transaction_date)
+        )
+        if account_ids is not None:
+            query = query.where(cls._model.id.in_(account_ids))
+        return BalanceIndex(cls._db.session.execute(query))
+
+    @classmethod
+    def get_balance(cls, account_id, on_date=None):
+        """
+        Get the balance of a bank account on a given date.
+
+        Parameters
+        ----------
+        account_id : int
+            The ID of the account for which to get the balance.
+        on_date : datetime.date, optional
+            The date on which to determine the balance (after all
+            transactions on that date). The default is the current date.
+
+        Returns
+        -------
+        balance : Money
+            The balance of the account on the given date.
+        """
+        balance_index = cls.get_balance_index(account_ids=(account_id,))
+        return balance_index.balance_at(on_date or datetime.date.today())
+
     @classmethod
     @DatabaseViewHandler.view_query
     def find_account(
@@ -248,6 +337,9 @@ class BankAccountHandler(
         entry_id : int
             The ID of the account to be deleted.
         """
+        BankTransactionHandler.update_spending_rollups(
+            [BankAccount.id == entry_id], remove=True
+        )
         super().delete_entry(entry_id)
 
 
@@ -1,6 +1,7 @@
 """Module describing logical banking actions (to be used in routes)."""
 
 from collections import UserDict, namedtuple
+from functools import partial
 
 from ..common.utils import convert_date_to_midnight_timestamp
 from .accounts import BankAccountHandler, BankAccountTypeHandler
@@ -19,7 +20,7 @@ def get_bank_account_type_grouping(bank):
     return type_accounts
 
 
-def get_balance_chart_data(transactions):
+def get_balance_chart_data(transactions, max_points=None):
     """
     Build a dataset to be passed to a `chartist.js` chart constructor.
 
@@ -27,6 +28,11 @@ def get_balance_chart_data(transactions):
     ----------
     transactions : list
         A list of transactions to be used for generating the chart data.
+    max_points : int, optional
+        The maximum number of points to include in the chart data. If
+        the transactions would produce more points than this budget,
+        the data is downsampled. If `None` (the default), every
+        transaction is represented in the chart data.
 
     Returns
     -------
@@ -35,7 +41,7 @@ def get_balance_chart_data(transactions):
         including (x, y) pairs that each represent the Unix
         timestamp (in milliseconds) and the bank account balance.
     """
-    return _BalanceChartData(transactions).data
+    return _BalanceChartData(transactions, max_points=max_points).data
 
 
 class _BalanceChartData(UserDict):
@@ -51,19 +57,36 @@ class _BalanceChartData(UserDict):
     offset is added to each timestamp to guarantee a smooth
     representation in the rendered chart.
 
+    When a point budget is given and the transactions exceed it, the
+    data is downsampled according to the range of dates it spans. The
+    balance at the end of each day, week, or month is used for the
+    finest of those periods that fits within the budget; if even the
+    monthly balances exceed the budget, the points are instead selected
+    using the largest-triangle-three-buckets (LTTB) algorithm, which
+    preserves the visual shape of the balance history.
+
     Parameters
     ----------
     transactions : list
         A list of transactions to be used for generating the chart data.
+    max_points : int, optional
+        The maximum number of points to include in the chart data.
     """
 
     _DAILY_MILLISECONDS = 86_400_000
+    _PERIOD_KEYS = {
+        "day": lambda date: date,
+        "week": lambda date: date.isocalendar()[:2],
+        "month": lambda date: (date.year, date.month),
+    }
     offset = 1
     point = namedtuple("DataPoint", ["timestamp", "balance"])
 
-    def __init__(self, transactions):
+    def __init__(self, transactions, max_points=None):
         transaction_groups = self._group_transactions_by_date(transactions)
         chart_data = self._prepare_chart_data(transaction_groups)
+        if max_points is not None and len(chart_data) > max_points:
+            chart_data = self._downsample(chart_data, transaction_groups, max_points)
         super().__init__({"series": [{"name": "balances", "data": chart_data}]})
 
     @staticmethod
@@ -86,3 +109,61 @@ class _BalanceChartData(UserDict):
                 adjusted_timestamp = base_timestamp + (i * offset)
                 chart_data.append({"x": adjusted_timestamp, "y": transaction.balance})
         return chart_data
+
+    def _downsample(self, chart_data, transaction_groups, max_points):
+        # Use the final balance for the finest period that fits within the budget
+        transaction_dates = [
+            transaction_date
+            for transaction_date, transaction_group in transaction_groups.items()
+            for _ in transaction_group
+        ]
+        for period_key in self._PERIOD_KEYS.values():
+            period_data = self._aggregate(chart_data, transaction_dates, period_key)
+            if len(period_data) <= max_points:
+                return period_data
+        return self._select_lttb_points(chart_data, max_points)
+
+    @staticmethod
+    def _aggregate(chart_data, transaction_dates, period_key):
+        # Keep only the last point (the closing balance) of each period
+        period_points = {}
+        for point, transaction_date in zip(chart_data, transaction_dates, strict=True):
+            period_points[period_key(transaction_date)] = point
+        return list(period_points.values())
+
+    @staticmethod
+    def _select_lttb_points(chart_data, max_points):
+        # Always keep the endpoints, choosing remaining points from evenly sized
+        # buckets to form the largest triangle with their neighbors
+        if max_points < 3:
+            return [chart_data[0], chart_data[-1]][:max_points]
+        selected_points = [chart_data[0]]
+        bucket_size = (len(chart_data) - 2) / (max_points - 2)
+        for i in range(max_points - 2):
+            bucket_start = int(i * bucket_size) + 1
+            bucket_end = int((i + 1) * bucket_size) + 1
+            # The next bucket is represented by its average point
+            next_bucket = chart_data[bucket_end : int((i + 2) * bucket_size) + 1]
+            next_bucket = next_bucket or chart_data[-1:]
+            next_point = {
+                "x": sum(point["x"] for point in next_bucket) / len(next_bucket),
+                "y": sum(point["y"] for point in next_bucket) / len(next_bucket),
+            }
+            triangle_area = partial(
+                _BalanceChartData._triangle_area,
+                previous_point=selected_points[-1],
+                next_point=next_point,
+            )
+            bucket = chart_data[bucket_start:bucket_end]
+            selected_points.append(max(bucket, key=triangle_area))
+        selected_points.append(chart_data[-1])
+        return selected_points
+
+    @staticmethod
+    def _triangle_area(point, previous_point, next_point):
+        # Compute (twice) the area of the triangle formed by the three points
+        return abs(
+            (previous_point["x"] - next_point["x"]) * (point["y"] - previous_point["y"])
+            - (previous_point["x"] - point["x"])
+            * (next_point["y"] - previous_point["y"])
+        )
@@ -0,0 +1,102 @@
+"""
+Tools for determining bank account balances at points in time.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date
+
+from ..common.money import Money
+
+DailyBalance = namedtuple("DailyBalance", ["transaction_date", "balance"])
+
+
+class BalanceIndex:
+    """
+    An index of the cumulative daily balance of one or more bank accounts.
+
+    The index stores a running (prefix) sum of the net transaction
+    totals on each day that the balance changed, using compact arrays of
+    date ordinals and balances (in cents). Balances on any date (or
+    over any range of dates) are then found by binary search, without
+    requiring the full transaction history to be reevaluated.
+
+    Parameters
+    ----------
+    daily_totals : iterable
+        An iterable of `(date, total)` pairs, sorted by date, giving the
+        net total of all transactions occurring on that date.
+    """
+
+    def __init__(self, daily_totals):
+        self._ordinals = array("l")
+        self._balances = array("q")
+        balance = 0
+        for transaction_date, total in daily_totals:
+            balance += Money(total).cents
+            self._ordinals.append(transaction_date.toordinal())
+            self._balances.append(balance)
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def balance_at(self, on_date):
+        """
+        Get the balance at the end of the given date.
+
+        Parameters
+        ----------
+        on_date : datetime.date
+            The date on which to determine the balance.
+
+        Returns
+        -------
+        balance : Money
+            The balance after all transactions on (or before) the date.
+        """
+        index = bisect_right(self._ordinals, on_date.toordinal())
+        return self._get_balance(index - 1)
+
+    def balances_between(self, start_date=None, end_date=None):
+        """
+        Get the daily balances over a range of dates.
+
+        Parameters
+        ----------
+        start_date, end_date : datetime.date, optional
+            The earliest and latest dates (inclusive) for which to get
+            balances. If `None`, the range is unbounded on that side.
+
+        Returns
+        -------
+        balances : list of DailyBalance
+            The balance on each date in the range where the balance
+            changed, preceded by the opening balance on the start date
+            (if the balance did not change that day).
+        """
+        if start_date is None:
+            start_index = 0
+        else:
+            start_index = bisect_left(self._ordinals, start_date.toordinal())
+        if end_date is None:
+            end_index = len(self)
+        else:
+            end_index = bisect_right(self._ordinals, end_date.toordinal())
+        balances = [self._get_daily_balance(i) for i in range(start_index, end_index)]
+        # Include the opening balance when the range starts between changes
+        starts_between_changes = start_index > 0 and (
+            start_index == len(self)
+            or self._ordinals[start_index] != start_date.toordinal()
+        )
+        if starts_between_changes and start_date <= (end_date or start_date):
+            balances.insert(0, DailyBalance(start_date, self.balance_at(start_date)))
+        return balances
+
+    def _get_balance(self, index):
+        cents = self._balances[index] if index >= 0 else 0
+        return Money.from_cents(cents)
+
+    def _get_daily_balance(self, index):
+        transaction_date = date.fromordinal(self._ordinals[index])
+        return DailyBalance(transaction_date, self._get_balance(index))
@@ -2,9 +2,10 @@
 Tools for interacting with banks in the database.
 """
 
-from dry_foundation.database.handler import DatabaseHandler
-
+from ..credit.transactions import CreditTransactionHandler
+from ..database.handler import DatabaseHandler
 from ..database.models import Bank
+from .transactions import BankTransactionHandler
 
 
 class BankHandler(DatabaseHandler, model=Bank):
@@ -59,4 +60,8 @@ class BankHandler(DatabaseHandler, model=Bank):
         entry_id : int
             The ID of the bank to be deleted.
         """
+        for transaction_handler in (BankTransactionHandler, CreditTransactionHandler):
+            transaction_handler.update_spending_rollups(
+                [Bank.id == entry_id], remove=True
+            )
         super().delete_entry(entry_id)
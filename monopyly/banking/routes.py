@@ -2,11 +2,17 @@
 Routes for banking financials.
 """
 
+from datetime import date
+
 from dry_foundation.database import db_transaction
 from flask import g, jsonify, redirect, render_template, request, url_for
 
 from ..auth.tools import login_required
-from ..common.forms.utils import extend_field_list_for_ajax
+from ..common.cache import conditional_on_data_version, render_cached_fragment
+from ..common.forms.utils import (
+    get_autocomplete_search_args,
+    render_field_list_extension,
+)
 from ..common.transactions import get_linked_transaction
 from .accounts import BankAccountHandler, BankAccountTypeHandler, save_account
 from .actions import get_balance_chart_data, get_bank_account_type_grouping
@@ -17,6 +23,8 @@ from .transactions import BankTagHandler, BankTransactionHandler, save_transacti
 
 # Set a limit on the number of transactions loaded at one time for certain routes
 TRANSACTION_LIMIT = 100
+# Set a limit on the number of points shown in a balance chart
+BALANCE_CHART_POINT_LIMIT = 250
 
 
 @bp.route("/accounts")
@@ -56,15 +64,22 @@ def delete_account(account_id):
 
 @bp.route("/account_summaries/<int:bank_id>")
 @login_required
+@conditional_on_data_version
 def load_account_summaries(bank_id):
     bank = BankHandler.get_entry(bank_id)
     bank_balance = BankAccountHandler.get_bank_balance(bank_id)
-    type_accounts = get_bank_account_type_grouping(bank)
+
+    def get_context():
+        return {"type_accounts": get_bank_account_type_grouping(bank)}
+
+    account_summaries = render_cached_fragment(
+        "banking/account_summaries.html", [bank_id], get_context
+    )
     return render_template(
         "banking/account_summaries_page.html",
         bank=bank,
         bank_balance=bank_balance,
-        type_accounts=type_accounts,
+        account_summaries=account_summaries,
     )
 
 
@@ -81,11 +96,61 @@ def load_account_details(account_id):
         account=account,
         transactions=transactions[:100],
         total_transactions=len(transactions),
-        # Reverse the chart transactions to be chronologically ascending
-        chart_data=get_balance_chart_data(reversed(transactions)),
     )
 
 
+@bp.route("/_balance_chart_data/<int:account_id>")
+@login_required
+def load_balance_chart_data(account_id):
+    # Ensure that the account exists and belongs to the user
+    BankAccountHandler.get_entry(account_id)
+    # Get the (optional) date range and point budget from the request arguments
+    start_date = request.args.get("start", type=date.fromisoformat)
+    end_date = request.args.get("end", type=date.fromisoformat)
+    max_points = _get_chart_point_budget()
+    transactions = BankTransactionHandler.get_transactions(
+        account_ids=(account_id,), sort_order="ASC"
+    )
+    # Balances depend on the full history, so limit the date range after the query
+    transactions = [
+        transaction
+        for transaction in transactions
+        if (start_date is None or transaction.transaction_date >= start_date)
+        and (end_date is None or transaction.transaction_date <= end_date)
+    ]
+    chart_data = get_balance_chart_data(transactions, max_points=max_points)
+    return jsonify(chart_data)
+
+
+def _get_chart_point_budget():
+    # Keep enough points to draw a line, but no more than the chart limit
+    max_points = request.args.get("points", BALANCE_CHART_POINT_LIMIT, type=int)
+    return max(2, min(max_points, BALANCE_CHART_POINT_LIMIT))
+
+
+@bp.route("/_account_balance/<int:account_id>")
+@login_required
+def load_account_balance(account_id):
+    # Ensure that the account exists and belongs to the user
+    BankAccountHandler.get_entry(account_id)
+    on_date = request.args.get("date", date.today(), type=date.fromisoformat)
+    balance = BankAccountHandler.get_balance(account_id, on_date=on_date)
+    return jsonify({"date": on_date.isoformat(), "balance": balance})
+
+
+@bp.route("/_bank_balance_chart_data")
+@login_required
+def load_bank_balance_chart_data():
+    # Get the (optional) date range and point budget from the request arguments
+    start_date = request.args.get("start", type=date.fromisoformat)
+    end_date = request.args.get("end", type=date.fromisoformat)
+    max_points = _get_chart_point_budget()
+    balance_index = BankAccountHandler.get_balance_index()
+    balances = balance_index.balances_between(start_date, end_date)
+    chart_data = get_balance_chart_data(balances, max_points=max_points)
+    return jsonify(chart_data)
+
+
 @bp.route("/_extra_transactions", methods=("POST",))
 @login_required
 def load_more_transactions():
@@ -110,10 +175,15 @@ def load_more_transactions():
 def expand_transaction():
     # Get the transaction ID from the AJAX request
     transaction_id = int(request.get_json())
-    transaction = BankTransactionHandler.get_entry(transaction_id)
-    return render_template(
+
+    def get_context():
+        transaction = BankTransactionHandler.get_entry(transaction_id)
+        return {"subtransactions": transaction.subtransactions}
+
+    return render_cached_fragment(
         "common/transactions_table/subtransactions.html",
-        subtransactions=transaction.subtransactions,
+        ["bank", transaction_id],
+        get_context,
     )
 
 
@@ -198,14 +268,11 @@ def add_subtransaction_fields():
     post_args = request.get_json()
     subtransaction_count = int(post_args["subtransaction_count"])
     # Add a new subtransaction to the form
-    new_subform = extend_field_list_for_ajax(
+    return render_field_list_extension(
         BankTransactionForm,
         "subtransactions",
         subtransaction_count,
-    )
-    return render_template(
         "common/transaction_form/subtransaction_subform.html",
-        subform=new_subform,
         field_list_optional_member=True,
     )
 
@@ -214,14 +281,11 @@ def add_subtransaction_fields():
 @login_required
 def add_transfer_field():
     # Add a new transfer field to the form
-    new_subform = extend_field_list_for_ajax(
+    return render_field_list_extension(
         BankTransactionForm,
         "transfer_accounts_info",
-        field_list_count=0,
-    )
-    return render_template(
+        0,
         "banking/transaction_form/transfer_form.html",
-        subform=new_subform,
         id_prefix="transfer",
         field_list_optional_member=True,
     )
@@ -284,10 +348,13 @@ def suggest_transaction_autocomplete():
     # Get the autocomplete field from the AJAX request
     post_args = request.get_json()
     field = post_args["field"]
+    search_args = get_autocomplete_search_args(post_args)
     if field == "tags":
-        suggestions = BankTransactionForm.autocomplete("tags", db_field_name="tag_name")
+        suggestions = BankTransactionForm.autocomplete(
+            "tags", db_field_name="tag_name", **search_args
+        )
     else:
-        suggestions = BankTransactionForm.autocomplete(field)
+        suggestions = BankTransactionForm.autocomplete(field, **search_args)
     return jsonify(suggestions)
 
 
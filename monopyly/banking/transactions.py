@@ -2,12 +2,16 @@
 Tools for interacting with the bank transactions in the database.
 """
 
-from dry_foundation.database.handler import DatabaseViewHandler
-
 from ..common.forms.utils import execute_on_form_validation
-from ..common.transactions import TransactionHandler, TransactionTagHandler
+from ..common.transactions import (
+    TransactionHandler,
+    TransactionTagHandler,
+    warn_of_duplicate,
+)
 from ..core.internal_transactions import add_internal_transaction
+from ..database.handler import DatabaseViewHandler
 from ..database.models import (
+    BankAccount,
     BankAccountView,
     BankSubtransaction,
     BankTransaction,
@@ -33,6 +37,9 @@ class BankTransactionHandler(
         The name of the database table that this handler manages.
     """
 
+    _parent_model = BankAccount
+    _parent_field = "account_id"
+
     @classmethod
     @DatabaseViewHandler.view_query
     def get_transactions(
@@ -83,16 +90,49 @@ class BankTransactionHandler(
         )
         return transactions
 
-    @staticmethod
-    def _prepare_subtransaction(transaction, subtransaction_data):
+    @classmethod
+    def aggregate_categories(cls, account_ids=None, start_date=None, end_date=None):
+        """
+        Aggregate bank transaction subtotals by category.
+
+        Parameters
+        ----------
+        account_ids : tuple of int, optional
+            A sequence of bank account IDs with which to filter
+            transactions (if `None`, all bank account IDs will be
+            included).
+        start_date, end_date : datetime.date, optional
+            The earliest and latest transaction dates (inclusive) of the
+            transactions to be aggregated.
+
+        Returns
+        -------
+        categories : RootCategoryTree
+            A tree-like structure of transaction categories, including
+            nested subcategories and subtotals at each level.
+        """
+        criteria = []
+        if account_ids is not None:
+            criteria.append(cls._model.account_id.in_(account_ids))
+        return cls._aggregate_categories(
+            criteria, start_date=start_date, end_date=end_date
+        )
+
+    @classmethod
+    def _prepare_subtransaction(cls, transaction, subtransaction_data):
         """Prepare a subtransaction for the given transaction."""
         tag_names = subtransaction_data.pop("tags")
         return BankSubtransaction(
             transaction_id=transaction.id,
             **subtransaction_data,
-            tags=BankTagHandler.get_tags(tag_names, ancestors=True),
+            tags=cls._get_subtransaction_tags(tag_names),
         )
 
+    @staticmethod
+    def _get_subtransaction_tags(tag_names):
+        """Get the tags (and their ancestors) for a subtransaction."""
+        return BankTagHandler.get_tags(tag_names, ancestors=True)
+
 
 class BankTagHandler(TransactionTagHandler, model=TransactionTagHandler.model):
     """
@@ -215,7 +255,9 @@ def save_transaction(form, transaction_id=None):
                 internal_transaction_id=transfer.internal_transaction_id,
                 merchant=transfer.account_view.bank.bank_name,
             )
+        duplicate = BankTransactionHandler.find_duplicate(**transaction_data)
         transaction = BankTransactionHandler.add_entry(**transaction_data)
+        warn_of_duplicate(duplicate)
     return transaction
 
 
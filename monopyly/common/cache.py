@@ -0,0 +1,311 @@
+"""
+Tools for caching responses derived from a user's data.
+"""
+
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from datetime import date
+
+from flask import current_app, g, make_response, render_template, request
+from markupsafe import Markup
+from sqlalchemy import select
+
+from ..database.handler import DatabaseHandler
+from ..database.models import DataVersion
+
+
+class DataVersionHandler(DatabaseHandler, model=DataVersion):
+    """
+    A database handler for accessing the version of a user's data.
+
+    The data version is incremented (by the database interface) each
+    time the user writes to the database, and so it can be used to
+    determine whether any content derived from that data may have
+    changed.
+
+    Attributes
+    ----------
+    user_id : int
+        The ID of the user who is the subject of database access.
+    model : type
+        The type of database model that the handler is primarily
+        designed to manage.
+    table : str
+        The name of the database table that this handler manages.
+    """
+
+    @classmethod
+    def get_version(cls, user_id=None):
+        """
+        Get the current version of the user's data.
+
+        The version is read from the database at most once per request
+        (or app context), and then again only after this process writes
+        to the database.
+
+        Parameters
+        ----------
+        user_id : int, optional
+            The ID of the user whose data version is returned. If
+            `None` (the default), the version of the current user's
+            data is returned.
+
+        Returns
+        -------
+        version : int
+            The current version of the user's data.
+        """
+        user_id = cls.user_id if user_id is None else user_id
+        key = (user_id, cls._db.write_count)
+        cached_key, version = g.get("data_version", (None, None))
+        if cached_key != key:
+            query = select(cls.model.version).where(cls.model.user_id == user_id)
+            version = cls._db.session.scalar(query) or 0
+            g.data_version = (key, version)
+        return version
+
+
+def compute_etag(version):
+    """
+    Compute an entity tag for the current request.
+
+    Parameters
+    ----------
+    version : int
+        The version of the user's data.
+
+    Returns
+    -------
+    etag : str
+        A tag that uniquely identifies the request (its path and
+        arguments) for the given user and version of that user's data
+        on the current date.
+    """
+    # Include the date, since balances and statement states depend on it
+    tag_components = [
+        str(g.user.id),
+        str(version),
+        date.today().isoformat(),
+        request.path,
+        request.query_string.decode(),
+    ]
+    return hashlib.sha1("\n".join(tag_components).encode()).hexdigest()
+
+
+def conditional_on_data_version(view):
+    """
+    Respond to a request only if the user's data has changed.
+
+    Decorate a view so that its response is tagged (using an ETag)
+    based on the request and the version of the user's data. When a
+    request includes a matching tag (via the 'If-None-Match' header), a
+    '304 Not Modified' response is returned without calling the view.
+    Only 'GET' (and 'HEAD') requests are conditional; other requests are
+    always passed directly to the view.
+    """
+
+    @functools.wraps(view)
+    def wrapped_view(**kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view(**kwargs)
+        etag = compute_etag(DataVersionHandler.get_version())
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(view(**kwargs))
+        response.set_etag(etag)
+        # Require that clients revalidate responses before reusing them
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    return wrapped_view
+
+
+class FragmentCache:
+    """
+    A cache of rendered template fragments.
+
+    Fragments are stored in an in-process, least-recently-used (LRU)
+    cache, optionally backed by an SQLite database on disk that may be
+    shared between processes (e.g., multiple server workers). Each
+    fragment is keyed by the user, the template, the parameters used to
+    render it, the version of the user's data, and the current date
+    (since rendered statement and transaction states depend on the
+    date). Since every write increments the data version of the user
+    making the change, any write made by the user invalidates that
+    user's cached fragments (including in other processes). Superseded
+    entries are eventually evicted from the cache, and fragments
+    rendered from uncommitted writes are never cached.
+
+    Parameters
+    ----------
+    max_size : int
+        The maximum number of fragments to keep in each store. The
+        default is 256.
+    path : os.PathLike, optional
+        The path to an SQLite database used to share fragments between
+        processes. If `None` (the default), fragments are only cached
+        in memory.
+
+    Attributes
+    ----------
+    hits : int
+        The number of requested fragments found in the cache.
+    misses : int
+        The number of requested fragments that had to be rendered.
+    """
+
+    def __init__(self, max_size=256, path=None):
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path:
+            self._execute_on_disk(
+                "CREATE TABLE IF NOT EXISTS fragments "
+                "(key TEXT PRIMARY KEY, content TEXT NOT NULL, accessed REAL NOT NULL)"
+            )
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a fragment cache using parameters from the app configuration."""
+        return cls(
+            max_size=config.get("FRAGMENT_CACHE_SIZE", 256),
+            path=config.get("FRAGMENT_CACHE_PATH"),
+        )
+
+    @property
+    def stats(self):
+        """A summary of the hits and misses recorded by the cache."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def render(self, template_name, params, get_context):
+        """
+        Render a template fragment, using a cached copy when available.
+
+        Parameters
+        ----------
+        template_name : str
+            The name of the template to be rendered.
+        params : list
+            The (JSON serializable) parameters that uniquely determine
+            the rendered fragment for the current user.
+        get_context : callable
+            A function (taking no arguments) that returns the context
+            used to render the template. This is only called when the
+            fragment is not already cached.
+
+        Returns
+        -------
+        fragment : markupsafe.Markup
+            The rendered template fragment.
+        """
+        key = json.dumps(
+            [
+                g.user.id,
+                DataVersionHandler.get_version(),
+                date.today().isoformat(),
+                template_name,
+                params,
+            ]
+        )
+        content = self._get(key)
+        if content is None:
+            self.misses += 1
+            content = render_template(template_name, **get_context())
+            # Only cache fragments reflecting data that has been committed
+            if not DataVersionHandler._db.session.info.get("pending_writes"):
+                self._set(key, content)
+        else:
+            self.hits += 1
+        return Markup(content)
+
+    def clear(self):
+        """Remove all fragments from the cache."""
+        with self._lock:
+            self._fragments.clear()
+        if self.path:
+            self._execute_on_disk("DELETE FROM fragments")
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._fragments:
+                self._fragments.move_to_end(key)
+                return self._fragments[key]
+        if self.path:
+            row = self._execute_on_disk(
+                "UPDATE fragments SET accessed = ? WHERE key = ? RETURNING content",
+                (time.time(), key),
+            )
+            if row:
+                self._store_in_memory(key, row[0])
+                return row[0]
+        return None
+
+    def _set(self, key, content):
+        self._store_in_memory(key, content)
+        if self.path:
+            self._execute_on_disk(
+                "INSERT OR REPLACE INTO fragments VALUES (?, ?, ?)",
+                (key, content, time.time()),
+            )
+            # Evict the least recently used fragments from the disk
+            self._execute_on_disk(
+                "DELETE FROM fragments WHERE key NOT IN "
+                "(SELECT key FROM fragments ORDER BY accessed DESC LIMIT ?)",
+                (self.max_size,),
+            )
+
+    def _store_in_memory(self, key, content):
+        with self._lock:
+            self._fragments[key] = content
+            self._fragments.move_to_end(key)
+            while len(self._fragments) > self.max_size:
+                self._fragments.popitem(last=False)
+
+    def _execute_on_disk(self, statement, parameters=()):
+        with closing(sqlite3.connect(self.path, timeout=10)) as conn, conn:
+            return conn.execute(statement, parameters).fetchone()
+
+
+def get_fragment_cache():
+    """Get the fragment cache for the current app (creating it if necessary)."""
+    extensions = current_app.extensions
+    if "fragment_cache" not in extensions:
+        extensions["fragment_cache"] = FragmentCache.from_config(current_app.config)
+    return extensions["fragment_cache"]
+
+
+def render_cached_fragment(template_name, params, get_context):
+    """
+    Render a template fragment using the app's fragment cache.
+
+    Parameters
+    ----------
+    template_name : str
+        The name of the template to be rendered.
+    params : list
+        The (JSON serializable) parameters that uniquely determine the
+        rendered fragment for the current user.
+    get_context : callable
+        A function (taking no arguments) that returns the context used
+        to render the template.
+
+    Returns
+    -------
+    fragment : markupsafe.Markup
+        The rendered template fragment.
+    """
+    return get_fragment_cache().render(template_name, params, get_context)
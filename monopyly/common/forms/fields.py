@@ -4,10 +4,13 @@ General form constructions.
 
 from abc import ABC, abstractmethod
 
+from flask import current_app
 from wtforms import fields as wtforms_fields
 from wtforms.validators import Length
 from wtforms.widgets import NumberInput
 
+from ..cache import DataVersionHandler
+from ..money import Money
 from ..utils import parse_date
 from .validators import NumeralsOnly, SelectionNotBlank
 
@@ -31,7 +34,7 @@ class CurrencyField(wtforms_fields.DecimalField):
 
     def __init__(self, *args, filters=(), **kwargs):
         filters = list(filters)
-        filters.append(lambda x: float(round(x, 2)) if x else None)
+        filters.append(lambda x: Money(x) if x else None)
         super().__init__(*args, filters=filters, places=2, **kwargs)
 
 
@@ -79,16 +82,31 @@ class CustomChoiceSelectField(wtforms_fields.SelectField, ABC):
         Using a reference to a database handler, this method queries the
         database for entries belonging to the user, and then uses those
         entries to populate the list of choices that may be selected
-        for the field value.
+        for the field value. The user's choices are cached until data is
+        next written to the database (by this process or any other).
         """
+        key = (
+            "field_choices",
+            type(self),
+            self._db_handler.user_id,
+            DataVersionHandler.get_version(),
+        )
+        user_choices = current_app.db.cache_until_write(key, self._get_user_choices)
+        # Set default choice values surrounding the user choices
+        self.choices = [
+            (-1, "-"),
+            *user_choices,
+            (0, f"New {self.label.text.lower()}"),
+        ]
+
+    def _get_user_choices(self):
         # Collect all available user entries
         entries = self._db_handler.get_entries()
-        # Set default choice values
-        self.choices = [(-1, "-"), (0, f"New {self.label.text.lower()}")]
         # Set the user choices (for consistency, arbitrarily sort by entry ID)
-        for entry in sorted(entries, key=lambda entry: entry.id):
-            display_name = self._format_choice(entry)
-            self.choices.insert(-1, (entry.id, display_name))
+        return tuple(
+            (entry.id, self._format_choice(entry))
+            for entry in sorted(entries, key=lambda entry: entry.id)
+        )
 
     @abstractmethod
     def _format_choice(self, entry):
@@ -2,14 +2,156 @@
 General utility objects for handling forms.
 """
 
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from functools import wraps
+from itertools import chain
 
-from flask import current_app, flash
+from flask import current_app, flash, g, render_template
+from sqlalchemy import func
 from wtforms.validators import ValidationError
 
-from ..utils import sort_by_frequency
+from ..cache import DataVersionHandler
 from ._forms import form_err_msg
 
+# Use a placeholder index when rendering prototype field list entries
+FIELD_LIST_PROTOTYPE_INDEX = "__index__"
+# Set the maximum number of (most frequent) values indexed for autocompletion
+AUTOCOMPLETE_INDEX_SIZE = 2000
+# Set the (default and maximum) number of autocomplete suggestions returned
+AUTOCOMPLETE_SUGGESTION_LIMIT = 50
+
+
+class AutocompleteIndex:
+    """
+    An index of autocompletion suggestions supporting prefix search.
+
+    Suggestions are stored in a suffix array: every suffix of every
+    suggestion (ignoring case) is sorted alphabetically alongside the
+    rank of its suggestion (e.g., by frequency). Suggestions beginning
+    with (or containing) a given prefix then occupy a contiguous block
+    of the array, which is found by binary search. The highest ranked
+    suggestions in that block are taken from a segment tree of the
+    minimum rank over each range of the array, so that the top
+    suggestions are found without scanning the block.
+
+    Parameters
+    ----------
+    suggestions : list of str
+        The suggestions to be indexed, in order of decreasing rank.
+    """
+
+    def __init__(self, suggestions):
+        self._suggestions = list(suggestions)
+        keys = [suggestion.lower() for suggestion in self._suggestions]
+        self._anchored = _RankedSuffixArray(
+            keys, ((rank, 0) for rank in range(len(keys)))
+        )
+        self._contained = _RankedSuffixArray(
+            keys,
+            (
+                (rank, offset)
+                for rank, key in enumerate(keys)
+                for offset in range(1, len(key))
+            ),
+        )
+
+    def __len__(self):
+        return len(self._suggestions)
+
+    def search(self, prefix="", limit=None):
+        """
+        Search the index for suggestions matching a prefix.
+
+        Parameters
+        ----------
+        prefix : str
+            The (case insensitive) prefix to match. The default is an
+            empty string, matching all suggestions.
+        limit : int, optional
+            The maximum number of suggestions to return. If `None` (the
+            default), all matching suggestions are returned.
+
+        Returns
+        -------
+        suggestions : list of str
+            The highest ranked suggestions beginning with the prefix,
+            followed (if the limit has not been reached) by the highest
+            ranked suggestions containing the prefix elsewhere.
+        """
+        prefix = prefix.lower()
+        ranks = self._anchored.iter_ranks(prefix)
+        if prefix:
+            # Supplement anchored matches with contained matches (in rank order)
+            ranks = chain(ranks, self._contained.iter_ranks(prefix))
+        suggestions, found_ranks = [], set()
+        for rank in ranks:
+            if limit is not None and len(suggestions) >= limit:
+                break
+            if rank not in found_ranks:
+                found_ranks.add(rank)
+                suggestions.append(self._suggestions[rank])
+        return suggestions
+
+
+class _RankedSuffixArray:
+    """
+    A sorted array of key suffixes, yielding ranks within a prefix block.
+
+    Parameters
+    ----------
+    keys : list of str
+        The keys, ordered by rank.
+    entries : iterable of tuple
+        The rank of each key and the offset at which its suffix starts.
+    """
+
+    def __init__(self, keys, entries):
+        self._keys = keys
+        entries = sorted(entries, key=lambda entry: keys[entry[0]][entry[1] :])
+        self._ranks = array("l", (rank for rank, _ in entries))
+        self._offsets = array("l", (offset for _, offset in entries))
+        # Store the minimum rank of each node (with leaves in the second half)
+        size = len(self._ranks)
+        self._tree = array("l", bytes(size * self._ranks.itemsize)) + self._ranks
+        for node in range(size - 1, 0, -1):
+            self._tree[node] = min(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def iter_ranks(self, prefix):
+        """Yield the ranks of suffixes beginning with the prefix, lowest first."""
+        size = len(self._ranks)
+        positions = range(size)
+
+        def get_truncated_suffix(position):
+            key = self._keys[self._ranks[position]]
+            offset = self._offsets[position]
+            return key[offset : offset + len(prefix)]
+
+        start = bisect_left(positions, prefix, key=get_truncated_suffix) + size
+        end = bisect_right(positions, prefix, key=get_truncated_suffix) + size
+        # Find the nodes covering the block, then expand them in order of rank
+        tree, nodes = self._tree, []
+        while start < end:
+            if start & 1:
+                nodes.append((tree[start], start))
+                start += 1
+            if end & 1:
+                end -= 1
+                nodes.append((tree[end], end))
+            start //= 2
+            end //= 2
+        heapq.heapify(nodes)
+        while nodes:
+            rank, node = heapq.heappop(nodes)
+            if node >= size:
+                yield rank
+            else:
+                heapq.heappush(nodes, (tree[2 * node], 2 * node))
+                heapq.heappush(nodes, (tree[2 * node + 1], 2 * node + 1))
+
 
 class Autocompleter:
     """
@@ -25,12 +167,20 @@ class Autocompleter:
     field_map : dict
         A mapping between fields supporting autocompletion and the model
         object that is used to access that field.
+    max_indexes : int
+        The maximum number of (per-user) suggestion indexes to keep in
+        memory. The default is 128.
     """
 
-    def __init__(self, field_map):
+    def __init__(self, field_map, max_indexes=128):
         self._field_map = field_map
+        self._max_indexes = max_indexes
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
 
-    def autocomplete(self, field, db_field_name=None, **priority_sort_fields):
+    def autocomplete(
+        self, field, db_field_name=None, prefix="", limit=None, **priority_sort_fields
+    ):
         """
         Provide autocomplete suggestions for the field.
 
@@ -48,6 +198,12 @@ class Autocompleter:
             The name of the database field mapping to the form field;
             the default is `None` where the form field name will be
             used.
+        prefix : str
+            A prefix that suggestions must match (ignoring case). The
+            default is an empty string, matching all suggestions.
+        limit : int, optional
+            The maximum number of suggestions to return. If `None` (the
+            default), all matching suggestions are returned.
         priority_sort_field : dict
             A mapping of fields and a value of that field which will
             take precedence over a suggestion's frequency in the data
@@ -59,45 +215,131 @@ class Autocompleter:
         suggestions : list of str
             A list of autocompletion suggestions that are sorted by
             their frequency of appearance in the database.
+
+        Notes
+        -----
+        Suggestions are found using an index built (lazily) for the
+        current user, which is kept until that user's data changes.
+        Rather than being patched after each write, the index is
+        rebuilt when it is next used. To bound the cost of rebuilding
+        it, only the most frequent values of the field (up to
+        `AUTOCOMPLETE_INDEX_SIZE`) are indexed. When the field has more
+        values than that and the index cannot provide every suggestion
+        requested, the suggestions are instead found by the database.
         """
         db_field_name = db_field_name if db_field_name else field
-        model = self._field_map[field]
-        suggestions = self._get_autocomplete_suggestions(model, db_field_name)
-        for sort_field, precedence_value in priority_sort_fields.items():
-            self._sort_suggestions_by_field(
-                suggestions, model, field, sort_field, precedence_value
-            )
-        return list(filter(None, suggestions))
+        index, complete = self._get_index(field, db_field_name, priority_sort_fields)
+        suggestions = index.search(prefix, limit=limit)
+        if complete or self._is_exhaustive(suggestions, prefix, limit):
+            return suggestions
+        return self._build_suggestions(
+            field, db_field_name, priority_sort_fields, prefix=prefix, limit=limit
+        )
 
     @staticmethod
-    def _get_autocomplete_suggestions(model, field):
-        """Get autocomplete suggestions for a field."""
-        # Get information from the database to use for autocompletion
-        query = model.select_for_user(getattr(model, field))
-        values = current_app.db.session.scalars(query)
-        suggestions = sort_by_frequency(list(values))
-        return suggestions
+    def _is_exhaustive(suggestions, prefix, limit):
+        # Unindexed values rank below all indexed values, and so they can only
+        # be omitted if fewer than the limit of indexed values begin with the
+        # prefix (since matches beginning with the prefix are ranked first)
+        prefix = prefix.lower()
+        return (
+            limit is not None
+            and len(suggestions) == limit
+            and all(suggestion.lower().startswith(prefix) for suggestion in suggestions)
+        )
+
+    def _get_index(self, field, db_field_name, priority_sort_fields):
+        key = (g.user.id, field, db_field_name, tuple(priority_sort_fields.items()))
+        version = DataVersionHandler.get_version()
+        # Check for (and build) indexes under the lock, building each just once
+        with self._lock:
+            index_version, index, complete = self._indexes.get(key, (None,) * 3)
+            if index is not None and index_version == version:
+                self._indexes.move_to_end(key)
+                return index, complete
+            # Find one value beyond the index size to tell if any are omitted
+            suggestions = self._build_suggestions(
+                field,
+                db_field_name,
+                priority_sort_fields,
+                limit=AUTOCOMPLETE_INDEX_SIZE + 1,
+            )
+            complete = len(suggestions) <= AUTOCOMPLETE_INDEX_SIZE
+            index = AutocompleteIndex(suggestions[:AUTOCOMPLETE_INDEX_SIZE])
+            # Only keep indexes reflecting data that has been committed
+            if not current_app.db.session.info.get("pending_writes"):
+                self._indexes[key] = (version, index, complete)
+                while len(self._indexes) > self._max_indexes:
+                    self._indexes.popitem(last=False)
+        return index, complete
 
-    def _sort_suggestions_by_field(
-        self, suggestions, model, field, sort_field, precedence_value
+    def _build_suggestions(
+        self, field, db_field_name, priority_sort_fields, prefix=None, limit=None
     ):
-        sort_model = self._field_map[sort_field]
-        # Build the select query to use for sorting
-        sort_query = model.select_for_user(
-            getattr(model, field),  # select the primary field
-            getattr(sort_model, sort_field),  # select the sorting field
-            guaranteed_joins=(sort_model,),  # ensure a joined sorting field
+        model = self._field_map[field]
+        query = self._build_suggestions_query(
+            model, db_field_name, priority_sort_fields, prefix=prefix
+        )
+        suggestions = current_app.db.session.scalars(query.limit(limit))
+        return list(filter(None, suggestions))
+
+    def _build_suggestions_query(self, model, field, priority_sort_fields, prefix=None):
+        """
+        Build a query ranking the distinct values of a field.
+
+        Values are ranked by whether they ever occur alongside the
+        precedence value of each priority sort field (with later fields
+        taking precedence over earlier ones), and then by their
+        frequency of appearance in the database. If a prefix is given,
+        only values containing the prefix (ignoring case) are selected,
+        and values beginning with the prefix are ranked first.
+        """
+        column = getattr(model, field)
+        sort_models = []
+        priority_orderings = []
+        for sort_field, precedence_value in priority_sort_fields.items():
+            sort_model = self._field_map[sort_field]
+            sort_models.append(sort_model)
+            has_precedence = func.max(
+                getattr(sort_model, sort_field) == precedence_value
+            )
+            priority_orderings.insert(0, has_precedence.desc())
+        query = model.select_for_user(column, guaranteed_joins=tuple(sort_models))
+        if prefix:
+            value = func.lower(column)
+            query = query.where(value.contains(prefix.lower(), autoescape=True))
+            priority_orderings.insert(
+                0, value.startswith(prefix.lower(), autoescape=True).desc()
+            )
+        return query.group_by(column).order_by(
+            *priority_orderings, func.count().desc(), column
         )
-        # Execute the query and sort appropriately
-        field_value_by_sort_field = {}
-        for row in current_app.db.session.execute(sort_query):
-            value = getattr(row, field)
-            # Register values associated with the important sort field value
-            if not field_value_by_sort_field.get(value):
-                sort_value = getattr(row, sort_field)
-                row_has_precedence = sort_value == precedence_value
-                field_value_by_sort_field[value] = row_has_precedence
-        suggestions.sort(key=field_value_by_sort_field.get, reverse=True)
+
+
+def get_autocomplete_search_args(post_args):
+    """
+    Get the prefix and limit for an autocomplete request.
+
+    Parameters
+    ----------
+    post_args : dict
+        The arguments of the autocomplete request, optionally including
+        a 'prefix' and a 'limit' (which is coerced to an integer, and
+        limited to at most `AUTOCOMPLETE_SUGGESTION_LIMIT`).
+
+    Returns
+    -------
+    search_args : dict
+        The prefix and limit to be used when searching for suggestions.
+    """
+    try:
+        limit = int(post_args.get("limit") or AUTOCOMPLETE_SUGGESTION_LIMIT)
+    except (TypeError, ValueError):
+        limit = AUTOCOMPLETE_SUGGESTION_LIMIT
+    return {
+        "prefix": str(post_args.get("prefix") or ""),
+        "limit": max(1, min(limit, AUTOCOMPLETE_SUGGESTION_LIMIT)),
+    }
 
 
 def extend_field_list_for_ajax(form_class, field_list_name, field_list_count):
@@ -135,6 +377,61 @@ def extend_field_list_for_ajax(form_class, field_list_name, field_list_count):
     return new_field
 
 
+def render_field_list_extension(
+    form_class, field_list_name, field_list_count, template_name, **context
+):
+    """
+    Render a new `Field` for the `FieldList` when processing an AJAX request.
+
+    Rather than building a dummy form for every request (as is done by
+    `extend_field_list_for_ajax`), the new field is rendered from a
+    prototype, using a placeholder for the field's index. The rendered
+    prototype is cached for the current user until data is next written
+    to the database, and so repeated requests only substitute the index.
+
+    Parameters
+    ----------
+    form_class : type
+        The form class (not class instance) containing the field list to
+        be extended.
+    field_list_name : str
+        The name of the field list to be extended.
+    field_list_count : int
+        The number of fields in the existing field list.
+    template_name : str
+        The name of the template used to render the new field (given to
+        the template as the `subform` variable).
+    **context :
+        Additional (hashable) variables passed to the template.
+
+    Returns
+    -------
+    new_field_html : str
+        The rendered HTML for the new field.
+    """
+
+    def render_prototype():
+        form = form_class()
+        field_list = getattr(form, field_list_name)
+        prototype = field_list._add_entry(index=FIELD_LIST_PROTOTYPE_INDEX)
+        html = render_template(template_name, subform=prototype, **context)
+        return html, field_list.min_entries
+
+    key = (
+        "field_list_prototype",
+        form_class,
+        field_list_name,
+        template_name,
+        tuple(sorted(context.items())),
+        g.user.id,
+        DataVersionHandler.get_version(),
+    )
+    html, min_entries = current_app.db.cache_until_write(key, render_prototype)
+    # Match the index that would be given by extending the field list directly
+    index = max(field_list_count, min_entries - 1)
+    return html.replace(FIELD_LIST_PROTOTYPE_INDEX, str(index))
+
+
 def execute_on_form_validation(func):
     """A decorator that executes the function only if the form validates."""
 
@@ -0,0 +1,90 @@
+"""
+Tools for representing monetary amounts exactly.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from numbers import Integral
+
+
+class Money(float):
+    """
+    A monetary amount, represented exactly as an integer number of cents.
+
+    Money is stored (and operated on) as an integer number of cents, but
+    it behaves as a float everywhere else (e.g., in templates, when
+    serialized as JSON, or when compared with other numbers), so that it
+    can be used anywhere that a float amount was previously expected.
+    Addition, subtraction and negation of monetary amounts are performed
+    on the integer number of cents, and so they never accumulate
+    floating point error.
+
+    Parameters
+    ----------
+    amount : float, int, decimal.Decimal, str, Money
+        The amount of money (in dollars). Amounts with fractions of a
+        cent are rounded to the nearest cent (rounding half up).
+
+    Attributes
+    ----------
+    cents : int
+        The amount of money as an integer number of cents.
+    """
+
+    __slots__ = ("cents",)
+
+    def __new__(cls, amount=0):
+        return cls.from_cents(cls._convert_to_cents(amount))
+
+    @classmethod
+    def from_cents(cls, cents):
+        """Create a monetary amount from an integer number of cents."""
+        cents = int(cents)
+        money = super().__new__(cls, cents / 100)
+        money.cents = cents
+        return money
+
+    @staticmethod
+    def _convert_to_cents(amount):
+        if isinstance(amount, Money):
+            return amount.cents
+        if isinstance(amount, Integral):
+            return int(amount) * 100
+        # Use the shortest decimal representation of floats to avoid binary error
+        decimal_amount = Decimal(repr(amount) if isinstance(amount, float) else amount)
+        return int(decimal_amount.scaleb(2).quantize(Decimal(1), ROUND_HALF_UP))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}('{self:.2f}')"
+
+    def __str__(self):
+        # Display money like any other float (e.g., in templates and URLs)
+        return float.__repr__(self)
+
+    def __reduce__(self):
+        return (self.from_cents, (self.cents,))
+
+    def __add__(self, other):
+        if isinstance(other, (Money, Integral)):
+            return Money.from_cents(self.cents + Money(other).cents)
+        return super().__add__(other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, (Money, Integral)):
+            return Money.from_cents(self.cents - Money(other).cents)
+        return super().__sub__(other)
+
+    def __rsub__(self, other):
+        if isinstance(other, (Money, Integral)):
+            return Money.from_cents(Money(other).cents - self.cents)
+        return super().__rsub__(other)
+
+    def __neg__(self):
+        return Money.from_cents(-self.cents)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Money.from_cents(abs(self.cents))
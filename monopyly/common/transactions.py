@@ -2,15 +2,50 @@
 Tools for building a common transaction interface.
 """
 
-from dry_foundation.database.handler import DatabaseHandler, DatabaseViewHandler
-from flask import abort, current_app
+import hashlib
+import re
+from collections import namedtuple
+
+from flask import abort, current_app, flash
+from sqlalchemy import (
+    and_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased
 
+from ..database.handler import DatabaseHandler, DatabaseViewHandler
 from ..database.models import (
     BankAccountTypeView,
     BankTransactionView,
     CreditTransactionView,
+    SpendingRollup,
     TransactionTag,
 )
+from .money import Money
+
+# A separator for tag names in the category paths built by SQL aggregation
+CATEGORY_PATH_SEPARATOR = "\x1f"
+
+LinkedTransaction = namedtuple(
+    "LinkedTransaction",
+    [
+        "subtype",
+        "id",
+        "internal_transaction_id",
+        "transaction_date",
+        "merchant",
+        "total",
+        "notes",
+    ],
+)
 
 
 class TransactionHandler(DatabaseViewHandler):
@@ -28,6 +63,10 @@ class TransactionHandler(DatabaseViewHandler):
         The name of the database table that this handler manages.
     """
 
+    # The model (and linking field) of the entry to which transactions belong
+    _parent_model = None
+    _parent_field = None
+
     @classmethod
     def _customize_entries_query(
         cls, query, criteria, column_orders, offset=None, limit=None
@@ -78,6 +117,9 @@ class TransactionHandler(DatabaseViewHandler):
         subtransactions_data = field_values.pop("subtransactions")
         transaction = super().add_entry(**field_values)
         cls._add_subtransactions(transaction, subtransactions_data)
+        transaction_criteria = [cls.table.c.id == transaction.id]
+        cls.update_spending_rollups(transaction_criteria)
+        cls.update_content_hashes(transaction_criteria)
         # Refresh the transaction with the subtransaction information
         cls._db.session.refresh(transaction)
         return transaction
@@ -106,16 +148,54 @@ class TransactionHandler(DatabaseViewHandler):
         """
         # Extend the default method to account for subtransactions
         subtransactions_data = field_values.pop("subtransactions", None)
+        # Replace the transaction's existing contributions to the rollups
+        transaction_criteria = [cls.table.c.id == entry_id]
+        cls.update_spending_rollups(transaction_criteria, remove=True)
         transaction = super().update_entry(entry_id, **field_values)
         if subtransactions_data:
-            # Replace all subtransactions when updating any subtransaction
-            for subtransaction in transaction.subtransactions:
-                cls._db.session.delete(subtransaction)
-            cls._add_subtransactions(transaction, subtransactions_data)
+            cls._update_subtransactions(transaction, subtransactions_data)
+        cls.update_spending_rollups(transaction_criteria)
+        cls.update_content_hashes(transaction_criteria)
         # Refresh the transaction with the subtransaction information
         cls._db.session.refresh(transaction)
         return transaction
 
+    @classmethod
+    def _update_subtransactions(cls, transaction, subtransactions_data):
+        """
+        Update the subtransactions of a transaction to match the data given.
+
+        Existing subtransactions are paired (in order) with the given
+        subtransaction data, and only the changes needed to make the
+        database match the data are applied: changed fields are updated
+        in place, tag links are added or removed based on the
+        difference between the current and submitted sets of tags,
+        surplus subtransactions are deleted, and any additional
+        subtransactions are inserted.
+        """
+        subtransactions = sorted(transaction.subtransactions, key=lambda _: _.id)
+        for subtransaction, subtransaction_data in zip(
+            subtransactions, subtransactions_data
+        ):
+            subtransaction_data = dict(subtransaction_data)
+            tags = cls._get_subtransaction_tags(subtransaction_data.pop("tags"))
+            for field, value in subtransaction_data.items():
+                if getattr(subtransaction, field) != value:
+                    setattr(subtransaction, field, value)
+            # Apply only the differences between current and submitted tags
+            current_tags = set(subtransaction.tags)
+            for tag in current_tags.difference(tags):
+                subtransaction.tags.remove(tag)
+            for tag in tags:
+                if tag not in current_tags:
+                    subtransaction.tags.append(tag)
+        # Remove surplus subtransactions or add new ones, as necessary
+        for subtransaction in subtransactions[len(subtransactions_data) :]:
+            cls._db.session.delete(subtransaction)
+        cls._add_subtransactions(
+            transaction, subtransactions_data[len(subtransactions) :]
+        )
+
     @classmethod
     def _add_subtransactions(cls, transaction, subtransactions_data):
         """Add subtransactions to the database for the data given."""
@@ -127,6 +207,444 @@ class TransactionHandler(DatabaseViewHandler):
         # Flush to the database after all subtransactions have been added
         cls._db.session.flush()
 
+    @classmethod
+    def bulk_add_entries(cls, entries_data):
+        """
+        Add a batch of transactions to the database.
+
+        Rather than adding each transaction as an individual ORM entry
+        (and then refreshing it), the transactions, subtransactions, and
+        subtransaction tag links are each inserted using a single
+        multi-row Core insert statement. Tags (and their ancestors) are
+        resolved in one query for the entire batch. This makes the
+        method suitable for importing large volumes of transactions.
+
+        Parameters
+        ----------
+        entries_data : list of dict
+            Mappings of values for each field in each transaction
+            (including subtransaction values and tag names).
+
+        Returns
+        -------
+        transaction_ids : list of int
+            The IDs of the saved transactions (in the order given).
+        """
+        transactions_data, subtransactions_data = [], []
+        for entry_data in entries_data:
+            transaction_data = dict(entry_data)
+            subtransactions_data.append(transaction_data.pop("subtransactions"))
+            transactions_data.append(transaction_data)
+        if not transactions_data:
+            return []
+        cls._authorize_parent_entries(transactions_data)
+        transaction_ids = cls._bulk_insert(cls.table, transactions_data)
+        # Resolve all tags (and their ancestors) for the batch at once
+        tag_lineages = TransactionTagHandler.get_tag_lineages(
+            {
+                tag_name
+                for transaction_subtransactions_data in subtransactions_data
+                for subtransaction_data in transaction_subtransactions_data
+                for tag_name in subtransaction_data.get("tags", ())
+            }
+        )
+        # Insert the subtransactions and then link the subtransactions to tags
+        subtransaction_table, tag_link_table = cls._get_subtransaction_tables()
+        subtransactions_rows, subtransactions_tag_ids = [], []
+        for transaction_id, transaction_subtransactions_data in zip(
+            transaction_ids, subtransactions_data, strict=True
+        ):
+            for subtransaction_data in transaction_subtransactions_data:
+                subtransaction_data = dict(subtransaction_data)
+                tag_names = subtransaction_data.pop("tags", ())
+                subtransactions_rows.append(
+                    {"transaction_id": transaction_id, **subtransaction_data}
+                )
+                subtransactions_tag_ids.append(
+                    {_ for tag_name in tag_names for _ in tag_lineages[tag_name]}
+                )
+        if subtransactions_rows:
+            subtransaction_ids = cls._bulk_insert(
+                subtransaction_table, subtransactions_rows
+            )
+            tag_link_rows = [
+                {"subtransaction_id": subtransaction_id, "tag_id": tag_id}
+                for subtransaction_id, tag_ids in zip(
+                    subtransaction_ids, subtransactions_tag_ids, strict=True
+                )
+                for tag_id in tag_ids
+            ]
+            if tag_link_rows:
+                cls._db.session.execute(insert(tag_link_table), tag_link_rows)
+        transaction_criteria = [cls.table.c.id.in_(transaction_ids)]
+        cls.update_spending_rollups(transaction_criteria)
+        cls.update_content_hashes(transaction_criteria)
+        return transaction_ids
+
+    @classmethod
+    def _authorize_parent_entries(cls, transactions_data):
+        """Ensure that the user may add transactions to each parent entry."""
+        parent_model = cls._parent_model
+        parent_ids = {data[cls._parent_field] for data in transactions_data}
+        query = parent_model.select_for_user(parent_model.id).where(
+            parent_model.id.in_(parent_ids)
+        )
+        unauthorized_ids = parent_ids - set(cls._db.session.scalars(query))
+        if unauthorized_ids:
+            abort_msg = (
+                f"The entries with IDs {sorted(unauthorized_ids)} do not exist for "
+                "the current user."
+            )
+            abort(404, abort_msg)
+
+    @classmethod
+    def _bulk_insert(cls, table, rows):
+        """Insert the rows into the table and return their IDs (in order)."""
+        # Every row must provide the same fields for a multi-row insert
+        fields = {field: None for row in rows for field in row}
+        rows = [{**fields, **row} for row in rows]
+        query = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        return cls._db.session.scalars(query, rows).all()
+
+    @classmethod
+    def _get_subtransaction_tables(cls):
+        """Get the subtransaction table and its corresponding tag link table."""
+        subtransactions_relationship = cls._model_view.subtransactions.property
+        subtransaction_model = subtransactions_relationship.mapper.class_
+        tag_link_table = subtransaction_model.tags.property.secondary
+        return subtransaction_model.__table__, tag_link_table
+
+    @classmethod
+    def update_content_hashes(cls, criteria):
+        """
+        Update the content hashes of transactions to match their contents.
+
+        Each transaction's hash is computed from its parent entry (the
+        bank account or credit statement), date, total, and merchant
+        (see `compute_content_hash`), and is stored with the transaction
+        so that duplicate transactions can be found with an indexed
+        lookup.
+
+        Parameters
+        ----------
+        criteria : iterable
+            SQLAlchemy criteria (referencing the transaction table) used
+            to select the transactions to be updated.
+        """
+        transaction_table = cls.table
+        subtransaction_table, _ = cls._get_subtransaction_tables()
+        query = (
+            select(
+                transaction_table.c.id,
+                transaction_table.c[cls._parent_field],
+                transaction_table.c.transaction_date,
+                func.sum(subtransaction_table.c.subtotal),
+                transaction_table.c.merchant,
+            )
+            .outerjoin(
+                subtransaction_table,
+                subtransaction_table.c.transaction_id == transaction_table.c.id,
+            )
+            .where(*criteria)
+            .group_by(transaction_table.c.id)
+        )
+        hash_rows = [
+            {
+                "transaction_id": transaction_id,
+                "content_hash": compute_content_hash(
+                    parent_id, transaction_date, total, merchant
+                ),
+            }
+            for transaction_id, parent_id, transaction_date, total, merchant in (
+                cls._db.session.execute(query)
+            )
+        ]
+        if hash_rows:
+            hash_update = (
+                update(transaction_table)
+                .where(transaction_table.c.id == bindparam("transaction_id"))
+                .values(content_hash=bindparam("content_hash"))
+            )
+            cls._db.session.execute(hash_update, hash_rows)
+
+    @classmethod
+    def find_duplicate(cls, **field_values):
+        """
+        Find an existing transaction duplicating the given transaction.
+
+        Parameters
+        ----------
+        **field_values :
+            Values for each field in the (prospective) transaction,
+            including subtransaction values.
+
+        Returns
+        -------
+        transaction : database.models.Model
+            An existing transaction with the same parent entry, date,
+            total, and merchant as the given transaction (or `None` if
+            no such transaction exists).
+        """
+        content_hash = compute_content_hash(
+            field_values[cls._parent_field],
+            field_values["transaction_date"],
+            sum(
+                Money(subtransaction_data["subtotal"])
+                for subtransaction_data in field_values["subtransactions"]
+            ),
+            field_values.get("merchant"),
+        )
+        query = (
+            select(cls.table.c.id)
+            .where(cls.table.c.content_hash == content_hash)
+            .limit(1)
+        )
+        transaction_id = cls._db.session.scalar(query)
+        return cls.get_entry(transaction_id) if transaction_id else None
+
+    @classmethod
+    def find_duplicates(cls):
+        """
+        Find groups of duplicate transactions in the user's history.
+
+        Returns
+        -------
+        duplicate_ids : list of list of int
+            Lists of the IDs of transactions sharing the same parent
+            entry, date, total, and merchant (ordered by ID).
+        """
+        transaction_table = cls.table
+        parent_model = cls._parent_model
+        query = (
+            parent_model.select_for_user(
+                func.group_concat(transaction_table.c.id.distinct())
+            )
+            .join(
+                transaction_table,
+                transaction_table.c[cls._parent_field] == parent_model.id,
+            )
+            .where(transaction_table.c.content_hash.is_not(None))
+            .group_by(transaction_table.c.content_hash)
+            .having(func.count(transaction_table.c.id.distinct()) > 1)
+        )
+        duplicate_ids = [
+            sorted(map(int, ids.split(","))) for ids in cls._db.session.scalars(query)
+        ]
+        return sorted(duplicate_ids)
+
+    @classmethod
+    def update_spending_rollups(cls, criteria, remove=False, authorize=True):
+        """
+        Add (or remove) the contributions of transactions to spending rollups.
+
+        The subtransactions of the selected transactions are summed
+        (by user, month, and tag) and then added to (or subtracted
+        from) the corresponding monthly spending rollups, as stored in
+        the database. Any rollups left without subtransactions are
+        removed.
+
+        Parameters
+        ----------
+        criteria : iterable
+            SQLAlchemy criteria (referencing the transaction table or
+            the transaction's parent model) used to select the
+            transactions contributing to the rollups.
+        remove : bool
+            A flag indicating whether the contributions should be
+            removed from the rollups (rather than added). The default is
+            `False`.
+        authorize : bool
+            A flag indicating whether the transactions should be limited
+            to only those of the current user. The default is `True`.
+        """
+        # Ensure that the rollups reflect all pending changes to transactions
+        cls._db.session.flush()
+        transaction_table = cls.table
+        subtransaction_table, tag_link_table = cls._get_subtransaction_tables()
+        parent_model = cls._parent_model
+        user_id_field = parent_model.user_id_model.user_id
+        month = func.strftime("%Y-%m", transaction_table.c.transaction_date)
+        total = func.sum(subtransaction_table.c.subtotal)
+        count = func.count(subtransaction_table.c.id)
+        contribution_columns = (
+            user_id_field,
+            month,
+            tag_link_table.c.tag_id,
+            literal(cls._model.subtype),
+            -total if remove else total,
+            -count if remove else count,
+        )
+        if authorize:
+            contributions = parent_model.select_for_user(*contribution_columns)
+        else:
+            contributions = parent_model.select_for_all_users(*contribution_columns)
+        contributions = (
+            contributions.join(
+                transaction_table,
+                transaction_table.c[cls._parent_field] == parent_model.id,
+            )
+            .join(
+                subtransaction_table,
+                subtransaction_table.c.transaction_id == transaction_table.c.id,
+            )
+            .join(
+                tag_link_table,
+                tag_link_table.c.subtransaction_id == subtransaction_table.c.id,
+            )
+            .where(*criteria)
+            .group_by(user_id_field, month, tag_link_table.c.tag_id)
+        )
+        rollup_table = SpendingRollup.__table__
+        rollup_key = ["user_id", "month", "tag_id", "source"]
+        query = sqlite_insert(rollup_table).from_select(
+            [*rollup_key, "total", "count"], contributions
+        )
+        query = query.on_conflict_do_update(
+            index_elements=rollup_key,
+            set_={
+                "total": rollup_table.c.total + query.excluded.total,
+                "count": rollup_table.c.count + query.excluded.count,
+            },
+        )
+        cls._db.session.execute(query)
+        if remove:
+            cls._db.session.execute(
+                delete(rollup_table).where(rollup_table.c.count <= 0)
+            )
+
+    @classmethod
+    def _aggregate_categories(cls, criteria=(), start_date=None, end_date=None):
+        """
+        Aggregate subtransaction subtotals by category in the database.
+
+        Subtransactions are categorized exactly as in `categorize`, but
+        the categorization and aggregation are performed in a single
+        query (over the base tables, rather than the views), without
+        loading any transactions or subtransactions.
+
+        Parameters
+        ----------
+        criteria : iterable
+            SQLAlchemy criteria (referencing the transaction model or
+            the transaction's parent model) used to select the
+            transactions to be aggregated.
+        start_date, end_date : datetime.date, optional
+            The earliest and latest transaction dates (inclusive) of the
+            transactions to be aggregated.
+
+        Returns
+        -------
+        categories : RootCategoryTree
+            A tree-like structure of transaction categories, including
+            nested subcategories and subtotals at each level.
+        """
+        transaction_table = cls.table
+        subtransaction_table, tag_link_table = cls._get_subtransaction_tables()
+        parent_model = cls._parent_model
+        criteria = list(criteria)
+        if start_date:
+            criteria.append(transaction_table.c.transaction_date >= start_date)
+        if end_date:
+            criteria.append(transaction_table.c.transaction_date <= end_date)
+        # Select the (authorized) subtransactions to be aggregated
+        subtransactions = (
+            parent_model.select_for_user(
+                subtransaction_table.c.id, subtransaction_table.c.subtotal
+            )
+            .join(
+                transaction_table,
+                transaction_table.c[cls._parent_field] == parent_model.id,
+            )
+            .join(
+                subtransaction_table,
+                subtransaction_table.c.transaction_id == transaction_table.c.id,
+            )
+            .where(*criteria)
+            .cte("aggregated_subtransactions")
+        )
+        # Determine the depth of every tag in the tag tree
+        tags = TransactionTag
+        tag_depths = (
+            tags.select_for_user(tags.id, tags.tag_name, literal(0).label("depth"))
+            .where(tags.parent_id.is_(None))
+            .cte("tag_depths", recursive=True)
+        )
+        tag_depths = tag_depths.union_all(
+            select(tags.id, tags.tag_name, tag_depths.c.depth + 1).join(
+                tag_depths, tags.parent_id == tag_depths.c.id
+            )
+        )
+        # Rank each subtransaction's tags by depth (ties share a depth rank)
+        subtransaction_id = tag_link_table.c.subtransaction_id
+        depth_order = (tag_depths.c.depth, tag_depths.c.tag_name)
+        ranked_tags = (
+            select(
+                subtransaction_id,
+                tag_depths.c.tag_name,
+                func.row_number()
+                .over(partition_by=subtransaction_id, order_by=depth_order)
+                .label("rank"),
+                func.dense_rank()
+                .over(partition_by=subtransaction_id, order_by=tag_depths.c.depth)
+                .label("depth_rank"),
+                func.count().over(partition_by=subtransaction_id).label("tag_count"),
+            )
+            .join(subtransactions, subtransactions.c.id == subtransaction_id)
+            .join(tag_depths, tag_depths.c.id == tag_link_table.c.tag_id)
+            .cte("ranked_tags")
+        )
+        # Build category paths, stopping at any tags sharing a depth
+        tag_paths = (
+            select(
+                ranked_tags.c.subtransaction_id,
+                ranked_tags.c.rank,
+                ranked_tags.c.tag_count,
+                ranked_tags.c.tag_name.label("path"),
+            )
+            .where(ranked_tags.c.rank == 1)
+            .cte("tag_paths", recursive=True)
+        )
+        tag_paths = tag_paths.union_all(
+            select(
+                ranked_tags.c.subtransaction_id,
+                ranked_tags.c.rank,
+                ranked_tags.c.tag_count,
+                tag_paths.c.path + CATEGORY_PATH_SEPARATOR + ranked_tags.c.tag_name,
+            ).join(
+                tag_paths,
+                and_(
+                    ranked_tags.c.subtransaction_id == tag_paths.c.subtransaction_id,
+                    ranked_tags.c.rank == tag_paths.c.rank + 1,
+                    ranked_tags.c.rank == ranked_tags.c.depth_rank,
+                ),
+            )
+        )
+        # Only complete paths are categorizable (others remain uncategorized)
+        categorized = (
+            select(tag_paths.c.subtransaction_id, tag_paths.c.path)
+            .where(tag_paths.c.rank == tag_paths.c.tag_count)
+            .subquery()
+        )
+        query = (
+            select(
+                categorized.c.path,
+                func.sum(subtransactions.c.subtotal),
+                func.count(subtransactions.c.id),
+            )
+            .select_from(subtransactions)
+            .outerjoin(
+                categorized, categorized.c.subtransaction_id == subtransactions.c.id
+            )
+            .group_by(categorized.c.path)
+        )
+        categories = RootCategoryTree()
+        for path, subtotal, count in cls._db.session.execute(query):
+            tag_names = path.split(CATEGORY_PATH_SEPARATOR) if path else []
+            categories.add_aggregate(tag_names, subtotal, count)
+        # Tally the subtotals and counts for every category in one pass
+        categories.tally()
+        return categories
+
     @classmethod
     def delete_entry(cls, entry_id):
         """
@@ -144,6 +662,7 @@ class TransactionHandler(DatabaseViewHandler):
         exists.
         """
         internal_transaction = cls.get_entry(entry_id).internal_transaction
+        cls.update_spending_rollups([cls.table.c.id == entry_id], remove=True)
         super().delete_entry(entry_id)
         if internal_transaction:
             cls._db.session.refresh(internal_transaction)
@@ -152,6 +671,47 @@ class TransactionHandler(DatabaseViewHandler):
                 cls._db.session.flush()
 
 
+def compute_content_hash(parent_id, transaction_date, total, merchant):
+    """
+    Compute a hash identifying the contents of a transaction.
+
+    Transactions with the same parent entry (bank account or credit
+    statement), date, total, and merchant are considered duplicates.
+    Merchants are normalized (ignoring case, punctuation, and spacing)
+    before hashing.
+
+    Parameters
+    ----------
+    parent_id : int
+        The ID of the bank account or credit statement to which the
+        transaction belongs.
+    transaction_date : datetime.date
+        The date of the transaction.
+    total : Money
+        The total amount of the transaction.
+    merchant : str
+        The merchant for the transaction (which may be `None`).
+
+    Returns
+    -------
+    content_hash : str
+        A hexadecimal hash of the transaction's contents.
+    """
+    normalized_merchant = " ".join(re.findall(r"\w+", (merchant or "").casefold()))
+    cents = Money(total or 0).cents
+    content = f"{parent_id}|{transaction_date}|{cents}|{normalized_merchant}"
+    return hashlib.sha1(content.encode()).hexdigest()[:16]
+
+
+def warn_of_duplicate(duplicate):
+    """Warn the user that a new transaction may duplicate an existing one."""
+    if duplicate:
+        flash(
+            "This transaction may be a duplicate of one already recorded on "
+            f"{duplicate.transaction_date} for ${duplicate.total:,.2f}."
+        )
+
+
 def get_linked_transaction(transaction):
     """
     Find a transaction that is linked to the given transaction.
@@ -209,6 +769,67 @@ def _get_linked_credit_transaction(transaction_id, internal_transaction_id):
     return transaction
 
 
+def get_linked_transactions(transactions):
+    """
+    Find the transactions that are linked to each of the given transactions.
+
+    All linked transactions (bank or credit) are found using a single
+    query, rather than by querying for each transaction individually.
+
+    Parameters
+    ----------
+    transactions : list of Transaction
+        The transactions for which to find linked transactions.
+
+    Returns
+    -------
+    linked_transactions : dict
+        A mapping between the subtype and ID of each given transaction
+        and a `LinkedTransaction` describing the transaction linked to
+        it. Transactions without a linked transaction are omitted.
+    """
+    internal_transaction_ids = {
+        transaction.internal_transaction_id
+        for transaction in transactions
+        if transaction.internal_transaction_id
+    }
+    if not internal_transaction_ids:
+        return {}
+    query = union_all(
+        *(
+            _select_linked_transactions(model, internal_transaction_ids)
+            for model in (BankTransactionView, CreditTransactionView)
+        )
+    )
+    candidates = {}
+    for row in current_app.db.session.execute(query):
+        linked_transaction = LinkedTransaction(*row)
+        candidates.setdefault(row.internal_transaction_id, []).append(
+            linked_transaction
+        )
+    linked_transactions = {}
+    for transaction in transactions:
+        key = (transaction.subtype, transaction.id)
+        for candidate in candidates.get(transaction.internal_transaction_id, []):
+            if (candidate.subtype, candidate.id) != key:
+                linked_transactions[key] = candidate
+                break
+    return linked_transactions
+
+
+def _select_linked_transactions(model, internal_transaction_ids):
+    """Select the user's transactions with the given internal transaction IDs."""
+    return model.select_for_user(
+        literal(model.subtype).label("subtype"),
+        model.id,
+        model.internal_transaction_id,
+        model.transaction_date,
+        model.merchant,
+        model.total,
+        model.notes,
+    ).where(model.internal_transaction_id.in_(internal_transaction_ids))
+
+
 def highlight_unmatched_transactions(transactions, unmatched_transactions):
     """Highlight transactions that are unmatched."""
     unmatched_transaction_ids = [_.id for _ in unmatched_transactions]
@@ -386,6 +1007,62 @@ class TransactionTagHandler(DatabaseHandler, model=TransactionTag):
             ancestor = cls.get_supertag(ancestor)
         return ancestors
 
+    @classmethod
+    def get_tag_lineages(cls, tag_names):
+        """
+        Get the IDs of the named tags along with the IDs of their ancestors.
+
+        Resolves all given tag names and their full ancestries using a
+        single (recursive) query, rather than walking the hierarchy one
+        tag at a time.
+
+        Parameters
+        ----------
+        tag_names : iterable of str
+            The names of the tags to be resolved.
+
+        Returns
+        -------
+        tag_lineages : dict
+            A mapping between each tag name and a list of IDs,
+            consisting of the ID of the named tag followed by the IDs of
+            each of its ancestors (ordered from parent to root).
+
+        Raises
+        ------
+        ValueError
+            Raised when any of the named tags does not exist for the
+            current user.
+        """
+        tag_names = set(tag_names)
+        if not tag_names:
+            return {}
+        lineage_query = cls.model.select_for_user(
+            cls.model.tag_name,
+            cls.model.id.label("tag_id"),
+            cls.model.parent_id,
+            literal(0).label("generation"),
+        ).where(cls.model.tag_name.in_(tag_names))
+        lineage = lineage_query.cte("lineage", recursive=True)
+        ancestor = aliased(cls.model)
+        lineage = lineage.union_all(
+            select(
+                lineage.c.tag_name,
+                ancestor.id,
+                ancestor.parent_id,
+                lineage.c.generation + 1,
+            ).join(ancestor, ancestor.id == lineage.c.parent_id)
+        )
+        query = select(lineage.c.tag_name, lineage.c.tag_id).order_by(
+            lineage.c.tag_name, lineage.c.generation
+        )
+        tag_lineages = {}
+        for tag_name, tag_id in cls._db.session.execute(query):
+            tag_lineages.setdefault(tag_name, []).append(tag_id)
+        if missing_tag_names := tag_names - set(tag_lineages):
+            raise ValueError(f"The tags {sorted(missing_tag_names)} do not exist.")
+        return tag_lineages
+
     @classmethod
     def find_tag(cls, tag_name):
         """
@@ -456,6 +1133,8 @@ def categorize(transactions):
     categories = RootCategoryTree()
     for subtransaction in get_subtransactions(transactions):
         categories.categorize_subtransaction(subtransaction)
+    # Tally the subtotals and counts for every category in one pass
+    categories.tally()
     return categories
 
 
@@ -489,6 +1168,9 @@ class CategoryTree:
     ----------
     category : database.models.TransactionTag, str
         The (root) category that this tree represents.
+    parent : CategoryTree
+        The tree for which this tree is a subcategory (or `None` if this
+        tree is not a subcategory of any other tree).
     subtransactions : list
         The subtransactions that belong to this category, but which are
         not included in any subcategory of this category.
@@ -498,17 +1180,110 @@ class CategoryTree:
     subtotal : float
         The subtotal of all transactions in this category and all of its
         subcategories.
+    count : int
+        The number of subtransactions in this category and all of its
+        subcategories.
+
+    Notes
+    -----
+    Subtotals and counts are tallied once (bottom-up) and then memoized
+    for each tree. Adding subtransactions or subcategories invalidates
+    the tallies of the tree and all of its ancestors, and so the
+    subtransactions of a tree should only be extended using the
+    `add_subtransaction` method (or by reassigning the list).
     """
 
     def __init__(self, category, subtransactions=None):
         self.category = category
+        self.parent = None
+        self._tallies = None
+        self._aggregate_subtotal, self._aggregate_count = 0, 0
         self.subtransactions = subtransactions or []
         self.subcategories = {}
 
+    @property
+    def subtransactions(self):
+        return self._subtransactions
+
+    @subtransactions.setter
+    def subtransactions(self, subtransactions):
+        self._subtransactions = subtransactions
+        self._invalidate()
+
+    @property
+    def subcategories(self):
+        return self._subcategories
+
+    @subcategories.setter
+    def subcategories(self, subcategories):
+        self._subcategories = _SubcategoryMapping(self)
+        for name, subcategory in subcategories.items():
+            self._subcategories[name] = subcategory
+        self._invalidate()
+
+    @property
+    def direct_subtotal(self):
+        """The subtotal of only the subtransactions directly in this category."""
+        return self.tally()[0]
+
     @property
     def subtotal(self):
-        subcategories = list(self.subcategories.values())
-        return sum(item.subtotal for item in self.subtransactions + subcategories)
+        return self.tally()[1]
+
+    @property
+    def count(self):
+        return self.tally()[2]
+
+    def tally(self):
+        """
+        Tally the subtotals and counts of the tree (if not already tallied).
+
+        Returns
+        -------
+        tallies : tuple
+            The subtotal of subtransactions directly in this category, the
+            subtotal of all subtransactions in the tree, and the number of
+            subtransactions in the tree.
+        """
+        if self._tallies is None:
+            direct_subtotal = self._aggregate_subtotal + sum(
+                _.subtotal for _ in self._subtransactions
+            )
+            subtotal = direct_subtotal
+            count = self._aggregate_count + len(self._subtransactions)
+            for subcategory in self._subcategories.values():
+                _, subcategory_subtotal, subcategory_count = subcategory.tally()
+                subtotal += subcategory_subtotal
+                count += subcategory_count
+            self._tallies = (direct_subtotal, subtotal, count)
+        return self._tallies
+
+    def _invalidate(self):
+        # Clear tallies up the tree (stopping at trees that are already cleared)
+        tree = self
+        while tree is not None and tree._tallies is not None:
+            tree._tallies = None
+            tree = tree.parent
+
+    def add_subtransaction(self, subtransaction):
+        """Add a subtransaction directly to this category."""
+        self._subtransactions.append(subtransaction)
+        self._invalidate()
+
+    def add_amount(self, subtotal, count=1):
+        """
+        Add an (already aggregated) amount directly to this category.
+
+        Parameters
+        ----------
+        subtotal : float
+            The subtotal of the subtransactions represented by the amount.
+        count : int
+            The number of subtransactions represented by the amount.
+        """
+        self._aggregate_subtotal += subtotal
+        self._aggregate_count += count
+        self._invalidate()
 
     def add_subcategory(self, tag):
         """
@@ -521,15 +1296,35 @@ class CategoryTree:
 
         Parameters
         ----------
-        tag : database.models.TransactionTag
-            The tag for which a subcategory will be added.
+        tag : database.models.TransactionTag, str
+            The tag (or tag name) for which a subcategory will be added.
 
         Returns
         -------
         subcategory : CategoryTree
             The subcategory tree matching the given tag.
         """
-        return self.subcategories.setdefault(tag.tag_name, CategoryTree(tag))
+        tag_name = tag if isinstance(tag, str) else tag.tag_name
+        if tag_name not in self.subcategories:
+            self.subcategories[tag_name] = CategoryTree(tag)
+        return self.subcategories[tag_name]
+
+
+class _SubcategoryMapping(dict):
+    """A mapping of subcategory trees that keeps its owner's tallies current."""
+
+    def __init__(self, tree):
+        super().__init__()
+        self._tree = tree
+
+    def __setitem__(self, name, subcategory):
+        subcategory.parent = self._tree
+        super().__setitem__(name, subcategory)
+        self._tree._invalidate()
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self._tree._invalidate()
 
 
 class RootCategoryTree(CategoryTree):
@@ -560,7 +1355,27 @@ class RootCategoryTree(CategoryTree):
             tags = sorted(subtransaction.tags, key=lambda tag: tag.depth)
             for tag in tags:
                 tree = tree.add_subcategory(tag)
-        tree.subtransactions.append(subtransaction)
+        tree.add_subtransaction(subtransaction)
+
+    def add_aggregate(self, tag_names, subtotal, count):
+        """
+        Add an aggregated amount to the tree of nested categories by tag.
+
+        Parameters
+        ----------
+        tag_names : list of str
+            The names of the tags (ordered by tag depth) defining the
+            category of the amount. If empty, the amount is left
+            uncategorized (and is added to the root tree).
+        subtotal : float
+            The subtotal of the subtransactions in the category.
+        count : int
+            The number of subtransactions in the category.
+        """
+        tree = self
+        for tag_name in tag_names:
+            tree = tree.add_subcategory(tag_name)
+        tree.add_amount(subtotal, count)
 
     def assemble_chart_data(self, exclude=()):
         """
@@ -573,11 +1388,11 @@ class RootCategoryTree(CategoryTree):
         labels, subtotals = [], []
         # Add chart data for categorical information
         for name, subcategory in self.subcategories.items():
-            if name not in exclude and subcategory.subtotal > 0:
+            if name not in exclude and (subtotal := subcategory.subtotal) > 0:
                 labels.append(name)
-                subtotals.append(subcategory.subtotal)
+                subtotals.append(subtotal)
         # Add chart data for uncategorized transactions
-        if (other_subtotal := sum(_.subtotal for _ in self.subtransactions)) > 0:
+        if (other_subtotal := self.direct_subtotal) > 0:
             labels.append("")
             subtotals.append(other_subtotal)
         # Return the data in a format similar to what is required by the chart app
@@ -1,10 +1,18 @@
 """Module describing logical core actions (to be used in routes)."""
 
+from weakref import WeakKeyDictionary
+
 import markdown
+from flask import current_app
 
 
 class MarkdownConverter:
-    """An object to convert Markdown to HTML."""
+    """
+    An object to convert Markdown to HTML.
+
+    Converted files may be loaded as compiled templates, which are cached
+    (for each Jinja environment) until the Markdown file is modified.
+    """
 
     replacements = {
         "src": [
@@ -15,6 +23,7 @@ class MarkdownConverter:
             ["CHANGELOG.md", '{{ url_for("core.changelog") }}'],
         ],
     }
+    _templates = WeakKeyDictionary()
 
     @classmethod
     def convert(cls, markdown_path, title, id_="", class_="", extra_content=""):
@@ -25,6 +34,36 @@ class MarkdownConverter:
             html_content, title, id_=id_, class_=class_, extra_content=extra_content
         )
 
+    @classmethod
+    def load_template(cls, markdown_path, title, **kwargs):
+        """
+        Load a compiled template from a Markdown file.
+
+        Parameters
+        ----------
+        markdown_path : pathlib.Path
+            The path to the Markdown file to be converted.
+        title : str
+            The title of the rendered page.
+        **kwargs :
+            Additional keyword arguments passed to `convert`.
+
+        Returns
+        -------
+        template : jinja2.Template
+            The compiled template, reused until the file is modified.
+        """
+        jinja_env = current_app.jinja_env
+        templates = cls._templates.setdefault(jinja_env, {})
+        key = (markdown_path, title, *sorted(kwargs.items()))
+        modification_time = markdown_path.stat().st_mtime_ns
+        cached_modification_time, template = templates.get(key, (None, None))
+        if cached_modification_time != modification_time:
+            template_string = cls.convert(markdown_path, title, **kwargs)
+            template = jinja_env.from_string(template_string)
+            templates[key] = (modification_time, template)
+        return template
+
     @staticmethod
     def _read_markdown(markdown_path):
         with markdown_path.open(encoding="utf-8") as markdown_file:
@@ -61,30 +100,39 @@ class MarkdownConverter:
         return html_template
 
 
+README_TEMPLATE_OPTIONS = {
+    "title": "About",
+    "id_": "readme",
+    "class_": "about",
+    "extra_content": (
+        '<div class="resource-links">'
+        "  <h2>Links</h2>"
+        '  <p><a href="{{ url_for("core.story") }}">Story</a></p>'
+        '  <p><a href="{{ url_for("core.application_credits") }}">Credits</a></p>'
+        "</div>"
+    ),
+}
+CHANGELOG_TEMPLATE_OPTIONS = {"title": "Changes", "id_": "changelog"}
+
+
 def convert_readme_to_html_template(readme_path):
     """Given a README file in Markdown, convert it to a renderable HTML template."""
-    return MarkdownConverter.convert(
-        readme_path,
-        title="About",
-        id_="readme",
-        class_="about",
-        extra_content=(
-            '<div class="resource-links">'
-            "  <h2>Links</h2>"
-            '  <p><a href="{{ url_for("core.story") }}">Story</a></p>'
-            '  <p><a href="{{ url_for("core.application_credits") }}">Credits</a></p>'
-            "</div>"
-        ),
-    )
+    return MarkdownConverter.convert(readme_path, **README_TEMPLATE_OPTIONS)
 
 
 def convert_changelog_to_html_template(changelog_path):
     """Given a CHANGELOG file in Markdown, convert it to a renderable HTML template."""
-    return MarkdownConverter.convert(
-        changelog_path,
-        title="Changes",
-        id_="changelog",
-    )
+    return MarkdownConverter.convert(changelog_path, **CHANGELOG_TEMPLATE_OPTIONS)
+
+
+def load_readme_template(readme_path):
+    """Given a README file in Markdown, load the (cached) compiled HTML template."""
+    return MarkdownConverter.load_template(readme_path, **README_TEMPLATE_OPTIONS)
+
+
+def load_changelog_template(changelog_path):
+    """Given a CHANGELOG file in Markdown, load the (cached) compiled HTML template."""
+    return MarkdownConverter.load_template(changelog_path, **CHANGELOG_TEMPLATE_OPTIONS)
 
 
 def determine_summary_balance_svg_viewbox_width(currency_value):
@@ -4,6 +4,7 @@ Filters defined for the application.
 
 from dry_foundation.utils import define_basic_template_global_variables
 
+from ..common.transactions import get_linked_transactions
 from .actions import determine_summary_balance_svg_viewbox_width
 from .blueprint import bp
 
@@ -19,5 +20,6 @@ def inject_utility_functions():
     """Inject utility functions globally into the template context."""
     utility_functions = {
         "calculate_summary_balance_width": determine_summary_balance_svg_viewbox_width,
+        "get_linked_transactions": get_linked_transactions,
     }
     return utility_functions
@@ -6,4 +6,7 @@ from flask import render_template
 
 
 def render_error_template(exception):
-    return render_template(f"core/errors/{exception.code}.html", exception=exception)
+    template = render_template(
+        f"core/errors/{exception.code}.html", exception=exception
+    )
+    return template, exception.code
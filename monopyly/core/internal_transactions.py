@@ -2,8 +2,53 @@
 Tools for interacting with internal transactions in the database.
 """
 
+import datetime
+import threading
+from collections import namedtuple
+
+import click
+from dry_foundation.database import db_transaction, echo_db_info
 from flask import current_app
-from sqlalchemy import insert
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, select, update
+
+from ..common.money import Money
+from ..database.models import (
+    BankAccount,
+    BankSubtransaction,
+    BankTransaction,
+    CreditStatement,
+    CreditSubtransaction,
+    CreditTransaction,
+    TransactionTag,
+    credit_tag_link_table,
+)
+
+# The maximum number of days separating the two sides of a transfer
+TRANSFER_WINDOW_DAYS = 3
+# The number of days of transactions checked for transfers by periodic linking
+TRANSFER_LOOKBACK_DAYS = 30
+# The tag identifying credit transactions that are payments
+TRANSFER_PAYMENT_TAG = "Credit payments"
+
+TransferPair = namedtuple(
+    "TransferPair",
+    ["user_id", "bank_transaction_id", "credit_transaction_id", "total"],
+)
+_TransferCandidate = namedtuple(
+    "_TransferCandidate", ["user_id", "cents", "ordinal", "id"]
+)
+# Each side of a transfer, given by the transaction model, its parent model
+# (and the field referencing it), and its subtransaction model
+_TRANSFER_SOURCES = (
+    (BankTransaction, BankAccount, BankSubtransaction, BankTransaction.account_id),
+    (
+        CreditTransaction,
+        CreditStatement,
+        CreditSubtransaction,
+        CreditTransaction.statement_id,
+    ),
+)
 
 
 def add_internal_transaction():
@@ -12,3 +57,289 @@ def add_internal_transaction():
     query = insert(internal_transactions_table)
     entry_id = current_app.db.session.execute(query).lastrowid
     return entry_id
+
+
+def find_transfer_pairs(window=TRANSFER_WINDOW_DAYS, since=None, all_users=False):
+    """
+    Find pairs of unlinked bank and credit transactions that are transfers.
+
+    A bank transaction and a credit transaction are considered to be
+    two sides of a single transfer (e.g., a credit card payment made
+    from a bank account) when they belong to the same user, they are
+    not yet linked to any internal transaction, their totals are equal
+    (a payment is recorded as a negative amount on both the bank account
+    and the credit card), they occur within a few days of each other,
+    and the credit transaction is tagged as a credit payment (so that
+    purchases are never mistaken for payments, even when a refund of
+    the same amount follows shortly after). Candidates from each side are found using the index of
+    transactions by internal transaction and date, sorted by user,
+    amount, and date, and then matched in a single merge pass.
+
+    Parameters
+    ----------
+    window : int
+        The maximum number of days separating the two transactions in a
+        pair. The default is 3 days.
+    since : datetime.date, optional
+        The earliest date of transactions to consider. If `None`, all
+        unlinked transactions are considered.
+    all_users : bool
+        A flag indicating whether transfers should be found for all
+        users (rather than only the current user). The default is
+        `False`.
+
+    Returns
+    -------
+    pairs : list of TransferPair
+        The pairs of bank and credit transactions that appear to be
+        transfers.
+    """
+    bank_source, credit_source = _TRANSFER_SOURCES
+    bank_candidates = _query_transfer_candidates(bank_source, since, all_users)
+    credit_candidates = _query_transfer_candidates(
+        credit_source, since, all_users, payments_only=True
+    )
+    return list(_merge_transfer_candidates(bank_candidates, credit_candidates, window))
+
+
+def _query_transfer_candidates(source, since, all_users, payments_only=False):
+    model, parent_model, subtransaction_model, parent_field = source
+    user_id = parent_model.user_id_model.user_id
+    total = func.sum(subtransaction_model.subtotal)
+    columns = (user_id, total, model.transaction_date, model.id)
+    if all_users:
+        query = parent_model.select_for_all_users(*columns)
+    else:
+        query = parent_model.select_for_user(*columns)
+    # Query the tables (not the views), so that unlinked transactions are
+    # found using the index (rather than by computing every transaction)
+    query = (
+        query.join(model, parent_field == parent_model.id)
+        .join(subtransaction_model, subtransaction_model.transaction_id == model.id)
+        .where(model.internal_transaction_id.is_(None))
+        .group_by(model.id)
+        .order_by(user_id, total, model.transaction_date, model.id)
+    )
+    if since:
+        query = query.where(model.transaction_date >= since)
+    if payments_only:
+        # Only reductions of a credit card balance can be paid from a bank
+        query = query.where(model.id.in_(_select_payment_transaction_ids()))
+        query = query.having(total < 0)
+    return [
+        _TransferCandidate(user_id, total.cents, transaction_date.toordinal(), id_)
+        for user_id, total, transaction_date, id_ in current_app.db.session.execute(
+            query
+        )
+    ]
+
+
+def _select_payment_transaction_ids():
+    return (
+        select(CreditSubtransaction.transaction_id)
+        .join(
+            credit_tag_link_table,
+            credit_tag_link_table.c.subtransaction_id == CreditSubtransaction.id,
+        )
+        .join(TransactionTag, TransactionTag.id == credit_tag_link_table.c.tag_id)
+        .where(TransactionTag.tag_name == TRANSFER_PAYMENT_TAG)
+    )
+
+
+def _merge_transfer_candidates(bank_candidates, credit_candidates, window):
+    i = j = 0
+    while i < len(bank_candidates) and j < len(credit_candidates):
+        bank_candidate, credit_candidate = bank_candidates[i], credit_candidates[j]
+        bank_key = bank_candidate[:2]
+        credit_key = credit_candidate[:2]
+        if bank_key < credit_key:
+            i += 1
+        elif bank_key > credit_key:
+            j += 1
+        else:
+            # Same user and amount: advance whichever side is earlier
+            offset = credit_candidate.ordinal - bank_candidate.ordinal
+            if abs(offset) <= window:
+                yield TransferPair(
+                    bank_candidate.user_id,
+                    bank_candidate.id,
+                    credit_candidate.id,
+                    Money.from_cents(bank_candidate.cents),
+                )
+                i += 1
+                j += 1
+            elif offset < 0:
+                j += 1
+            else:
+                i += 1
+
+
+def link_transfer_pairs(pairs):
+    """
+    Link pairs of bank and credit transactions as internal transactions.
+
+    Parameters
+    ----------
+    pairs : iterable of TransferPair
+        The pairs of bank and credit transactions to be linked.
+
+    Returns
+    -------
+    count : int
+        The number of pairs that were linked.
+    """
+    bank_links, credit_links = [], []
+    for pair in pairs:
+        internal_transaction_id = add_internal_transaction()
+        bank_links.append(
+            {
+                "id": pair.bank_transaction_id,
+                "internal_transaction_id": internal_transaction_id,
+            }
+        )
+        credit_links.append(
+            {
+                "id": pair.credit_transaction_id,
+                "internal_transaction_id": internal_transaction_id,
+            }
+        )
+    if bank_links:
+        session = current_app.db.session
+        session.execute(update(BankTransaction), bank_links)
+        session.execute(update(CreditTransaction), credit_links)
+    return len(bank_links)
+
+
+def link_recent_transfers(window=TRANSFER_WINDOW_DAYS, lookback=TRANSFER_LOOKBACK_DAYS):
+    """
+    Find and link transfers among every user's recent transactions.
+
+    Parameters
+    ----------
+    window : int
+        The maximum number of days separating the two transactions in a
+        pair. The default is 3 days.
+    lookback : int
+        The number of days (before today) of transactions to consider.
+        The default is 30 days.
+
+    Returns
+    -------
+    count : int
+        The number of pairs that were linked.
+    """
+    since = datetime.date.today() - datetime.timedelta(days=lookback)
+    with current_app.db.session.begin():
+        pairs = find_transfer_pairs(window=window, since=since, all_users=True)
+        return link_transfer_pairs(pairs)
+
+
+def schedule_transfer_linking(app, interval, **kwargs):
+    """
+    Periodically link recent transfers in a background thread.
+
+    Parameters
+    ----------
+    app : flask.Flask
+        The app whose database is used to link transfers.
+    interval : float
+        The number of seconds between each search for transfers.
+    **kwargs :
+        Keyword arguments passed to `link_recent_transfers`.
+
+    Returns
+    -------
+    stop_event : threading.Event
+        An event that stops the background thread once it is set.
+
+    Notes
+    -----
+    Each process that calls this function starts its own thread, so
+    this is not called when creating the app (which happens in every
+    process serving the app, and for every CLI command). To link
+    transfers alongside the app, run the `run-transfer-linking` command
+    in a single, dedicated process instead.
+    """
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=_link_transfers_periodically,
+        args=(app, interval, stop_event),
+        kwargs=kwargs,
+        name="transfer-linking",
+        daemon=True,
+    )
+    thread.start()
+    return stop_event
+
+
+def _link_transfers_periodically(app, interval, stop_event, **kwargs):
+    while not stop_event.wait(interval):
+        with app.app_context():
+            try:
+                count = link_recent_transfers(**kwargs)
+            except Exception:
+                app.logger.exception("Failed to link transfers")
+            else:
+                app.logger.info(f"Linked {count} transfers")
+
+
+@click.command("link-transfers")
+@click.option(
+    "--window",
+    default=TRANSFER_WINDOW_DAYS,
+    show_default=True,
+    help="The maximum number of days between the two sides of a transfer.",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="List the proposed links without recording them.",
+)
+@click.option(
+    "--since",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="The earliest date of transactions to consider (e.g., 2020-05-01).",
+)
+@with_appcontext
+@db_transaction
+def link_transfers_command(window, dry_run, since):
+    """Find (and link) transfers between bank and credit transactions."""
+    echo_db_info("Finding transfers between bank and credit transactions...")
+    since = since.date() if since else None
+    pairs = find_transfer_pairs(window=window, since=since, all_users=True)
+    for pair in pairs:
+        click.echo(
+            f"User {pair.user_id}: bank transaction {pair.bank_transaction_id} "
+            f"<-> credit transaction {pair.credit_transaction_id} "
+            f"({pair.total:.2f})"
+        )
+    if dry_run:
+        echo_db_info(f"Found {len(pairs)} transfers (not linked)")
+    else:
+        echo_db_info(f"Linked {link_transfer_pairs(pairs)} transfers")
+
+
+@click.command("run-transfer-linking")
+@click.option(
+    "--interval",
+    default=3600.0,
+    show_default=True,
+    help="The number of seconds between each search for transfers.",
+)
+@click.option(
+    "--lookback",
+    default=TRANSFER_LOOKBACK_DAYS,
+    show_default=True,
+    help="The number of days of recent transactions to search for transfers.",
+)
+@with_appcontext
+def run_transfer_linking_command(interval, lookback):
+    """Periodically link recent transfers (until interrupted)."""
+    echo_db_info(f"Linking transfers every {interval:g} seconds...")
+    app = current_app._get_current_object()
+    try:
+        _link_transfers_periodically(
+            app, interval, threading.Event(), lookback=lookback
+        )
+    except KeyboardInterrupt:
+        echo_db_info("Stopped linking transfers")
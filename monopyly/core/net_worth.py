@@ -0,0 +1,94 @@
+"""
+Tools for determining a user's net worth over time.
+"""
+
+import datetime
+from itertools import accumulate
+
+from flask import current_app, g
+from sqlalchemy import func
+
+from ..banking.balances import DailyBalance
+from ..common.cache import DataVersionHandler
+from ..common.money import Money
+from ..database.models import (
+    BankAccount,
+    BankSubtransaction,
+    BankTransaction,
+    CreditStatement,
+    CreditSubtransaction,
+    CreditTransaction,
+)
+
+
+def get_net_worth_series():
+    """
+    Get the user's net worth on each day of their financial history.
+
+    Net worth is the combined balance of all of the user's bank
+    accounts, less the balances owed on all of their credit cards. Bank
+    balances change on the date of each transaction, while credit card
+    balances change on the issue date of each statement. The series is
+    cached until the next time data is written to the database (by this
+    process or, since it is keyed by the version of the user's data,
+    any other).
+
+    Returns
+    -------
+    net_worth : list of DailyBalance
+        The user's net worth at the end of each day, from the date of
+        the earliest recorded transaction (or statement) to the latest.
+    """
+    key = ("net_worth", g.user.id, DataVersionHandler.get_version())
+    return current_app.db.cache_until_write(key, _compute_net_worth_series)
+
+
+def _compute_net_worth_series():
+    # Merge the daily changes from each source into a dense daily series
+    daily_changes = {}
+    for change_date, total in _query_daily_changes():
+        daily_changes[change_date] = daily_changes.get(change_date, 0) + total
+    if not daily_changes:
+        return []
+    start_date = min(daily_changes)
+    day_count = (max(daily_changes) - start_date).days + 1
+    dates = [start_date + datetime.timedelta(days=i) for i in range(day_count)]
+    balances = accumulate(daily_changes.get(date, 0) for date in dates)
+    return [
+        DailyBalance(date, Money.from_cents(balance))
+        for date, balance in zip(dates, balances, strict=True)
+    ]
+
+
+def _query_daily_changes():
+    # Bank balances change with each transaction
+    bank_query = (
+        BankAccount.select_for_user(
+            BankTransaction.transaction_date,
+            func.sum(BankSubtransaction.subtotal),
+        )
+        .join(BankTransaction, BankTransaction.account_id == BankAccount.id)
+        .join(
+            BankSubtransaction,
+            BankSubtransaction.transaction_id == BankTransaction.id,
+        )
+        .group_by(BankTransaction.transaction_date)
+    )
+    # Credit balances (owed) change with each statement
+    credit_query = (
+        CreditStatement.select_for_user(
+            CreditStatement.issue_date,
+            func.sum(CreditSubtransaction.subtotal),
+        )
+        .join(CreditTransaction, CreditTransaction.statement_id == CreditStatement.id)
+        .join(
+            CreditSubtransaction,
+            CreditSubtransaction.transaction_id == CreditTransaction.id,
+        )
+        .group_by(CreditStatement.issue_date)
+    )
+    session = current_app.db.session
+    for change_date, total in session.execute(bank_query):
+        yield change_date, total.cents
+    for change_date, total in session.execute(credit_query):
+        yield change_date, -total.cents
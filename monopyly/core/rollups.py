@@ -0,0 +1,124 @@
+"""
+Tools for interacting with monthly spending rollups in the database.
+"""
+
+import click
+from dry_foundation.database import db_transaction, echo_db_info
+from flask.cli import with_appcontext
+from sqlalchemy import delete, func
+
+from ..banking.transactions import BankTransactionHandler
+from ..credit.transactions import CreditTransactionHandler
+from ..database.handler import DatabaseHandler
+from ..database.models import SpendingRollup, TransactionTag
+
+TRANSACTION_HANDLERS = (BankTransactionHandler, CreditTransactionHandler)
+
+
+class SpendingRollupHandler(DatabaseHandler, model=SpendingRollup):
+    """
+    A database handler for accessing monthly spending rollups.
+
+    Spending rollups record the total (and number) of subtransactions
+    with a given tag in each month, for each source of transactions
+    (bank or credit). Since subtransactions are linked to every ancestor
+    of their tags, the rollup for a tag includes the spending for all
+    of its subtags. Rollups are maintained by the transaction handlers
+    as transactions are added, updated, and deleted.
+
+    Attributes
+    ----------
+    user_id : int
+        The ID of the user who is the subject of database access.
+    model : type
+        The type of database model that the handler is primarily
+        designed to manage.
+    table : str
+        The name of the database table that this handler manages.
+    """
+
+    @classmethod
+    def get_spending_over_time(
+        cls, tag_names=None, sources=None, start_month=None, end_month=None
+    ):
+        """
+        Get monthly spending totals for each tag.
+
+        Parameters
+        ----------
+        tag_names : tuple of str, optional
+            A sequence of names of tags for which to get spending
+            totals. If `None`, totals are given for all top-level tags
+            (which include the spending of all their subtags).
+        sources : tuple of str, optional
+            A sequence of transaction sources ('bank' and/or 'credit')
+            to include in the totals (if `None`, all sources are
+            included).
+        start_month, end_month : str, optional
+            The earliest and latest months (inclusive), given in the
+            form 'YYYY-MM', for which to get spending totals.
+
+        Returns
+        -------
+        spending : dict
+            A dictionary containing the ordered list of months spanned
+            by the rollups, and a mapping between each tag name and a
+            list of that tag's spending totals in each month.
+        """
+        query = (
+            cls.model.select_for_user(
+                cls.model.month,
+                TransactionTag.tag_name,
+                func.sum(cls.model.total),
+            )
+            .join(TransactionTag)
+            .group_by(cls.model.month, TransactionTag.tag_name)
+            .order_by(cls.model.month, TransactionTag.tag_name)
+        )
+        if tag_names is None:
+            query = query.where(TransactionTag.parent_id.is_(None))
+        else:
+            query = query.where(TransactionTag.tag_name.in_(tag_names))
+        if sources is not None:
+            query = query.where(cls.model.source.in_(sources))
+        if start_month:
+            query = query.where(cls.model.month >= start_month)
+        if end_month:
+            query = query.where(cls.model.month <= end_month)
+        rollups = cls._db.session.execute(query).all()
+        months = sorted({month for month, _, _ in rollups})
+        month_indices = {month: i for i, month in enumerate(months)}
+        tag_totals = {}
+        for month, tag_name, total in rollups:
+            totals = tag_totals.setdefault(tag_name, [0] * len(months))
+            totals[month_indices[month]] = total
+        return {"months": months, "totals": tag_totals}
+
+    @classmethod
+    def rebuild_rollups(cls, all_users=False):
+        """
+        Rebuild the spending rollups from the recorded transactions.
+
+        Parameters
+        ----------
+        all_users : bool
+            A flag indicating whether rollups should be rebuilt for all
+            users (rather than only the current user). The default is
+            `False`.
+        """
+        query = delete(cls.table)
+        if not all_users:
+            query = query.where(cls.table.c.user_id == cls.user_id)
+        cls._db.session.execute(query)
+        for handler in TRANSACTION_HANDLERS:
+            handler.update_spending_rollups([], authorize=not all_users)
+
+
+@click.command("rebuild-rollups")
+@with_appcontext
+@db_transaction
+def rebuild_rollups_command():
+    """Rebuild the spending rollups (for all users) from the command line."""
+    echo_db_info("Rebuilding spending rollups...")
+    SpendingRollupHandler.rebuild_rollups(all_users=True)
+    echo_db_info("Rebuilt spending rollups")
@@ -2,19 +2,35 @@
 Routes for core functionality.
 """
 
+import math
+from datetime import date
 from pathlib import Path
 
-from flask import g, render_template, render_template_string, session
+from flask import (
+    abort,
+    current_app,
+    g,
+    jsonify,
+    render_template,
+    request,
+    session,
+)
 
 from ..auth.tools import login_required
 from ..banking.accounts import BankAccountHandler
+from ..banking.actions import get_balance_chart_data
 from ..banking.banks import BankHandler
 from ..credit.cards import CreditCardHandler
 from ..credit.statements import CreditStatementHandler
-from .actions import convert_changelog_to_html_template, convert_readme_to_html_template
+from .actions import load_changelog_template, load_readme_template
 from .blueprint import bp
+from .net_worth import get_net_worth_series
+from .rollups import SpendingRollupHandler
+from .search import SEARCH_RESULT_LIMIT, TransactionQuery, search_transactions
 
 APP_ROOT_DIR = Path(__file__).parents[1]
+# Set a limit on the number of points shown in the net worth chart
+NET_WORTH_CHART_POINT_LIMIT = 250
 
 
 @bp.route("/")
@@ -32,8 +48,7 @@ def index():
                 bank_accounts[bank] = accounts
         active_cards = CreditCardHandler.get_cards(active=True).all()
         for card in active_cards:
-            statements = CreditStatementHandler.get_statements((card.id,))
-            last_statement = statements.first()
+            last_statement = CreditStatementHandler.find_statement_identity(card.id)
             if last_statement:
                 card.last_statement_id = last_statement.id
             else:
@@ -53,18 +68,36 @@ def hide_homepage_block():
     return ""
 
 
+@bp.route("/_net_worth_chart_data")
+@login_required
+def load_net_worth_chart_data():
+    # Get the (optional) date range from the request arguments
+    start_date = request.args.get("start", type=date.fromisoformat)
+    end_date = request.args.get("end", type=date.fromisoformat)
+    net_worth = [
+        daily_balance
+        for daily_balance in get_net_worth_series()
+        if (start_date is None or daily_balance.transaction_date >= start_date)
+        and (end_date is None or daily_balance.transaction_date <= end_date)
+    ]
+    chart_data = get_balance_chart_data(
+        net_worth, max_points=NET_WORTH_CHART_POINT_LIMIT
+    )
+    return jsonify(chart_data)
+
+
 @bp.route("/about")
 def about():
     readme_path = APP_ROOT_DIR / "README.md"
-    about_page_template = convert_readme_to_html_template(readme_path)
-    return render_template_string(about_page_template)
+    about_page_template = load_readme_template(readme_path)
+    return render_template(about_page_template)
 
 
 @bp.route("/changelog")
 def changelog():
     changelog_path = APP_ROOT_DIR / "CHANGELOG.md"
-    changelog_page_template = convert_changelog_to_html_template(changelog_path)
-    return render_template_string(changelog_page_template)
+    changelog_page_template = load_changelog_template(changelog_path)
+    return render_template(changelog_page_template)
 
 
 @bp.route("/story")
@@ -84,3 +117,87 @@ def load_profile():
     banks = BankHandler.get_banks()
     # Return banks as a list to allow multiple reuse
     return render_template("core/profile.html", banks=list(banks))
+
+
+@bp.route("/spending")
+@login_required
+def load_spending():
+    return render_template("core/spending.html")
+
+
+@bp.route("/_spending_over_time")
+@login_required
+def load_spending_over_time():
+    spending = SpendingRollupHandler.get_spending_over_time(
+        tag_names=request.args.getlist("tag") or None,
+        sources=request.args.getlist("source") or None,
+        start_month=request.args.get("start"),
+        end_month=request.args.get("end"),
+    )
+    return jsonify(spending)
+
+
+@bp.route("/search")
+@login_required
+def search():
+    search_terms = request.args.get("q", "")
+    page = max(request.args.get("page", 1, type=int), 1)
+    # Get one extra result to determine whether there are more results
+    results = search_transactions(
+        search_terms,
+        offset=(page - 1) * SEARCH_RESULT_LIMIT,
+        limit=SEARCH_RESULT_LIMIT + 1,
+    )
+    return render_template(
+        "core/search.html",
+        search_terms=search_terms,
+        page=page,
+        results=results[:SEARCH_RESULT_LIMIT],
+        more_results=len(results) > SEARCH_RESULT_LIMIT,
+    )
+
+
+@bp.route("/_transactions")
+@login_required
+def query_transactions():
+    # Only restrict accounts/cards when they are specified in the request
+    account_ids = request.args.getlist("account", type=int)
+    card_ids = request.args.getlist("card", type=int)
+    restrict_sources = account_ids or card_ids
+    query = TransactionQuery(
+        sources=request.args.getlist("source") or None,
+        start_date=request.args.get("start", type=date.fromisoformat),
+        end_date=request.args.get("end", type=date.fromisoformat),
+        min_amount=_get_amount_arg("min"),
+        max_amount=_get_amount_arg("max"),
+        tag_names=request.args.getlist("tag") or None,
+        merchants=request.args.getlist("merchant") or None,
+        account_ids=account_ids if restrict_sources else None,
+        card_ids=card_ids if restrict_sources else None,
+    )
+    page = max(request.args.get("page", 1, type=int), 1)
+    results = query.get_results(offset=(page - 1) * SEARCH_RESULT_LIMIT)
+    transactions = [
+        {**transaction._asdict(), "transaction_date": str(transaction.transaction_date)}
+        for transaction in results.transactions
+    ]
+    return jsonify(
+        transactions=transactions, count=results.count, facets=results.facets
+    )
+
+
+def _get_amount_arg(name):
+    amount = request.args.get(name, type=float)
+    if amount is not None and not math.isfinite(amount):
+        abort(400, f"The '{name}' amount must be a finite number.")
+    return amount
+
+
+@bp.teardown_app_request
+def log_entry_map_statistics(exception=None):
+    entry_map = g.get("entry_map")
+    if entry_map:
+        current_app.logger.debug(
+            f"Entry map for '{request.path}': {entry_map.hits} duplicate fetches "
+            f"avoided ({entry_map.misses} entries fetched)"
+        )
@@ -0,0 +1,444 @@
+"""
+Tools for searching a user's transactions.
+"""
+
+import re
+from collections import namedtuple
+
+from flask import current_app
+from markupsafe import Markup, escape
+from sqlalchemy import (
+    Integer,
+    and_,
+    column,
+    desc,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+    union_all,
+)
+from sqlalchemy import table as table_clause
+
+from ..common.money import Money
+from ..database.models import (
+    BankAccount,
+    BankSubtransaction,
+    BankTransaction,
+    CreditStatement,
+    CreditSubtransaction,
+    CreditTransaction,
+    TransactionTag,
+)
+
+# Set the number of search results returned at one time
+SEARCH_RESULT_LIMIT = 25
+# Set the (approximate) number of words in each search result snippet
+SNIPPET_TOKEN_COUNT = 12
+# Mark the start and end of matches in snippets (before they are escaped)
+_MATCH_START, _MATCH_END = "\x02", "\x03"
+
+# Set the number of merchants counted when summarizing matching transactions
+MERCHANT_FACET_LIMIT = 10
+
+SearchResult = namedtuple(
+    "SearchResult",
+    ["subtype", "id", "parent_id", "transaction_date", "merchant", "total", "snippet"],
+)
+TransactionSummary = namedtuple(
+    "TransactionSummary",
+    [
+        "subtype",
+        "id",
+        "parent_id",
+        "source_id",
+        "transaction_date",
+        "merchant",
+        "total",
+    ],
+)
+FacetedTransactions = namedtuple(
+    "FacetedTransactions", ["transactions", "count", "facets"]
+)
+
+_search_table = table_clause(
+    "transaction_search", column("rowid", Integer), column("rank")
+)
+# Each source of transactions, given with the parity of its rows in the index
+_SEARCH_SOURCES = (
+    (BankTransaction, BankAccount, BankSubtransaction, "account_id", 0),
+    (CreditTransaction, CreditStatement, CreditSubtransaction, "statement_id", 1),
+)
+# Each source of transactions (and the fields identifying its parent entry and
+# the account or card to which it belongs) included in transaction queries
+_QuerySource = namedtuple(
+    "_QuerySource",
+    ["model", "parent_model", "subtransaction_model", "parent_field", "source_field"],
+)
+_QUERY_SOURCES = (
+    _QuerySource(
+        BankTransaction,
+        BankAccount,
+        BankSubtransaction,
+        BankTransaction.account_id,
+        BankTransaction.account_id,
+    ),
+    _QuerySource(
+        CreditTransaction,
+        CreditStatement,
+        CreditSubtransaction,
+        CreditTransaction.statement_id,
+        CreditStatement.card_id,
+    ),
+)
+
+
+def search_transactions(search_terms, offset=0, limit=SEARCH_RESULT_LIMIT):
+    """
+    Search the user's bank and credit transactions.
+
+    Transactions are matched against the terms using a full-text index
+    of transaction merchants and subtransaction notes, which is kept up
+    to date by the database as transactions are added, updated, and
+    deleted. Each term must match (the start of) a word in either the
+    merchant or the notes of a transaction.
+
+    Parameters
+    ----------
+    search_terms : str
+        The terms to search for.
+    offset : int
+        The number of (ranked) results to skip before returning results.
+        The default is 0.
+    limit : int
+        The maximum number of results to return. The default is 25.
+
+    Returns
+    -------
+    results : list of SearchResult
+        The matching transactions, ranked from most to least relevant,
+        with a snippet of the matching text (with the matches marked).
+    """
+    match_query = _prepare_match_query(search_terms)
+    if not match_query:
+        return []
+    search_index = literal_column(_search_table.name)
+    matches_terms = search_index.op("MATCH")(match_query)
+    # Rank and paginate the user's matches before preparing any snippets
+    # (offsetting the row ID ensures that SQLite checks that each match
+    # belongs to the user, rather than looking up each of the user's
+    # transactions in the index)
+    user_row_ids = union_all(
+        *(_select_source_row_ids(*source) for source in _SEARCH_SOURCES)
+    )
+    page = (
+        select(_search_table.c.rowid, _search_table.c.rank)
+        .where(matches_terms, (_search_table.c.rowid + 0).in_(user_row_ids))
+        .order_by(_search_table.c.rank, _search_table.c.rowid)
+        .offset(offset)
+        .limit(limit)
+        .cte("page")
+    )
+    hits = (
+        select(
+            page.c.rowid,
+            page.c.rank,
+            func.snippet(
+                search_index, -1, _MATCH_START, _MATCH_END, "…", SNIPPET_TOKEN_COUNT
+            ).label("snippet"),
+        )
+        .select_from(_search_table)
+        .join(page, page.c.rowid == _search_table.c.rowid)
+        .where(matches_terms)
+        .cte("hits")
+    )
+    query = union_all(
+        *(_select_source_hits(hits, *source) for source in _SEARCH_SOURCES)
+    ).order_by("rank", "rowid")
+    return [
+        SearchResult(*row[:-3], _mark_snippet(row.snippet))
+        for row in current_app.db.session.execute(query)
+    ]
+
+
+def _prepare_match_query(search_terms):
+    # Match each word as a (quoted) prefix, avoiding the FTS5 query syntax
+    words = re.findall(r"\w+", search_terms)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _select_source_row_ids(model, parent_model, subtransaction_model, field, parity):
+    # Select the (search index) row IDs of the user's transactions
+    return parent_model.select_for_user(model.id * 2 + parity).join(
+        model, getattr(model, field) == parent_model.id
+    )
+
+
+def _select_source_hits(hits, model, parent_model, subtransaction_model, field, parity):
+    total = (
+        select(func.sum(subtransaction_model.subtotal))
+        .where(subtransaction_model.transaction_id == model.id)
+        .scalar_subquery()
+    )
+    return select(
+        literal(model.subtype).label("subtype"),
+        model.id,
+        getattr(model, field).label("parent_id"),
+        model.transaction_date,
+        model.merchant,
+        total.label("total"),
+        hits.c.snippet,
+        hits.c.rank,
+        hits.c.rowid,
+    ).join(
+        hits,
+        and_(hits.c.rowid % 2 == parity, model.id == hits.c.rowid // 2),
+    )
+
+
+def _mark_snippet(snippet):
+    # Escape the snippet text before highlighting the matches
+    return (
+        escape(snippet or "")
+        .replace(_MATCH_START, Markup("<mark>"))
+        .replace(_MATCH_END, Markup("</mark>"))
+    )
+
+
+class TransactionQuery:
+    """
+    A query for the user's bank and credit transactions matching filters.
+
+    The query selects transactions from both bank accounts and credit
+    cards that match every one of the given filters. Alongside a page
+    of the matching transactions, the query counts the matching
+    transactions by source ('bank' or 'credit'), by bank account and
+    credit card, by tag, and by merchant (the facets of the query).
+
+    Parameters
+    ----------
+    sources : tuple of str, optional
+        The sources of transactions ('bank' and/or 'credit') to include.
+        If `None`, transactions from all sources are included.
+    start_date, end_date : datetime.date, optional
+        The earliest and latest transaction dates (inclusive) to include.
+    min_amount, max_amount : float, optional
+        The least and greatest amounts (inclusive) of transactions to
+        include. Amounts are compared regardless of sign (e.g., both a
+        $60 bank withdrawal and a $60 credit card charge are included
+        for a minimum amount of $50).
+    tag_names : tuple of str, optional
+        Names of tags, at least one of which must be assigned to a
+        subtransaction of each included transaction. Since
+        subtransactions are also linked to the ancestors of their tags,
+        the transactions with any subtag of a tag are included.
+    merchants : tuple of str, optional
+        The merchants of transactions to include.
+    account_ids, card_ids : tuple of int, optional
+        The IDs of bank accounts and credit cards with transactions to
+        include. If either are given, only transactions belonging to the
+        given accounts and cards are included.
+    """
+
+    def __init__(
+        self,
+        sources=None,
+        start_date=None,
+        end_date=None,
+        min_amount=None,
+        max_amount=None,
+        tag_names=None,
+        merchants=None,
+        account_ids=None,
+        card_ids=None,
+    ):
+        self.sources = sources
+        self.start_date = start_date
+        self.end_date = end_date
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.tag_names = tag_names
+        self.merchants = merchants
+        self.account_ids = account_ids
+        self.card_ids = card_ids
+
+    def get_results(self, offset=0, limit=SEARCH_RESULT_LIMIT):
+        """
+        Get the matching transactions and the counts for each facet.
+
+        Parameters
+        ----------
+        offset : int
+            The number of matching transactions (ordered by date, most
+            recent first) to skip. The default is 0.
+        limit : int
+            The maximum number of matching transactions to return. The
+            default is 25.
+
+        Returns
+        -------
+        results : FacetedTransactions
+            The page of matching transactions, the total number of
+            matching transactions, and the number of matching
+            transactions for each value of each facet.
+        """
+        matches = self._select_matches()
+        page = (
+            select(matches)
+            .order_by(desc(matches.c.transaction_date), desc(matches.c.id))
+            .offset(offset)
+            .limit(limit)
+            .subquery()
+        )
+        facet_counts = self._select_facets(matches).subquery()
+        # Select the page of transactions and the facet counts together, with
+        # transactions distinguished by having no facet
+        transactions_query = select(
+            null().label("facet"),
+            *page.c,
+            null().label("value"),
+            null().label("count"),
+        )
+        facets_query = select(
+            facet_counts.c.facet,
+            *(null() for _ in page.c),
+            facet_counts.c.value,
+            facet_counts.c.count,
+        )
+        query = union_all(transactions_query, facets_query).order_by(
+            desc("transaction_date"), desc("id")
+        )
+        transactions = []
+        facets = {"source": {}, "account": {}, "card": {}, "tag": {}, "merchant": {}}
+        for row in current_app.db.session.execute(query):
+            if row.facet is None:
+                transactions.append(TransactionSummary(*row[1:-2]))
+            else:
+                counts = facets[row.facet]
+                counts[row.value] = counts.get(row.value, 0) + row.count
+        return FacetedTransactions(transactions, sum(facets["source"].values()), facets)
+
+    def _select_matches(self):
+        source_queries = [
+            self._select_source_matches(source, source_ids)
+            for source, source_ids in self._get_sources()
+        ]
+        if not source_queries:
+            # Match nothing (while preserving the columns of the query)
+            source_queries = [self._select_source_matches(_QUERY_SOURCES[0], ())]
+        # Find matches once, reusing them for the transactions and facets
+        return union_all(*source_queries).cte("matches").prefix_with("MATERIALIZED")
+
+    def _get_sources(self):
+        source_ids = {"bank": self.account_ids, "credit": self.card_ids}
+        restrict_sources = self.account_ids is not None or self.card_ids is not None
+        for source in _QUERY_SOURCES:
+            subtype = source.model.subtype
+            if self.sources is not None and subtype not in self.sources:
+                continue
+            if restrict_sources and not source_ids[subtype]:
+                continue
+            yield source, source_ids[subtype]
+
+    def _select_source_matches(self, source, source_ids):
+        model, subtransaction_model = source.model, source.subtransaction_model
+        total = func.sum(subtransaction_model.subtotal)
+        query = (
+            source.parent_model.select_for_user(
+                literal(model.subtype).label("subtype"),
+                model.id,
+                source.parent_field.label("parent_id"),
+                source.source_field.label("source_id"),
+                model.transaction_date,
+                model.merchant,
+                total.label("total"),
+            )
+            .join(model, source.parent_field == source.parent_model.id)
+            .outerjoin(
+                subtransaction_model,
+                subtransaction_model.transaction_id == model.id,
+            )
+            .group_by(model.id)
+        )
+        if source_ids is not None:
+            query = query.where(source.source_field.in_(source_ids))
+        if self.start_date:
+            query = query.where(model.transaction_date >= self.start_date)
+        if self.end_date:
+            query = query.where(model.transaction_date <= self.end_date)
+        if self.merchants:
+            query = query.where(model.merchant.in_(self.merchants))
+        if self.tag_names:
+            query = query.where(model.id.in_(self._select_tagged_ids(source)))
+        # Compare amounts (regardless of sign) in cents
+        if self.min_amount is not None:
+            query = query.having(func.abs(total) >= Money(self.min_amount).cents)
+        if self.max_amount is not None:
+            query = query.having(func.abs(total) <= Money(self.max_amount).cents)
+        return query
+
+    def _select_tagged_ids(self, source):
+        subtransaction_model = source.subtransaction_model
+        tag_link_table = subtransaction_model.tags.property.secondary
+        tag_ids = TransactionTag.select_for_user(TransactionTag.id).where(
+            TransactionTag.tag_name.in_(self.tag_names)
+        )
+        return (
+            select(subtransaction_model.transaction_id)
+            .join(
+                tag_link_table,
+                tag_link_table.c.subtransaction_id == subtransaction_model.id,
+            )
+            .where(tag_link_table.c.tag_id.in_(tag_ids))
+        )
+
+    @staticmethod
+    def _select_facets(matches):
+        source_counts = select(
+            literal("source").label("facet"),
+            matches.c.subtype.label("value"),
+            func.count().label("count"),
+        ).group_by(matches.c.subtype)
+        holder_counts = select(
+            func.iif(matches.c.subtype == "bank", "account", "card"),
+            matches.c.source_id,
+            func.count(),
+        ).group_by(matches.c.subtype, matches.c.source_id)
+        merchant_counts = (
+            select(
+                literal("merchant").label("facet"),
+                matches.c.merchant,
+                func.count().label("count"),
+            )
+            .where(matches.c.merchant.is_not(None))
+            .group_by(matches.c.merchant)
+            .order_by(desc("count"), matches.c.merchant)
+            .limit(MERCHANT_FACET_LIMIT)
+            .subquery()
+        )
+        tag_counts = []
+        for source in _QUERY_SOURCES:
+            subtransaction_model = source.subtransaction_model
+            tag_link_table = subtransaction_model.tags.property.secondary
+            tag_counts.append(
+                select(
+                    literal("tag"),
+                    TransactionTag.tag_name,
+                    func.count(matches.c.id.distinct()),
+                )
+                .join(
+                    subtransaction_model,
+                    subtransaction_model.transaction_id == matches.c.id,
+                )
+                .join(
+                    tag_link_table,
+                    tag_link_table.c.subtransaction_id == subtransaction_model.id,
+                )
+                .join(TransactionTag, TransactionTag.id == tag_link_table.c.tag_id)
+                .where(matches.c.subtype == source.model.subtype)
+                .group_by(TransactionTag.tag_name)
+            )
+        return union_all(
+            source_counts, holder_counts, select(merchant_counts), *tag_counts
+        )
@@ -2,9 +2,9 @@
 Tools for interacting with credit accounts in the database.
 """
 
-from dry_foundation.database.handler import DatabaseHandler
-
-from ..database.models import CreditAccount
+from ..database.handler import DatabaseHandler
+from ..database.models import CreditAccount, CreditCard
+from .transactions import CreditTransactionHandler
 
 
 class CreditAccountHandler(DatabaseHandler, model=CreditAccount):
@@ -60,4 +60,7 @@ class CreditAccountHandler(DatabaseHandler, model=CreditAccount):
         entry_id : int
             The ID of the account to be deleted.
         """
+        CreditTransactionHandler.update_spending_rollups(
+            [CreditCard.account_id == entry_id], remove=True
+        )
         super().delete_entry(entry_id)
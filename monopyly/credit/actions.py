@@ -2,6 +2,7 @@
 
 from ..banking.transactions import record_new_transfer
 from ..common.forms.utils import execute_on_form_validation
+from ..common.money import Money
 from ..common.utils import parse_date
 from .cards import CreditCardHandler
 from .statements import CreditStatementHandler
@@ -106,8 +107,7 @@ def transfer_credit_card_statement(form, card_id, prior_card_id):
     # If response is affirmative, transfer the statement to the new card
     if form.transfer.data == "yes":
         # Get the prior card's most recent statement; assign it to the new card
-        statements = CreditStatementHandler.get_statements(card_ids=(prior_card_id,))
-        latest_statement = statements.first()
+        latest_statement = CreditStatementHandler.find_statement_identity(prior_card_id)
         CreditStatementHandler.update_entry(latest_statement.id, card_id=card_id)
         # Deactivate the old card (after ensuring it exists and is accessible)
         CreditCardHandler.get_entry(prior_card_id)
@@ -176,6 +176,50 @@ def make_payment(card_id, payment_account_id, payment_date, payment_amount):
     CreditTransactionHandler.add_entry(**credit_mapping)
 
 
+def record_activity_transactions(statement, activities):
+    """
+    Record a batch of transaction activities as credit transactions.
+
+    Each activity is recorded as a transaction (with a single
+    subtransaction) on the card belonging to the given statement. The
+    statement for each transaction is inferred from the activity date,
+    and any statements that do not yet exist are created.
+
+    Parameters
+    ----------
+    statement : database.models.CreditStatementView
+        The statement being reconciled against the activities.
+    activities : TransactionActivities
+        The activities to be recorded as transactions.
+
+    Returns
+    -------
+    transaction_ids : list of int
+        The IDs of the recorded transactions.
+    """
+    activity_statements = CreditStatementHandler.infer_statements(
+        statement.card,
+        {activity.transaction_date for activity in activities},
+        creation=True,
+    )
+    transactions_data = [
+        {
+            "statement_id": activity_statements[activity.transaction_date].id,
+            "transaction_date": activity.transaction_date,
+            "merchant": activity.description,
+            "subtransactions": [
+                {
+                    "subtotal": activity.total,
+                    "note": activity.description,
+                    "tags": [],
+                }
+            ],
+        }
+        for activity in activities
+    ]
+    return CreditTransactionHandler.bulk_add_entries(transactions_data)
+
+
 def parse_request_transaction_data(request_args):
     """
     Parse transaction data given as arguments on the request.
@@ -196,7 +240,7 @@ def parse_request_transaction_data(request_args):
             "transaction_date": parse_date(request_args.get("transaction_date")),
         }
         if (subtotal := request_args.get("total")) is not None:
-            transaction_data["subtransactions"] = [{"subtotal": float(subtotal)}]
+            transaction_data["subtransactions"] = [{"subtotal": Money(subtotal)}]
         if (merchant := request_args.get("description")) is not None:
             transaction_data["merchant"] = merchant
     else:
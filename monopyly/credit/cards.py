@@ -2,10 +2,10 @@
 Tools for interacting with credit cards in the database.
 """
 
-from dry_foundation.database.handler import DatabaseHandler
-
 from ..common.forms.utils import execute_on_form_validation
-from ..database.models import Bank, CreditAccount, CreditCard
+from ..database.handler import DatabaseHandler
+from ..database.models import Bank, CreditAccount, CreditCard, CreditStatement
+from .transactions import CreditTransactionHandler
 
 
 class CreditCardHandler(DatabaseHandler, model=CreditCard):
@@ -123,6 +123,9 @@ class CreditCardHandler(DatabaseHandler, model=CreditCard):
         entry_id : int
             The ID of the credit card to be deleted.
         """
+        CreditTransactionHandler.update_spending_rollups(
+            [CreditStatement.card_id == entry_id], remove=True
+        )
         super().delete_entry(entry_id)
 
 
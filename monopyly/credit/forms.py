@@ -232,12 +232,14 @@ class CreditTransactionForm(TransactionForm):
 
             Returns
             -------
-            statement : database.models.CreditStatementView
+            statement : database.models.CreditStatement
                 The credit statement belonging to this transaction.
             """
             issue_date = self.issue_date.data
             if issue_date:
-                statement = self._db_handler.find_statement(card.id, issue_date)
+                statement = self._db_handler.find_statement_identity(
+                    card.id, issue_date
+                )
                 # Create the statement if it does not already exist
                 if not statement:
                     statement = self._db_handler.add_statement(card, issue_date)
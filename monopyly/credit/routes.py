@@ -2,6 +2,8 @@
 Routes for credit card financials.
 """
 
+import json
+
 from dry_foundation.database import db_transaction
 from flask import (
     abort,
@@ -18,9 +20,12 @@ from sqlalchemy.exc import MultipleResultsFound
 from ..auth.tools import login_required
 from ..banking.accounts import BankAccountHandler
 from ..banking.banks import BankHandler
-from ..common.forms.utils import extend_field_list_for_ajax
+from ..common.cache import render_cached_fragment
+from ..common.forms.utils import (
+    get_autocomplete_search_args,
+    render_field_list_extension,
+)
 from ..common.transactions import (
-    categorize,
     get_linked_transaction,
     highlight_unmatched_transactions,
 )
@@ -32,6 +37,7 @@ from .actions import (
     get_statement_and_transactions,
     make_payment,
     parse_request_transaction_data,
+    record_activity_transactions,
     transfer_credit_card_statement,
 )
 from .blueprint import bp
@@ -183,32 +189,48 @@ def load_statements():
 def update_statements_display():
     # Separate the arguments of the POST method
     post_args = request.get_json()
-    card_ids = map(int, post_args["card_ids"])
-    # Determine the cards from the arguments of POST method
-    cards = [CreditCardHandler.get_entry(card_id) for card_id in card_ids]
-    card_statements = get_card_statement_grouping(cards)
-    # Filter selected statements from the database
-    return render_template("credit/statements.html", card_statements=card_statements)
+    card_ids = sorted(map(int, post_args["card_ids"]))
+
+    def get_context():
+        # Determine the cards from the arguments of POST method
+        cards = [CreditCardHandler.get_entry(card_id) for card_id in card_ids]
+        # Filter selected statements from the database
+        return {"card_statements": get_card_statement_grouping(cards)}
+
+    return render_cached_fragment("credit/statements.html", [card_ids], get_context)
 
 
 @bp.route("/statement/<int:statement_id>")
 @login_required
 def load_statement_details(statement_id):
     statement, transactions = get_statement_and_transactions(statement_id)
-    categories = categorize(transactions)
-    # Get bank accounts for potential payments
-    bank_accounts = BankAccountHandler.get_accounts()
+    categories = CreditTransactionHandler.aggregate_categories(
+        statement_ids=[statement_id]
+    )
     # Save a pointer to this statement to allow easy returns
     session["statement_focus"] = statement_id
     return render_template(
         "credit/statement_page.html",
         statement=statement,
+        statement_summary=_render_statement_summary(statement_id),
         transactions=transactions,
-        bank_accounts=bank_accounts,
         chart_data=categories.assemble_chart_data(exclude=["Credit payments"]),
     )
 
 
+def _render_statement_summary(statement_id):
+    def get_context():
+        return {
+            "statement": CreditStatementHandler.get_entry(statement_id),
+            # Get bank accounts for potential payments
+            "bank_accounts": BankAccountHandler.get_accounts(),
+        }
+
+    return render_cached_fragment(
+        "credit/statement_summary.html", [statement_id], get_context
+    )
+
+
 @bp.before_app_request
 def clear_statement_focus():
     exempt_endpoints = (
@@ -247,16 +269,10 @@ def pay_credit_card(card_id, statement_id):
     # Pay towards the card balance
     make_payment(card_id, payment_account_id, payment_date, payment_amount)
     # Get the current statement information from the database
-    statement = CreditStatementHandler.get_entry(statement_id)
     transactions = CreditTransactionHandler.get_transactions(
         statement_ids=(statement_id,)
     )
-    bank_accounts = BankAccountHandler.get_accounts()
-    summary_template = render_template(
-        "credit/statement_summary.html",
-        statement=statement,
-        bank_accounts=bank_accounts,
-    )
+    summary_template = _render_statement_summary(statement_id)
     transactions_table_template = render_template(
         "credit/transactions_table/table.html",
         transactions=transactions,
@@ -308,11 +324,39 @@ def load_statement_reconciliation_details(statement_id):
         )
 
 
+@bp.route("/record_activities/<int:statement_id>", methods=("POST",))
+@login_required
+@db_transaction
+def record_activities(statement_id):
+    statement = CreditStatementHandler.get_entry(statement_id)
+    # Record all selected activities as transactions at once
+    try:
+        activities = TransactionActivities(
+            json.loads(activity) for activity in request.form.getlist("activity")
+        )
+    except (TypeError, ValueError, ArithmeticError):
+        abort(400, "The selected activities are not valid transaction activities.")
+    if activities:
+        transaction_ids = record_activity_transactions(statement, activities)
+        plural = len(transaction_ids) != 1
+        flash(
+            f"Recorded {len(transaction_ids)} "
+            f"transaction{'s' if plural else ''} from the activity file.",
+            category="success",
+        )
+    return redirect(
+        url_for(
+            "credit.load_statement_reconciliation_details", statement_id=statement_id
+        )
+    )
+
+
 @bp.before_app_request
 def clear_reconciliation_info():
     exempt_endpoints = (
         "credit.reconcile_activity",
         "credit.load_statement_reconciliation_details",
+        "credit.record_activities",
         "credit.expand_transaction",
         "credit.add_transaction",
         "credit.update_transaction",
@@ -382,17 +426,22 @@ def load_more_transactions():
 def update_transactions_display():
     # Separate the arguments of the POST method
     post_args = request.get_json()
-    card_ids = map(int, post_args["card_ids"])
+    card_ids = sorted(map(int, post_args["card_ids"]))
     sort_order = "ASC" if post_args["sort_order"] == "asc" else "DESC"
-    # Filter selected transactions from the database
-    transactions = CreditTransactionHandler.get_transactions(
-        card_ids=card_ids, sort_order=sort_order, limit=100
-    )
-    return render_template(
-        "credit/transactions_table/table.html",
-        sort_order=sort_order,
-        transactions=transactions,
-        full_view=True,
+
+    def get_context():
+        # Filter selected transactions from the database
+        transactions = CreditTransactionHandler.get_transactions(
+            card_ids=card_ids, sort_order=sort_order, limit=100
+        )
+        return {
+            "sort_order": sort_order,
+            "transactions": transactions,
+            "full_view": True,
+        }
+
+    return render_cached_fragment(
+        "credit/transactions_table/table.html", [card_ids, sort_order], get_context
     )
 
 
@@ -401,12 +450,15 @@ def update_transactions_display():
 def expand_transaction():
     # Get the transaction ID from the AJAX request
     transaction_id = int(request.get_json())
-    transaction = CreditTransactionHandler.get_entry(transaction_id)
-    # Get the subtransactions
-    subtransactions = transaction.subtransactions
-    return render_template(
+
+    def get_context():
+        transaction = CreditTransactionHandler.get_entry(transaction_id)
+        return {"subtransactions": transaction.subtransactions}
+
+    return render_cached_fragment(
         "common/transactions_table/subtransactions.html",
-        subtransactions=subtransactions,
+        ["credit", transaction_id],
+        get_context,
     )
 
 
@@ -500,14 +552,11 @@ def add_subtransaction_fields():
     post_args = request.get_json()
     subtransaction_count = int(post_args["subtransaction_count"])
     # Add a new subtransaction to the form
-    new_subform = extend_field_list_for_ajax(
+    return render_field_list_extension(
         CreditTransactionForm,
         "subtransactions",
         subtransaction_count,
-    )
-    return render_template(
         "common/transaction_form/subtransaction_subform.html",
-        subform=new_subform,
         field_list_optional_member=True,
     )
 
@@ -534,15 +583,18 @@ def suggest_transaction_autocomplete():
     # Get the autocomplete field from the AJAX request
     post_args = request.get_json()
     field = post_args["field"]
+    search_args = get_autocomplete_search_args(post_args)
     if field == "note":
         merchant = post_args["merchant"]
-        suggestions = CreditTransactionForm.autocomplete("note", merchant=merchant)
+        suggestions = CreditTransactionForm.autocomplete(
+            "note", merchant=merchant, **search_args
+        )
     elif field == "tags":
         suggestions = CreditTransactionForm.autocomplete(
-            "tags", db_field_name="tag_name"
+            "tags", db_field_name="tag_name", **search_args
         )
     else:
-        suggestions = CreditTransactionForm.autocomplete(field)
+        suggestions = CreditTransactionForm.autocomplete(field, **search_args)
     return jsonify(suggestions)
 
 
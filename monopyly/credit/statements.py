@@ -2,16 +2,86 @@
 Tools for interacting with the credit statements in the database.
 """
 
+from bisect import bisect_left
+
 from dateutil.relativedelta import relativedelta
-from dry_foundation.database.handler import DatabaseViewHandler
+from flask import abort, current_app
+from sqlalchemy import insert, select
 
+from ..common.cache import DataVersionHandler
 from ..common.utils import get_next_occurrence_of_day
+from ..database.handler import DatabaseViewHandler
 from ..database.models import (
     CreditAccount,
     CreditCard,
     CreditStatement,
     CreditStatementView,
 )
+from .transactions import CreditTransactionHandler
+
+
+class StatementCalendar:
+    """
+    A calendar of the statements issued for a credit card.
+
+    The calendar stores the issue date and ID of each of a card's
+    statements, sorted by issue date, so that the statement issued on
+    any date (or the most recent statement) can be found by bisection
+    rather than by querying the database.
+
+    Parameters
+    ----------
+    card_id : int
+        The ID of the credit card that issued the statements.
+    statements : iterable of tuple
+        Pairs of the issue date and ID of each statement, sorted by
+        issue date.
+    """
+
+    def __init__(self, card_id, statements):
+        self.card_id = card_id
+        self._issue_dates, self._statement_ids = [], []
+        for issue_date, statement_id in statements:
+            self._issue_dates.append(issue_date)
+            self._statement_ids.append(statement_id)
+
+    def __len__(self):
+        return len(self._statement_ids)
+
+    @classmethod
+    def load(cls, card_id):
+        """Load the calendar for a card (belonging to the current user)."""
+        query = (
+            CreditStatement.select_for_user(
+                CreditStatement.issue_date, CreditStatement.id
+            )
+            .where(CreditStatement.card_id == card_id)
+            .order_by(CreditStatement.issue_date, CreditStatement.id)
+        )
+        return cls(card_id, current_app.db.session.execute(query))
+
+    def find_statement_id(self, issue_date=None):
+        """
+        Find the ID of the statement issued on a given date.
+
+        Parameters
+        ----------
+        issue_date : datetime.date, optional
+            The issue date of the statement to be found (if `None`, the
+            most recent statement will be found).
+
+        Returns
+        -------
+        statement_id : int
+            The ID of the statement issued on the given date. If no
+            statement was issued on that date, returns `None`.
+        """
+        if issue_date is None:
+            return self._statement_ids[-1] if self._statement_ids else None
+        index = bisect_left(self._issue_dates, issue_date)
+        if index < len(self) and self._issue_dates[index] == issue_date:
+            return self._statement_ids[index]
+        return None
 
 
 class CreditStatementHandler(
@@ -111,6 +181,39 @@ class CreditStatementHandler(
         )
         return statement
 
+    @classmethod
+    def find_statement_identity(cls, card_id, issue_date=None):
+        """
+        Find a statement (without its balance) using identifying characteristics.
+
+        Locates a credit card statement from the ID of the card to which
+        it belongs and the date on which it was issued, like
+        `find_statement`. Rather than querying the statement view (which
+        computes each statement's balance and payment date), the
+        statement is found using the card's statement calendar and only
+        the statement itself is loaded. This should be preferred
+        whenever the balance of the statement is not needed.
+
+        Parameters
+        ----------
+        card_id : int
+            The entry ID of the credit card belonging to the statement.
+        issue_date : datetime.date, optional
+            The issue date for the statement to be found (if `None`, the
+            most recent statement will be found).
+
+        Returns
+        -------
+        statement : database.models.CreditStatement
+            The statement entry matching the given criteria. If no
+            matching statement is found, returns `None`.
+        """
+        calendar = cls.get_statement_calendar(card_id)
+        statement_id = calendar.find_statement_id(issue_date)
+        if statement_id is None:
+            return None
+        return cls._db.session.get(CreditStatement, statement_id)
+
     @classmethod
     def infer_statement(cls, card, transaction_date, creation=False):
         """
@@ -140,19 +243,131 @@ class CreditStatementHandler(
         statement : database.models.CreditStatement
             The inferred statement entry for the transaction.
         """
+        statements = cls.infer_statements(card, (transaction_date,), creation)
+        return statements[transaction_date]
+
+    @classmethod
+    def infer_statements(cls, card, transaction_dates, creation=False):
+        """
+        Infer the statements corresponding to the dates of many transactions.
+
+        Given a collection of transaction dates and the card used for
+        all of the transactions, infer the statement that each
+        transaction belongs to. Statements are inferred using the same
+        rules as `infer_statement`, but existing statements are found
+        using the card's statement calendar (see `get_statement_calendar`)
+        and any statements that are missing are created in a single
+        insert.
+
+        Parameters
+        ----------
+        card : database.models.CreditCard
+            The entry for the card used in the transactions.
+        transaction_dates : iterable of datetime.date
+            The dates the transactions took place.
+        creation : bool, optional
+            A flag indicating whether statements should be created if
+            they are not found in the database. The default is `False`;
+            statements will not be created, even if no matching
+            statement already exists in the database.
+
+        Returns
+        -------
+        statements : dict
+            A mapping between each transaction date and the inferred
+            statement entry for a transaction on that date. If no
+            statement is found (and none are created), the date is
+            mapped to `None`.
+        """
         issue_day = card.account.statement_issue_day
-        issue_date = get_next_occurrence_of_day(issue_day, transaction_date)
-        statement = cls.find_statement(card.id, issue_date)
-        if not statement and creation:
-            statement = cls.add_statement(card, issue_date)
-        return statement
+        issue_dates = {
+            transaction_date: get_next_occurrence_of_day(issue_day, transaction_date)
+            for transaction_date in transaction_dates
+        }
+        calendar = cls.get_statement_calendar(card.id)
+        statement_ids = {
+            issue_date: calendar.find_statement_id(issue_date)
+            for issue_date in issue_dates.values()
+        }
+        missing_issue_dates = sorted(
+            issue_date
+            for issue_date, statement_id in statement_ids.items()
+            if statement_id is None
+        )
+        if creation and missing_issue_dates:
+            added_ids = cls._bulk_add_statements(card, missing_issue_dates)
+            statement_ids.update(zip(missing_issue_dates, added_ids, strict=True))
+        query = select(cls.model).where(
+            cls.model.id.in_(filter(None, statement_ids.values()))
+        )
+        statements = {
+            statement.id: statement for statement in cls._db.session.scalars(query)
+        }
+        return {
+            transaction_date: statements.get(statement_ids[issue_date])
+            for transaction_date, issue_date in issue_dates.items()
+        }
+
+    @classmethod
+    def get_statement_calendar(cls, card_id):
+        """
+        Get the calendar of statements issued for a card.
+
+        The calendar is loaded with a single query and then reused until
+        data is next written to the database (by this process or, since
+        it is keyed by the version of the user's data, any other). The
+        data version itself is read at most once per request, so finding
+        a statement in a cached calendar requires no further queries.
+
+        Parameters
+        ----------
+        card_id : int
+            The ID of the credit card for which to get the calendar.
+
+        Returns
+        -------
+        calendar : StatementCalendar
+            The calendar of statements issued for the card.
+        """
+        key = (
+            "statement_calendar",
+            cls.user_id,
+            DataVersionHandler.get_version(),
+            card_id,
+        )
+        return cls._db.cache_until_write(key, lambda: StatementCalendar.load(card_id))
+
+    @classmethod
+    def _bulk_add_statements(cls, card, issue_dates):
+        """Add statements (issued on each date) in one insert, returning IDs."""
+        query = CreditCard.select_for_user(CreditCard.id).where(
+            CreditCard.id == card.id
+        )
+        if cls._db.session.scalar(query) is None:
+            abort(404, f"The card with ID {card.id} does not exist for the user.")
+        due_day = card.account.statement_due_day
+        statements_data = [
+            {
+                "card_id": card.id,
+                "issue_date": issue_date,
+                "due_date": get_next_occurrence_of_day(due_day, issue_date),
+            }
+            for issue_date in issue_dates
+        ]
+        query = insert(cls.table).returning(
+            cls.table.c.id, sort_by_parameter_order=True
+        )
+        return cls._db.session.scalars(query, statements_data).all()
 
     @classmethod
-    @DatabaseViewHandler.view_query
     def get_prior_statement(cls, statement):
         """
         Given a statement, get the immediately preceding statement.
 
+        The preceding statement is located using the card's statement
+        calendar, so that the statement view is only queried when a
+        preceding statement exists.
+
         Parameters
         ----------
         statement : database.models.CreditStatement
@@ -161,10 +376,15 @@ class CreditStatementHandler(
         Returns
         -------
         statement : database.models.CreditStatementView
-            The statement immediately preceding the given statement.
+            The statement immediately preceding the given statement. If
+            no preceding statement exists, returns `None`.
         """
         issue_date = statement.issue_date + relativedelta(months=-1)
-        return cls.find_statement(statement.card.id, issue_date=issue_date)
+        calendar = cls.get_statement_calendar(statement.card_id)
+        statement_id = calendar.find_statement_id(issue_date)
+        if statement_id is None:
+            return None
+        return cls.get_entry(statement_id)
 
     @classmethod
     def add_statement(cls, card, issue_date, due_date=None):
@@ -194,4 +414,7 @@ class CreditStatementHandler(
         entry_id : int
             The ID of the statement to be deleted.
         """
+        CreditTransactionHandler.update_spending_rollups(
+            [CreditStatement.id == entry_id], remove=True
+        )
         super().delete_entry(entry_id)
@@ -2,12 +2,16 @@
 Tools for interacting with the credit transactions in the database.
 """
 
-from dry_foundation.database.handler import DatabaseViewHandler
-
 from ...common.forms.utils import execute_on_form_validation
-from ...common.transactions import TransactionHandler, TransactionTagHandler
+from ...common.transactions import (
+    TransactionHandler,
+    TransactionTagHandler,
+    warn_of_duplicate,
+)
+from ...database.handler import DatabaseViewHandler
 from ...database.models import (
     CreditCard,
+    CreditStatement,
     CreditSubtransaction,
     CreditTransaction,
     CreditTransactionView,
@@ -32,6 +36,9 @@ class CreditTransactionHandler(
         The name of the database table that this handler manages.
     """
 
+    _parent_model = CreditStatement
+    _parent_field = "statement_id"
+
     @classmethod
     @DatabaseViewHandler.view_query
     def get_transactions(
@@ -91,6 +98,40 @@ class CreditTransactionHandler(
         )
         return transactions
 
+    @classmethod
+    def aggregate_categories(
+        cls, statement_ids=None, card_ids=None, start_date=None, end_date=None
+    ):
+        """
+        Aggregate credit transaction subtotals by category.
+
+        Parameters
+        ----------
+        statement_ids : tuple of int, optional
+            A sequence of statement IDs with which to filter
+            transactions (if `None`, all statement IDs will be included).
+        card_ids : tuple of int, optional
+            A sequence of card IDs with which to filter transactions (if
+            `None`, all card IDs will be included).
+        start_date, end_date : datetime.date, optional
+            The earliest and latest transaction dates (inclusive) of the
+            transactions to be aggregated.
+
+        Returns
+        -------
+        categories : RootCategoryTree
+            A tree-like structure of transaction categories, including
+            nested subcategories and subtotals at each level.
+        """
+        criteria = []
+        if statement_ids is not None:
+            criteria.append(cls._model.statement_id.in_(statement_ids))
+        if card_ids is not None:
+            criteria.append(CreditStatement.card_id.in_(card_ids))
+        return cls._aggregate_categories(
+            criteria, start_date=start_date, end_date=end_date
+        )
+
     @classmethod
     @DatabaseViewHandler.view_query
     def get_merchants(cls):
@@ -130,17 +171,22 @@ class CreditTransactionHandler(
         """
         return super().add_entry(**field_values)
 
-    @staticmethod
-    def _prepare_subtransaction(transaction, subtransaction_data):
+    @classmethod
+    def _prepare_subtransaction(cls, transaction, subtransaction_data):
         """Prepare a subtransaction for the given transaction."""
         # NOTE I don't believe that this adds new tags to the database
         tag_names = subtransaction_data.pop("tags")
         return CreditSubtransaction(
             transaction_id=transaction.id,
             **subtransaction_data,
-            tags=CreditTagHandler.get_tags(tag_names, ancestors=True),
+            tags=cls._get_subtransaction_tags(tag_names),
         )
 
+    @staticmethod
+    def _get_subtransaction_tags(tag_names):
+        """Get the tags (and their ancestors) for a subtransaction."""
+        return CreditTagHandler.get_tags(tag_names, ancestors=True)
+
 
 class CreditTagHandler(TransactionTagHandler, model=TransactionTagHandler.model):
     """
@@ -255,5 +301,7 @@ def save_transaction(form, transaction_id=None):
         )
     else:
         # Insert the new transaction into the database
+        duplicate = CreditTransactionHandler.find_duplicate(**transaction_data)
         transaction = CreditTransactionHandler.add_entry(**transaction_data)
+        warn_of_duplicate(duplicate)
     return transaction
@@ -7,6 +7,8 @@ from pathlib import Path
 from flask import current_app
 from werkzeug.utils import secure_filename
 
+from ....common.money import Money
+
 
 class TransactionActivities(UserList):
     """
@@ -44,7 +46,7 @@ class TransactionActivities(UserList):
                     "Dates must be native `datetime.date` objects or strings given in "
                     "the form 'YYYY-MM-DD'."
                 )
-        return activity_cls(transaction_date, total, description)
+        return activity_cls(transaction_date, Money(total), description)
 
     @property
     def total(self):
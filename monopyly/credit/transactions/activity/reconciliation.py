@@ -3,16 +3,22 @@ Tools for reconciling credit transactions with associated activity data.
 """
 
 from abc import ABC, abstractmethod
-from collections import UserDict
+from collections import UserDict, defaultdict
 from datetime import timedelta
 from itertools import chain, combinations
 
 from nltk import wordpunct_tokenize
 from nltk.metrics.distance import jaccard_distance
 
+from ....common.money import Money
 from .data import TransactionActivityGroup
 
 
+def _cents(amount):
+    # Compare monetary amounts exactly, as integer numbers of cents
+    return Money(amount).cents
+
+
 class MatchFinder(ABC):
     """An abstract base class for finding transaction-activity matches."""
 
@@ -37,6 +43,28 @@ class MatchFinder(ABC):
         matches = [row for row in data if cls.is_match(transaction, row)]
         return matches
 
+    @classmethod
+    def find_all(cls, transactions, data):
+        """
+        Find potential matches for each transaction in the data.
+
+        Parameters
+        ----------
+        transactions : list
+            The transactions to use when finding potential matches.
+        data : TransactionActivities
+            The data to search for potential matches.
+
+        Returns
+        -------
+        matches : dict
+            A mapping between each transaction and the full set of
+            activities that may match that transaction.
+        """
+        return {
+            transaction: cls.find(transaction, data) for transaction in transactions
+        }
+
     @abstractmethod
     def is_match(cls, transaction, activity):
         raise NotImplementedError("Define what constitutes a match in a subclass.")
@@ -52,12 +80,25 @@ class ExactMatchFinder(MatchFinder):
     transaction date and same transaction total/amount.
     """
 
+    @classmethod
+    def find_all(cls, transactions, data):
+        # Index the activities by date and amount to avoid a pairwise search
+        index = defaultdict(list)
+        for activity in data:
+            index[cls._match_key(activity)].append(activity)
+        return {
+            transaction: list(index.get(cls._match_key(transaction), []))
+            for transaction in transactions
+        }
+
     @classmethod
     def is_match(cls, transaction, activity):
         """Evaluate whether the activity is an "exact" match."""
-        same_date = transaction.transaction_date == activity.transaction_date
-        same_amount = transaction.total == activity.total
-        return same_date and same_amount
+        return cls._match_key(transaction) == cls._match_key(activity)
+
+    @staticmethod
+    def _match_key(item):
+        return item.transaction_date, _cents(item.total)
 
 
 class NearMatchFinder(MatchFinder):
@@ -83,7 +124,7 @@ class NearMatchFinder(MatchFinder):
         near_date = cls._is_near_date(transaction, activity)
         near_amount = cls._is_near_amount(transaction, activity)
         less_near_date = cls._is_near_date(transaction, activity, proximity_days=2)
-        exact_amount = transaction.total == activity.total
+        exact_amount = _cents(transaction.total) == _cents(activity.total)
         return (near_date and near_amount) or (less_near_date and exact_amount)
 
     @classmethod
@@ -94,12 +135,17 @@ class NearMatchFinder(MatchFinder):
 
     @classmethod
     def _is_near_amount(cls, transaction, activity):
+        # Compare tenths of cents, so that the 10% margin is an exact integer
+        activity_amount = 10 * _cents(activity.total)
+        transaction_amount = 10 * _cents(transaction.total)
         # Ensure that the low amount is fixed at zero for small magnitudes
-        sign = 1 if activity.total >= 0 else -1
-        total_magnitude = abs(activity.total)
-        low_amount = sign * min(max(0, total_magnitude - 3), total_magnitude * 0.9)
-        high_amount = sign * max(total_magnitude + 3, total_magnitude * 1.1)
-        return low_amount <= transaction.total <= high_amount
+        sign = 1 if activity_amount >= 0 else -1
+        total_magnitude = abs(activity_amount)
+        low_amount = sign * min(
+            max(0, total_magnitude - 3000), total_magnitude // 10 * 9
+        )
+        high_amount = sign * max(total_magnitude + 3000, total_magnitude // 10 * 11)
+        return low_amount <= transaction_amount <= high_amount
 
 
 class _Matchmaker(ABC):
@@ -142,7 +188,7 @@ class _Matchmaker(ABC):
     def match_discrepancies(self):
         def _match_has_discrepancy(item):
             transaction, activity = item
-            return transaction.total != activity.total
+            return _cents(transaction.total) != _cents(activity.total)
 
         return dict(filter(_match_has_discrepancy, self.best_matches.items()))
 
@@ -312,10 +358,7 @@ class ExactMatchmaker(_Matchmaker):
 
     def __init__(self, transactions, activities, best_matches=None):
         super().__init__(transactions, activities, best_matches=best_matches)
-        matches = {
-            transaction: self._match_finder.find(transaction, activities)
-            for transaction in transactions
-        }
+        matches = self._match_finder.find_all(transactions, activities)
         self._assign_unambiguous_best_matches(matches)
         self._disambiguate_best_matches(matches)
 
@@ -365,10 +408,7 @@ class NearMatchmaker(_Matchmaker):
 
     def __init__(self, transactions, activities, best_matches=None):
         super().__init__(transactions, activities, best_matches=best_matches)
-        matches = {
-            transaction: self._match_finder.find(transaction, activities)
-            for transaction in transactions
-        }
+        matches = self._match_finder.find_all(transactions, activities)
         self._assign_unambiguous_best_matches(matches)
         self._disambiguate_best_matches(matches)
 
@@ -439,11 +479,11 @@ class ActivityMatchmaker(_Matchmaker):
         potential_activity_groups = self._gather_potential_activity_groups(
             transaction.transaction_date
         )
+        transaction_cents = _cents(transaction.total)
         for group in potential_activity_groups:
             for group_subset in self._get_group_subsets(group):
-                if (
-                    sum(activity.total for activity in group_subset)
-                    == transaction.total
+                if sum(_cents(activity.total) for activity in group_subset) == (
+                    transaction_cents
                 ):
                     self.best_matches.pair(
                         transaction, TransactionActivityGroup(group_subset)
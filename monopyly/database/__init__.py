@@ -2,14 +2,126 @@
 Expose commonly used database functionality to the rest of the package.
 """
 
+from collections import OrderedDict
 from pathlib import Path
 
 from dry_foundation.database import SQLAlchemy as _SQLAlchemy
-from flask import current_app
+from flask import current_app, g, has_request_context
+from sqlalchemy import event, select, true
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 
 class SQLAlchemy(_SQLAlchemy):
-    """Store an interface to SQLAlchemy database objects."""
+    """
+    Store an interface to SQLAlchemy database objects.
+
+    In addition to the standard interface, this tracks writes made to
+    the database through its sessions, so that values derived from the
+    database may be cached until the data changes (see `cache_until_write`).
+    At most `write_cache_size` values are cached at once, with the least
+    recently used values discarded first.
+    Each write also increments the data version of the user making the
+    change (or of every user, for writes made outside of a request), as
+    part of the same database transaction.
+    """
+
+    write_cache_size = 1000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._write_cache = OrderedDict()
+        self.write_count = 0
+
+    def setup_engine(self, db_path, echo_engine=None):
+        """
+        Setup the database engine, a session factory, and metadata.
+
+        Parameters
+        ----------
+        db_path : os.PathLike
+            The path to the local database.
+        """
+        super().setup_engine(db_path, echo_engine=echo_engine)
+        self._track_writes(self.scoped_session.session_factory)
+
+    def _track_writes(self, session_factory):
+        # Clear cached values whenever a session writes data (and once that
+        # write is either committed or rolled back)
+        @event.listens_for(session_factory, "after_flush")
+        def _record_flush(session, flush_context):
+            if session.new or session.dirty or session.deleted:
+                self._record_write(session)
+
+        @event.listens_for(session_factory, "do_orm_execute")
+        def _record_execution(orm_execute_state):
+            state = orm_execute_state
+            if state.is_insert or state.is_update or state.is_delete:
+                self._record_write(state.session)
+
+        @event.listens_for(session_factory, "after_commit")
+        @event.listens_for(session_factory, "after_rollback")
+        def _record_completion(session):
+            if session.info.pop("pending_writes", False):
+                self._write_cache.clear()
+                self.write_count += 1
+
+    def _record_write(self, session):
+        self._write_cache.clear()
+        self.write_count += 1
+        # Increment data versions once per transaction
+        if not session.info.get("pending_writes"):
+            session.info["pending_writes"] = True
+            self._increment_data_versions(session.connection())
+
+    def _increment_data_versions(self, connection):
+        users_table = self.tables["users"]
+        versions_table = self.tables["data_versions"]
+        if has_request_context():
+            if not g.get("user"):
+                return
+            user_ids = select(users_table.c.id).where(users_table.c.id == g.user.id)
+        else:
+            user_ids = select(users_table.c.id).where(true())
+        query = (
+            sqlite_insert(versions_table)
+            .from_select(
+                ["user_id", "version"],
+                user_ids.add_columns(1),
+            )
+            .on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={"version": versions_table.c.version + 1},
+            )
+        )
+        connection.execute(query)
+
+    def cache_until_write(self, key, compute):
+        """
+        Get a value derived from the database, computing it if necessary.
+
+        Parameters
+        ----------
+        key : hashable
+            A key uniquely identifying the value (including any user
+            for whom the value is computed).
+        compute : callable
+            A function (taking no arguments) used to compute the value
+            when no value is cached.
+
+        Returns
+        -------
+        value :
+            The cached value, which remains cached until the next time
+            that data is written to the database.
+        """
+        try:
+            self._write_cache.move_to_end(key)
+            return self._write_cache[key]
+        except KeyError:
+            value = self._write_cache[key] = compute()
+            while len(self._write_cache) > self.write_cache_size:
+                self._write_cache.popitem(last=False)
+            return value
 
     def initialize(self, app):
         """
@@ -39,5 +151,17 @@ class SQLAlchemy(_SQLAlchemy):
                 with current_app.open_resource(sql_filepath) as sql_file:
                     raw_conn.executescript(sql_file.read().decode("utf8"))
             raw_conn.close()
+            # Summarize (and hash) any preloaded transactions
+            self._build_derived_data()
         # Top level initialization does not overwrite tables, so it goes at the end
         super().initialize(app)
+
+    def _build_derived_data(self):
+        # Import handlers here, since they require the database models
+        from ..core.rollups import TRANSACTION_HANDLERS, SpendingRollupHandler
+
+        with self.session.begin():
+            SpendingRollupHandler.rebuild_rollups(all_users=True)
+            for handler in TRANSACTION_HANDLERS:
+                handler.update_content_hashes([])
+        self.close()
@@ -0,0 +1,134 @@
+"""
+Database handlers that avoid refetching entries within a request.
+"""
+
+from dry_foundation.database.handler import DatabaseHandler as _DatabaseHandler
+from dry_foundation.database.handler import (
+    DatabaseViewHandler as _DatabaseViewHandler,
+)
+from flask import current_app, g, has_request_context
+
+
+class EntryMap:
+    """
+    A request-scoped map of entries retrieved from the database.
+
+    Entries are identified by their model, primary key, and the user
+    for whom they were retrieved. The map is only valid until the next
+    time data is written to the database (or a transaction ends), or
+    until the database session is replaced, at which point it is
+    emptied.
+
+    Attributes
+    ----------
+    hits : int
+        The number of entries found in the map (i.e., the number of
+        duplicate database queries avoided).
+    misses : int
+        The number of entries that had to be retrieved from the database.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._state = None
+
+    def get(self, key, retrieve):
+        """
+        Get an entry from the map, retrieving it if necessary.
+
+        Parameters
+        ----------
+        key : tuple
+            A key (model, ID, and user) uniquely identifying the entry.
+        retrieve : callable
+            A function (taking no arguments) that retrieves the entry
+            from the database when it is not already in the map.
+
+        Returns
+        -------
+        entry : database.models.Model
+            The entry matching the key.
+        """
+        self._refresh()
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            entry = self._entries[key] = retrieve()
+        else:
+            self.hits += 1
+        return entry
+
+    def _refresh(self):
+        # Discard all entries when data has been written since they were retrieved
+        db = current_app.db
+        state = (db.session, db.write_count)
+        if state != self._state:
+            self._entries.clear()
+            self._state = state
+
+
+def get_entry_map():
+    """Get the entry map for the current request (creating it if necessary)."""
+    if "entry_map" not in g:
+        g.entry_map = EntryMap()
+    return g.entry_map
+
+
+class EntryMapMixin:
+    """
+    A mixin for database handlers to reuse entries within a request.
+
+    Entries retrieved by ID (using `get_entry`) are stored in a map for
+    the current request, so that subsequent calls for the same entry
+    (by the same user) reuse the previously retrieved entry rather than
+    querying the database again. The map is emptied whenever data is
+    written to the database.
+    """
+
+    @classmethod
+    def get_entry(cls, entry_id):
+        """
+        Retrieve a single entry from the database.
+
+        Executes a simple query from the database to get a single entry
+        by its primary key (most often its ID), unless that entry has
+        already been retrieved during the current request.
+
+        Parameters
+        ----------
+        entry_id : int
+            The primary key (ID) of the entry to be found.
+
+        Returns
+        -------
+        entry : database.models.Model
+            A model containing a matching entry from the database.
+        """
+        retrieve = super().get_entry
+        if not (has_request_context() and g.get("user")):
+            return retrieve(entry_id)
+        # View handlers always retrieve entries from the view
+        model = getattr(cls, "_model_view", cls.model)
+        key = (model, entry_id, g.user.id)
+        return get_entry_map().get(key, lambda: retrieve(entry_id))
+
+
+class DatabaseHandler(EntryMapMixin, _DatabaseHandler):
+    """
+    A database handler for managing database entries.
+
+    This extends the standard handler, reusing entries that have already
+    been retrieved (by ID) during the current request.
+    """
+
+
+class DatabaseViewHandler(EntryMapMixin, _DatabaseViewHandler):
+    """
+    A database handler for managing database entries (and their views).
+
+    This extends the standard view handler, reusing entries that have
+    already been retrieved (by ID) during the current request.
+    """
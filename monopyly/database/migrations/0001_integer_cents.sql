@@ -0,0 +1,44 @@
+/*
+ * Store subtransaction subtotals as integer numbers of cents (rather than as
+ * floating point numbers of dollars)
+ */
+
+/* Drop views referencing the rebuilt tables (views are recreated afterwards) */
+DROP VIEW IF EXISTS bank_accounts_view;
+DROP VIEW IF EXISTS bank_transactions_view;
+DROP VIEW IF EXISTS credit_transactions_view;
+DROP VIEW IF EXISTS credit_statements_view;
+
+
+/* Rebuild the bank subtransactions table */
+CREATE TABLE bank_subtransactions_migration (
+  id INTEGER PRIMARY KEY,
+  transaction_id INTEGER NOT NULL REFERENCES bank_transactions (id)
+    ON DELETE CASCADE,
+  subtotal INTEGER NOT NULL, -- cents
+  note TEXT NOT NULL
+);
+
+INSERT INTO bank_subtransactions_migration (id, transaction_id, subtotal, note)
+SELECT id, transaction_id, CAST(ROUND(subtotal * 100) AS INTEGER), note
+  FROM bank_subtransactions;
+
+DROP TABLE bank_subtransactions;
+ALTER TABLE bank_subtransactions_migration RENAME TO bank_subtransactions;
+
+
+/* Rebuild the credit subtransactions table */
+CREATE TABLE credit_subtransactions_migration (
+  id INTEGER PRIMARY KEY,
+  transaction_id INTEGER NOT NULL REFERENCES credit_transactions (id)
+    ON DELETE CASCADE,
+  subtotal INTEGER NOT NULL, -- cents
+  note TEXT NOT NULL
+);
+
+INSERT INTO credit_subtransactions_migration (id, transaction_id, subtotal, note)
+SELECT id, transaction_id, CAST(ROUND(subtotal * 100) AS INTEGER), note
+  FROM credit_subtransactions;
+
+DROP TABLE credit_subtransactions;
+ALTER TABLE credit_subtransactions_migration RENAME TO credit_subtransactions;
@@ -0,0 +1,40 @@
+/*
+ * Add a table of monthly spending subtotals by tag, populated from the
+ * existing transactions
+ */
+
+/* Store monthly spending subtotals by tag (maintained by the application) */
+CREATE TABLE spending_rollups (
+  user_id INTEGER NOT NULL REFERENCES users (id)
+    ON DELETE CASCADE,
+  month TEXT NOT NULL, -- YYYY-MM
+  tag_id INTEGER NOT NULL REFERENCES transaction_tags (id)
+    ON DELETE CASCADE,
+  source TEXT NOT NULL
+    CHECK(source IN ('bank', 'credit')),
+  total INTEGER NOT NULL, -- cents
+  count INTEGER NOT NULL,
+  PRIMARY KEY (user_id, month, tag_id, source)
+);
+
+INSERT INTO spending_rollups (user_id, month, tag_id, source, total, count)
+SELECT b.user_id, STRFTIME('%Y-%m', t.transaction_date), l.tag_id, 'bank',
+       SUM(s.subtotal), COUNT(s.id)
+  FROM bank_subtransactions AS s
+       INNER JOIN bank_tag_links AS l ON l.subtransaction_id = s.id
+       INNER JOIN bank_transactions AS t ON t.id = s.transaction_id
+       INNER JOIN bank_accounts AS a ON a.id = t.account_id
+       INNER JOIN banks AS b ON b.id = a.bank_id
+ GROUP BY b.user_id, STRFTIME('%Y-%m', t.transaction_date), l.tag_id;
+
+INSERT INTO spending_rollups (user_id, month, tag_id, source, total, count)
+SELECT b.user_id, STRFTIME('%Y-%m', t.transaction_date), l.tag_id, 'credit',
+       SUM(s.subtotal), COUNT(s.id)
+  FROM credit_subtransactions AS s
+       INNER JOIN credit_tag_links AS l ON l.subtransaction_id = s.id
+       INNER JOIN credit_transactions AS t ON t.id = s.transaction_id
+       INNER JOIN credit_statements AS st ON st.id = t.statement_id
+       INNER JOIN credit_cards AS c ON c.id = st.card_id
+       INNER JOIN credit_accounts AS a ON a.id = c.account_id
+       INNER JOIN banks AS b ON b.id = a.bank_id
+ GROUP BY b.user_id, STRFTIME('%Y-%m', t.transaction_date), l.tag_id;
@@ -0,0 +1,10 @@
+/*
+ * Add a table tracking the version of each user's data
+ */
+
+/* Track a version for each user's data (incremented with every write) */
+CREATE TABLE data_versions (
+  user_id INTEGER PRIMARY KEY REFERENCES users (id)
+    ON DELETE CASCADE,
+  version INTEGER NOT NULL DEFAULT 0
+);
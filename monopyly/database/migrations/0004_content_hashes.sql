@@ -0,0 +1,12 @@
+/*
+ * Add (indexed) content hashes to transactions for identifying duplicates
+ *
+ * Hashes are computed by the application, and so existing transactions
+ * are given hashes by the migration command after this script is run.
+ */
+
+ALTER TABLE bank_transactions ADD COLUMN content_hash TEXT;
+CREATE INDEX bank_transactions_content_hash ON bank_transactions (content_hash);
+
+ALTER TABLE credit_transactions ADD COLUMN content_hash TEXT;
+CREATE INDEX credit_transactions_content_hash ON credit_transactions (content_hash);
@@ -0,0 +1,146 @@
+/*
+ * Add a full-text search index of transaction merchants and notes,
+ * populated from the existing transactions
+ */
+
+CREATE INDEX bank_subtransactions_transaction_id ON bank_subtransactions (transaction_id);
+CREATE INDEX credit_subtransactions_transaction_id ON credit_subtransactions (transaction_id);
+
+/*
+ * Index transaction merchants and (subtransaction) notes for full-text search
+ *   - each row represents one transaction, where bank transactions use even
+ *     row IDs (twice the transaction ID) and credit transactions use odd row
+ *     IDs (twice the transaction ID, plus one)
+ *   - rows are maintained by triggers on the transaction tables
+ */
+CREATE VIRTUAL TABLE transaction_search USING fts5(
+  merchant,
+  notes,
+  tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER bank_transactions_search_insert
+AFTER INSERT ON bank_transactions
+BEGIN
+  INSERT INTO transaction_search (rowid, merchant)
+  VALUES (NEW.id * 2, NEW.merchant);
+END;
+
+CREATE TRIGGER bank_transactions_search_update
+AFTER UPDATE OF merchant ON bank_transactions
+BEGIN
+  UPDATE transaction_search
+     SET merchant = NEW.merchant
+   WHERE rowid = NEW.id * 2;
+END;
+
+CREATE TRIGGER bank_transactions_search_delete
+AFTER DELETE ON bank_transactions
+BEGIN
+  DELETE FROM transaction_search WHERE rowid = OLD.id * 2;
+END;
+
+CREATE TRIGGER bank_subtransactions_search_insert
+AFTER INSERT ON bank_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM bank_subtransactions
+                   WHERE transaction_id = NEW.transaction_id)
+   WHERE rowid = NEW.transaction_id * 2;
+END;
+
+CREATE TRIGGER bank_subtransactions_search_update
+AFTER UPDATE OF transaction_id, note ON bank_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM bank_subtransactions
+                   WHERE transaction_id = OLD.transaction_id)
+   WHERE rowid = OLD.transaction_id * 2;
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM bank_subtransactions
+                   WHERE transaction_id = NEW.transaction_id)
+   WHERE rowid = NEW.transaction_id * 2;
+END;
+
+CREATE TRIGGER bank_subtransactions_search_delete
+AFTER DELETE ON bank_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM bank_subtransactions
+                   WHERE transaction_id = OLD.transaction_id)
+   WHERE rowid = OLD.transaction_id * 2;
+END;
+
+CREATE TRIGGER credit_transactions_search_insert
+AFTER INSERT ON credit_transactions
+BEGIN
+  INSERT INTO transaction_search (rowid, merchant)
+  VALUES (NEW.id * 2 + 1, NEW.merchant);
+END;
+
+CREATE TRIGGER credit_transactions_search_update
+AFTER UPDATE OF merchant ON credit_transactions
+BEGIN
+  UPDATE transaction_search
+     SET merchant = NEW.merchant
+   WHERE rowid = NEW.id * 2 + 1;
+END;
+
+CREATE TRIGGER credit_transactions_search_delete
+AFTER DELETE ON credit_transactions
+BEGIN
+  DELETE FROM transaction_search WHERE rowid = OLD.id * 2 + 1;
+END;
+
+CREATE TRIGGER credit_subtransactions_search_insert
+AFTER INSERT ON credit_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM credit_subtransactions
+                   WHERE transaction_id = NEW.transaction_id)
+   WHERE rowid = NEW.transaction_id * 2 + 1;
+END;
+
+CREATE TRIGGER credit_subtransactions_search_update
+AFTER UPDATE OF transaction_id, note ON credit_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM credit_subtransactions
+                   WHERE transaction_id = OLD.transaction_id)
+   WHERE rowid = OLD.transaction_id * 2 + 1;
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM credit_subtransactions
+                   WHERE transaction_id = NEW.transaction_id)
+   WHERE rowid = NEW.transaction_id * 2 + 1;
+END;
+
+CREATE TRIGGER credit_subtransactions_search_delete
+AFTER DELETE ON credit_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM credit_subtransactions
+                   WHERE transaction_id = OLD.transaction_id)
+   WHERE rowid = OLD.transaction_id * 2 + 1;
+END;
+
+INSERT INTO transaction_search (rowid, merchant, notes)
+SELECT t.id * 2, t.merchant,
+       (SELECT GROUP_CONCAT(note, ' ')
+          FROM bank_subtransactions
+         WHERE transaction_id = t.id)
+  FROM bank_transactions AS t;
+
+INSERT INTO transaction_search (rowid, merchant, notes)
+SELECT t.id * 2 + 1, t.merchant,
+       (SELECT GROUP_CONCAT(note, ' ')
+          FROM credit_subtransactions
+         WHERE transaction_id = t.id)
+  FROM credit_transactions AS t;
@@ -0,0 +1,12 @@
+/*
+ * Index transactions by their parent entry and date, and tag links by tag,
+ * for filtering transactions
+ */
+
+CREATE INDEX bank_transactions_account_id_date
+  ON bank_transactions (account_id, transaction_date);
+CREATE INDEX credit_transactions_statement_id_date
+  ON credit_transactions (statement_id, transaction_date);
+
+CREATE INDEX bank_tag_links_tag_id ON bank_tag_links (tag_id);
+CREATE INDEX credit_tag_links_tag_id ON credit_tag_links (tag_id);
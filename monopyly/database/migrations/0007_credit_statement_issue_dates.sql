@@ -0,0 +1,7 @@
+/*
+ * Index credit statements by card and issue date, for finding statements
+ * without computing their balances
+ */
+
+CREATE INDEX credit_statements_card_id_issue_date
+  ON credit_statements (card_id, issue_date);
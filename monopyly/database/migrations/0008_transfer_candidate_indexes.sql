@@ -0,0 +1,9 @@
+/*
+ * Index transactions by their internal transaction and date, for finding
+ * recent unlinked transactions that may be transfers
+ */
+
+CREATE INDEX bank_transactions_internal_transaction_id_date
+  ON bank_transactions (internal_transaction_id, transaction_date);
+CREATE INDEX credit_transactions_internal_transaction_id_date
+  ON credit_transactions (internal_transaction_id, transaction_date);
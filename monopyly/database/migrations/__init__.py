@@ -0,0 +1,114 @@
+"""
+Tools for migrating existing databases to the current schema.
+
+Each migration is a SQL script in this directory, prefixed by the schema
+version that it produces (e.g., `0001_integer_cents.sql`). The schema
+version of a database is tracked using SQLite's `user_version` pragma,
+and newly initialized databases are given the latest version directly
+by the schema.
+"""
+
+from pathlib import Path
+
+import click
+from dry_foundation.database import echo_db_info
+from flask import current_app
+from flask.cli import with_appcontext
+
+MIGRATIONS_DIR = Path(__file__).parent
+VIEWS_PATH = MIGRATIONS_DIR.parent / "views.sql"
+
+
+def get_migrations():
+    """
+    Get the available migration scripts.
+
+    Returns
+    -------
+    migrations : list
+        A list of `(version, path)` pairs, one for each migration
+        script, ordered by the schema version the migration produces.
+    """
+    return sorted(
+        (int(path.name.split("_", 1)[0]), path) for path in MIGRATIONS_DIR.glob("*.sql")
+    )
+
+
+def get_schema_version(raw_conn):
+    """Get the schema version recorded by the database."""
+    return raw_conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate_database(raw_conn):
+    """
+    Apply any pending migrations to the database.
+
+    Migrations are applied in order, each in its own transaction that
+    also records the new schema version. Since migrations may rebuild
+    tables, foreign key enforcement is disabled while they run (so that
+    dropping a table does not cascade to its dependents), and the views
+    are recreated once all migrations are complete.
+
+    Parameters
+    ----------
+    raw_conn : sqlite3.Connection
+        A raw connection to the database to be migrated.
+
+    Returns
+    -------
+    applied_versions : list
+        The schema versions produced by each migration that was applied.
+    """
+    current_version = get_schema_version(raw_conn)
+    pending_migrations = [
+        (version, path)
+        for version, path in get_migrations()
+        if version > current_version
+    ]
+    if pending_migrations:
+        raw_conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            for version, path in pending_migrations:
+                _apply_migration(raw_conn, version, path.read_text())
+            raw_conn.executescript(VIEWS_PATH.read_text())
+        finally:
+            raw_conn.execute("PRAGMA foreign_keys = ON")
+    return [version for version, _ in pending_migrations]
+
+
+def _apply_migration(raw_conn, version, script):
+    try:
+        raw_conn.executescript(
+            f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;"
+        )
+    except Exception:
+        raw_conn.rollback()
+        raise
+
+
+@click.command("migrate-db")
+@with_appcontext
+def migrate_db_command():
+    """Migrate the database from the command line (if it is out of date)."""
+    echo_db_info("Migrating the database...")
+    raw_conn = current_app.db.engine.raw_connection()
+    try:
+        applied_versions = migrate_database(raw_conn)
+    finally:
+        raw_conn.close()
+    if applied_versions:
+        _update_content_hashes()
+        echo_db_info(f"Migrated the database to version {applied_versions[-1]}")
+    else:
+        echo_db_info("Database is up to date")
+
+
+def _update_content_hashes():
+    # Content hashes are computed by the application, rather than by SQL scripts
+    from ...core.rollups import TRANSACTION_HANDLERS
+
+    db = current_app.db
+    with db.session.begin():
+        for handler in TRANSACTION_HANDLERS:
+            handler.update_content_hashes([handler.table.c.content_hash.is_(None)])
+    db.close()
@@ -1,9 +1,42 @@
 import datetime
 
-from dry_foundation.database.models import AuthorizedAccessMixin, Model
-from sqlalchemy import Column, ForeignKey, Integer, Table
+from dry_foundation.database.models import (
+    AuthorizedAccessMixin as _AuthorizedAccessMixin,
+)
+from dry_foundation.database.models import Model
+from sqlalchemy import Column, ForeignKey, Integer, Table, select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from ..common.money import Money
+from .types import Cents
+
+
+class AuthorizedAccessMixin(_AuthorizedAccessMixin):
+    """A mixin class to facilitate making user-restricted queries."""
+
+    @classmethod
+    def select_for_all_users(cls, *args, **kwargs):
+        """
+        Build a select query joining a model to its user, for all users.
+
+        Parameters
+        ----------
+        *args :
+            The arguments to pass to the `sqlalchemy.select` function.
+            If no arguments are given, the query selects the model.
+        **kwargs :
+            Keyword arguments to pass to the `sqlalchemy.select` function.
+
+        Returns
+        -------
+        query : sqlalchemy.sql.Select
+            The query, including the joins linking the model to a user
+            (but without restricting results to only the current user).
+        """
+        return cls._join_user(
+            select(*args, **kwargs) if args else select(cls, **kwargs)
+        )
+
 
 class User(Model):
     __tablename__ = "users"
@@ -168,8 +201,8 @@ class BankAccountView(AuthorizedAccessMixin, Model):
     )
     last_four_digits: Mapped[str]
     active: Mapped[int]
-    balance: Mapped[float]
-    projected_balance: Mapped[float]
+    balance: Mapped[Money] = mapped_column(Cents)
+    projected_balance: Mapped[Money] = mapped_column(Cents)
     # Relationships
     account: Mapped["BankAccount"] = relationship(back_populates="view")
     bank: Mapped["Bank"] = relationship(back_populates="bank_account_views")
@@ -194,6 +227,7 @@ class BankTransaction(AuthorizedAccessMixin, Model):
     account_id: Mapped[int] = mapped_column(ForeignKey("bank_accounts_view.id"))
     transaction_date: Mapped[datetime.date]
     merchant: Mapped[str | None]
+    content_hash: Mapped[str | None]
     #  Relationships
     view: Mapped["BankTransactionView"] = relationship(
         back_populates="transaction", uselist=False, viewonly=True
@@ -218,9 +252,9 @@ class BankTransactionView(AuthorizedAccessMixin, Model):
     account_id: Mapped[int] = mapped_column(ForeignKey("bank_accounts_view.id"))
     transaction_date: Mapped[datetime.date]
     merchant: Mapped[str | None]
-    total: Mapped[float]
+    total: Mapped[Money] = mapped_column(Cents)
     notes: Mapped[str | None]
-    balance: Mapped[float]
+    balance: Mapped[Money] = mapped_column(Cents)
     # Relationships
     transaction: Mapped["BankTransaction"] = relationship(back_populates="view")
     internal_transaction: Mapped["InternalTransaction"] = relationship(
@@ -240,7 +274,7 @@ class BankSubtransaction(AuthorizedAccessMixin, Model):
     # Columns
     id: Mapped[int] = mapped_column(primary_key=True)
     transaction_id: Mapped[int] = mapped_column(ForeignKey("bank_transactions_view.id"))
-    subtotal: Mapped[float]
+    subtotal: Mapped[Money] = mapped_column(Cents)
     note: Mapped[str]
     # Relationships
     transaction_view: Mapped["BankTransactionView"] = relationship(
@@ -308,7 +342,7 @@ class CreditStatementView(AuthorizedAccessMixin, Model):
     card_id: Mapped[int] = mapped_column(ForeignKey("credit_cards.id"))
     issue_date: Mapped[datetime.date]
     due_date: Mapped[datetime.date]
-    balance: Mapped[float]
+    balance: Mapped[Money] = mapped_column(Cents)
     payment_date: Mapped[datetime.date]
     # Relationships
     statement: Mapped["CreditStatement"] = relationship(back_populates="view")
@@ -331,6 +365,7 @@ class CreditTransaction(AuthorizedAccessMixin, Model):
     statement_id: Mapped[int] = mapped_column(ForeignKey("credit_statements_view.id"))
     transaction_date: Mapped[datetime.date]
     merchant: Mapped[str]
+    content_hash: Mapped[str | None]
     # Relationships
     view: Mapped["CreditTransactionView"] = relationship(
         back_populates="transaction", uselist=False, viewonly=True
@@ -355,7 +390,7 @@ class CreditTransactionView(AuthorizedAccessMixin, Model):
     statement_id: Mapped[int] = mapped_column(ForeignKey("credit_statements_view.id"))
     transaction_date: Mapped[datetime.date]
     merchant: Mapped[str]
-    total: Mapped[float]
+    total: Mapped[Money] = mapped_column(Cents)
     notes: Mapped[str]
     # Relationships
     transaction: Mapped["CreditTransaction"] = relationship(
@@ -386,7 +421,7 @@ class CreditSubtransaction(AuthorizedAccessMixin, Model):
     transaction_id: Mapped[int] = mapped_column(
         ForeignKey("credit_transactions_view.id")
     )
-    subtotal: Mapped[float]
+    subtotal: Mapped[Money] = mapped_column(Cents)
     note: Mapped[str]
     # Relationships
     transaction_view: Mapped["CreditTransactionView"] = relationship(
@@ -403,3 +438,25 @@ class CreditSubtransaction(AuthorizedAccessMixin, Model):
         # Categorizable if no conflicting tags of the same depth exist
         tag_depths = [tag.depth for tag in self.tags]
         return len(tag_depths) == len(set(tag_depths))
+
+
+class SpendingRollup(AuthorizedAccessMixin, Model):
+    __tablename__ = "spending_rollups"
+    # Columns
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    month: Mapped[str] = mapped_column(primary_key=True)
+    tag_id: Mapped[int] = mapped_column(
+        ForeignKey("transaction_tags.id"), primary_key=True
+    )
+    source: Mapped[str] = mapped_column(primary_key=True)
+    total: Mapped[Money] = mapped_column(Cents)
+    count: Mapped[int]
+    # Relationships
+    tag: Mapped["TransactionTag"] = relationship()
+
+
+class DataVersion(AuthorizedAccessMixin, Model):
+    __tablename__ = "data_versions"
+    # Columns
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    version: Mapped[int]
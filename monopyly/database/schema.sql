@@ -13,6 +13,9 @@ DROP TABLE IF EXISTS credit_statements;
 DROP TABLE IF EXISTS credit_transactions;
 DROP TABLE IF EXISTS credit_subtransactions;
 DROP TABLE IF EXISTS credit_tag_links;
+DROP TABLE IF EXISTS spending_rollups;
+DROP TABLE IF EXISTS data_versions;
+DROP TABLE IF EXISTS transaction_search;
 
 
 /* Store user information */
@@ -80,19 +83,28 @@ CREATE TABLE bank_transactions (
   account_id INTEGER NOT NULL REFERENCES bank_accounts (id)
     ON DELETE CASCADE,
   transaction_date DATE NOT NULL,
-  merchant TEXT
+  merchant TEXT,
+  content_hash TEXT -- identifies duplicates (maintained by the application)
 );
 
+CREATE INDEX bank_transactions_content_hash ON bank_transactions (content_hash);
+CREATE INDEX bank_transactions_account_id_date
+  ON bank_transactions (account_id, transaction_date);
+CREATE INDEX bank_transactions_internal_transaction_id_date
+  ON bank_transactions (internal_transaction_id, transaction_date);
+
 
 /* Store bank subtransaction infromation */
 CREATE TABLE bank_subtransactions (
   id INTEGER PRIMARY KEY,
   transaction_id INTEGER NOT NULL REFERENCES bank_transactions (id)
     ON DELETE CASCADE,
-  subtotal REAL NOT NULL,
+  subtotal INTEGER NOT NULL, -- cents
   note TEXT NOT NULL
 );
 
+CREATE INDEX bank_subtransactions_transaction_id ON bank_subtransactions (transaction_id);
+
 
 /* Associate bank transactions with tags in a link table */
 CREATE TABLE bank_tag_links (
@@ -103,6 +115,8 @@ CREATE TABLE bank_tag_links (
   PRIMARY KEY (subtransaction_id, tag_id)
 );
 
+CREATE INDEX bank_tag_links_tag_id ON bank_tag_links (tag_id);
+
 
 /* Store credit account information */
 CREATE TABLE credit_accounts (
@@ -136,6 +150,9 @@ CREATE TABLE credit_statements (
   due_date DATE NOT NULL
 );
 
+CREATE INDEX credit_statements_card_id_issue_date
+  ON credit_statements (card_id, issue_date);
+
 
 /* Store credit card transaction information */
 CREATE TABLE credit_transactions (
@@ -144,19 +161,28 @@ CREATE TABLE credit_transactions (
   statement_id INTEGER NOT NULL REFERENCES credit_statements (id)
     ON DELETE CASCADE,
   transaction_date DATE NOT NULL,
-  merchant TEXT NOT NULL
+  merchant TEXT NOT NULL,
+  content_hash TEXT -- identifies duplicates (maintained by the application)
 );
 
+CREATE INDEX credit_transactions_content_hash ON credit_transactions (content_hash);
+CREATE INDEX credit_transactions_statement_id_date
+  ON credit_transactions (statement_id, transaction_date);
+CREATE INDEX credit_transactions_internal_transaction_id_date
+  ON credit_transactions (internal_transaction_id, transaction_date);
+
 
 /* Store subtransaction breakdown of transaction */
 CREATE TABLE credit_subtransactions (
   id INTEGER PRIMARY KEY,
   transaction_id INTEGER NOT NULL REFERENCES credit_transactions (id)
     ON DELETE CASCADE,
-  subtotal REAL NOT NULL,
+  subtotal INTEGER NOT NULL, -- cents
   note TEXT NOT NULL
 );
 
+CREATE INDEX credit_subtransactions_transaction_id ON credit_subtransactions (transaction_id);
+
 
 /* Associate credit transactions with tags in a link table */
 CREATE TABLE credit_tag_links (
@@ -167,3 +193,157 @@ CREATE TABLE credit_tag_links (
   PRIMARY KEY (subtransaction_id, tag_id)
 );
 
+CREATE INDEX credit_tag_links_tag_id ON credit_tag_links (tag_id);
+
+
+/* Store monthly spending subtotals by tag (maintained by the application) */
+CREATE TABLE spending_rollups (
+  user_id INTEGER NOT NULL REFERENCES users (id)
+    ON DELETE CASCADE,
+  month TEXT NOT NULL, -- YYYY-MM
+  tag_id INTEGER NOT NULL REFERENCES transaction_tags (id)
+    ON DELETE CASCADE,
+  source TEXT NOT NULL
+    CHECK(source IN ('bank', 'credit')),
+  total INTEGER NOT NULL, -- cents
+  count INTEGER NOT NULL,
+  PRIMARY KEY (user_id, month, tag_id, source)
+);
+
+
+/* Track a version for each user's data (incremented with every write) */
+CREATE TABLE data_versions (
+  user_id INTEGER PRIMARY KEY REFERENCES users (id)
+    ON DELETE CASCADE,
+  version INTEGER NOT NULL DEFAULT 0
+);
+
+
+/*
+ * Index transaction merchants and (subtransaction) notes for full-text search
+ *   - each row represents one transaction, where bank transactions use even
+ *     row IDs (twice the transaction ID) and credit transactions use odd row
+ *     IDs (twice the transaction ID, plus one)
+ *   - rows are maintained by triggers on the transaction tables
+ */
+CREATE VIRTUAL TABLE transaction_search USING fts5(
+  merchant,
+  notes,
+  tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER bank_transactions_search_insert
+AFTER INSERT ON bank_transactions
+BEGIN
+  INSERT INTO transaction_search (rowid, merchant)
+  VALUES (NEW.id * 2, NEW.merchant);
+END;
+
+CREATE TRIGGER bank_transactions_search_update
+AFTER UPDATE OF merchant ON bank_transactions
+BEGIN
+  UPDATE transaction_search
+     SET merchant = NEW.merchant
+   WHERE rowid = NEW.id * 2;
+END;
+
+CREATE TRIGGER bank_transactions_search_delete
+AFTER DELETE ON bank_transactions
+BEGIN
+  DELETE FROM transaction_search WHERE rowid = OLD.id * 2;
+END;
+
+CREATE TRIGGER bank_subtransactions_search_insert
+AFTER INSERT ON bank_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM bank_subtransactions
+                   WHERE transaction_id = NEW.transaction_id)
+   WHERE rowid = NEW.transaction_id * 2;
+END;
+
+CREATE TRIGGER bank_subtransactions_search_update
+AFTER UPDATE OF transaction_id, note ON bank_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM bank_subtransactions
+                   WHERE transaction_id = OLD.transaction_id)
+   WHERE rowid = OLD.transaction_id * 2;
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM bank_subtransactions
+                   WHERE transaction_id = NEW.transaction_id)
+   WHERE rowid = NEW.transaction_id * 2;
+END;
+
+CREATE TRIGGER bank_subtransactions_search_delete
+AFTER DELETE ON bank_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM bank_subtransactions
+                   WHERE transaction_id = OLD.transaction_id)
+   WHERE rowid = OLD.transaction_id * 2;
+END;
+
+CREATE TRIGGER credit_transactions_search_insert
+AFTER INSERT ON credit_transactions
+BEGIN
+  INSERT INTO transaction_search (rowid, merchant)
+  VALUES (NEW.id * 2 + 1, NEW.merchant);
+END;
+
+CREATE TRIGGER credit_transactions_search_update
+AFTER UPDATE OF merchant ON credit_transactions
+BEGIN
+  UPDATE transaction_search
+     SET merchant = NEW.merchant
+   WHERE rowid = NEW.id * 2 + 1;
+END;
+
+CREATE TRIGGER credit_transactions_search_delete
+AFTER DELETE ON credit_transactions
+BEGIN
+  DELETE FROM transaction_search WHERE rowid = OLD.id * 2 + 1;
+END;
+
+CREATE TRIGGER credit_subtransactions_search_insert
+AFTER INSERT ON credit_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM credit_subtransactions
+                   WHERE transaction_id = NEW.transaction_id)
+   WHERE rowid = NEW.transaction_id * 2 + 1;
+END;
+
+CREATE TRIGGER credit_subtransactions_search_update
+AFTER UPDATE OF transaction_id, note ON credit_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM credit_subtransactions
+                   WHERE transaction_id = OLD.transaction_id)
+   WHERE rowid = OLD.transaction_id * 2 + 1;
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM credit_subtransactions
+                   WHERE transaction_id = NEW.transaction_id)
+   WHERE rowid = NEW.transaction_id * 2 + 1;
+END;
+
+CREATE TRIGGER credit_subtransactions_search_delete
+AFTER DELETE ON credit_subtransactions
+BEGIN
+  UPDATE transaction_search
+     SET notes = (SELECT GROUP_CONCAT(note, ' ')
+                    FROM credit_subtransactions
+                   WHERE transaction_id = OLD.transaction_id)
+   WHERE rowid = OLD.transaction_id * 2 + 1;
+END;
+
+
+/* Record the schema version (used when migrating existing databases) */
+PRAGMA user_version = 8;
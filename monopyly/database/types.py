@@ -0,0 +1,26 @@
+"""
+Custom column types used by the database models.
+"""
+
+from sqlalchemy import Integer
+from sqlalchemy.types import TypeDecorator
+
+from ..common.money import Money
+
+
+class Cents(TypeDecorator):
+    """
+    A column type for monetary amounts stored as integer numbers of cents.
+
+    Values are bound to the database as integer numbers of cents and
+    are returned to Python as `Money` objects.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else Money(value).cents
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else Money.from_cents(round(value))
@@ -1,5 +1,8 @@
 /*
  * Views enabling enhanced database functionality without additional overhead
+ *
+ * (All monetary amounts are integer numbers of cents, and so they are
+ * aggregated exactly, without rounding.)
  */
 DROP VIEW IF EXISTS bank_account_types_view;
 DROP VIEW IF EXISTS bank_accounts_view;
@@ -21,7 +24,7 @@ CREATE VIEW bank_transactions_view AS
 WITH view AS (
   SELECT
     t.*,
-    ROUND(SUM(subtotal), 2) total,
+    SUM(subtotal) total,
     GROUP_CONCAT(note, '; ') notes
   FROM bank_transactions AS t
     LEFT OUTER JOIN bank_subtransactions AS s_t
@@ -30,10 +33,7 @@ WITH view AS (
 )
 SELECT
   view.*,
-  ROUND(
-    SUM(total) OVER (PARTITION BY account_id ORDER BY transaction_date, id),
-    2
-  ) balance
+  SUM(total) OVER (PARTITION BY account_id ORDER BY transaction_date, id) balance
 FROM view;
 
 
@@ -41,11 +41,11 @@ FROM view;
 CREATE VIEW bank_accounts_view AS
 SELECT
   a.*,
-  ROUND(COALESCE(
+  COALESCE(
       SUM(CASE WHEN t.transaction_date <= DATE('now', 'localtime') THEN t.total END),
       0
-  ), 2) balance,
-  ROUND(COALESCE(SUM(t.total), 0), 2) projected_balance
+  ) balance,
+  COALESCE(SUM(t.total), 0) projected_balance
 FROM bank_accounts AS a
   LEFT OUTER JOIN bank_transactions_view AS t
     ON t.account_id = a.id
@@ -56,7 +56,7 @@ GROUP BY a.id;
 CREATE VIEW credit_transactions_view AS
 SELECT
   t.*,
-  ROUND(SUM(subtotal), 2) total,
+  SUM(subtotal) total,
   GROUP_CONCAT(note, '; ') notes
 FROM credit_transactions AS t
   LEFT OUTER JOIN credit_subtransactions AS s_t
@@ -76,28 +76,28 @@ WITH view AS (
       c.account_id,
       t.transaction_date,
       /* Determine the balance on an account for each statement */
-      ROUND(COALESCE(
+      COALESCE(
         SUM(subtotals) OVER (PARTITION BY account_id ORDER BY issue_date),
         0
-      ), 2) statement_balance,
+      ) statement_balance,
       /* Determine the total charges on an account for each statement */
-      ROUND(COALESCE(
+      COALESCE(
         SUM(charges) OVER (PARTITION BY account_id ORDER BY issue_date),
         0
-      ), 2) statement_charge_total,
+      ) statement_charge_total,
       /* Determine the total payments on an account for each transaction */
-      ROUND(COALESCE(
+      COALESCE(
         SUM(payments)
         OVER (PARTITION BY account_id ORDER BY transaction_date),
         0
-      ), 2) daily_payment_total
+      ) daily_payment_total
       FROM (
         SELECT
           statement_id,
           transaction_date,
           SUM(subtotal) subtotals,
-          CASE WHEN ROUND(SUM(subtotal), 2) >= 0 THEN SUM(subtotal) END charges,
-          CASE WHEN ROUND(SUM(subtotal), 2) < 0 THEN SUM(subtotal) END payments
+          CASE WHEN SUM(subtotal) >= 0 THEN SUM(subtotal) END charges,
+          CASE WHEN SUM(subtotal) < 0 THEN SUM(subtotal) END payments
         FROM credit_transactions
           INNER JOIN credit_subtransactions
             ON credit_subtransactions.transaction_id = credit_transactions.id
@@ -127,7 +127,7 @@ FROM credit_statements s
       /* Only compare balances for a single account */
       v1.account_id = v2.account_id
       /* Get times where payments offset charges */
-      AND ROUND(v1.statement_charge_total + v2.daily_payment_total, 2) <= 0
+      AND v1.statement_charge_total + v2.daily_payment_total <= 0
     ORDER BY v1.transaction_date
   ) v2
     ON v2.id = s.id
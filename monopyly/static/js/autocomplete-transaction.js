@@ -3,9 +3,9 @@
  *
  * When entering a transaction, provide autocomplete suggestions to the user.
  * The suggestions are pulled from the database for the field being input
- * using an AJAX request. They are ordered (on the server side) by their
- * occurrence frequency and then filtered here by the current input text after
- * the input field is changed.
+ * using an AJAX request each time the input changes. The server returns only
+ * the most frequent suggestions matching the current input text, which are
+ * then displayed here.
  */
 
 import { AutocompleteBox } from './modules/autocomplete-input.js';
@@ -79,12 +79,18 @@ class TagAutocompleteBox extends AutocompleteBox {
     this.inputElement.value = tagArray.join(",");
   }
 
+  /**
+   * Get the last input tag (the only tag to be autocompleted).
+   */
+  autocompleteSegment(userInput) {
+    return this.#separateTags(userInput).pop().trim();
+  }
+
   /**
    * Refesh autocomplete suggestions using only the last input tag.
    */
   refreshMatches(userInput) {
-    const autocompleteSegment = this.#separateTags(userInput).pop().trim();
-    super.refreshMatches(autocompleteSegment);
+    super.refreshMatches(this.autocompleteSegment(userInput));
   }
 
   #separateTags(userInput) {
@@ -1,9 +1,11 @@
 /*
  * Prepare a line graph of balances using the `chartist.js` library.
  *
- * Creates a chart using data (provided in the HTML template) for bank
- * balances over time. Data (x, y) pairs  are passed in as timestamps
- * calculated as seconds since the epoch and dollar values.
+ * Creates a chart using data (requested from the server) for bank
+ * balances over time. The server limits the number of points in the
+ * chart, downsampling the balances of accounts with long histories.
+ * Data (x, y) pairs  are passed in as timestamps calculated as seconds
+ * since the epoch and dollar values.
  */
 
 
@@ -42,12 +44,15 @@ function createBalanceChart(data) {
   if (showDay) {
     dateOptions.day = "numeric";
   }
-  // Use the data to determine the maximum y-value
+  // Use the data to determine the y-value limits (allowing negative balances)
   const balances = dataPoints.map(point => point.y);
   const maxBalance = Math.max(...balances);
-  const magnitudeOrderExponent = Math.floor(Math.log10(maxBalance));
+  const minBalance = Math.min(0, ...balances);
+  const balanceRange = Math.max(maxBalance, -minBalance);
+  const magnitudeOrderExponent = Math.floor(Math.log10(balanceRange));
   const magnitudeOrder = Math.pow(10, magnitudeOrderExponent);
   const yLimit = Math.ceil(1.25*maxBalance/magnitudeOrder)*magnitudeOrder;
+  const yLowerLimit = Math.floor(1.25*minBalance/magnitudeOrder)*magnitudeOrder;
 
   let smoothLine = true;
   if (timestamps.length > 100) {
@@ -65,7 +70,7 @@ function createBalanceChart(data) {
     axisY: {
       type: Chartist.FixedScaleAxis,
       divisor: yAxisDivisor,
-      low: 0,
+      low: yLowerLimit,
       high: yLimit,
       labelInterpolationFnc: function(value) {
         return "$" + value.toLocaleString();
@@ -79,6 +84,6 @@ function createBalanceChart(data) {
 
 (function() {
 
-  createBalanceChart(BALANCE_CHART_DATA);
+  $.getJSON(BALANCE_CHART_ENDPOINT, createBalanceChart);
 
 })();
@@ -0,0 +1,50 @@
+/*
+ * Prepare a line graph of spending over time using the `chartist.js` library.
+ *
+ * Creates a chart using data (requested from the server) for the
+ * monthly spending in each top-level category. The chart is reloaded
+ * whenever the range of months or the source of transactions changes.
+ */
+
+
+function createSpendingChart(data) {
+
+  const tagNames = Object.keys(data.totals);
+  const chartData = {
+    labels: data.months,
+    series: tagNames.map(tagName => ({name: tagName, data: data.totals[tagName]})),
+  };
+  const options = {
+    showPoint: data.months.length <= 24,
+    axisY: {
+      labelInterpolationFnc: function(value) {
+        return "$" + value.toLocaleString();
+      },
+    },
+  };
+  new Chartist.LineChart("#spending-chart", chartData, options);
+  // Label each series in the legend (matching the Chartist series classes)
+  const $legend = $("#spending-chart-legend");
+  $legend.empty();
+  tagNames.forEach((tagName, index) => {
+    const seriesLetter = String.fromCharCode(97 + (index % 26));
+    $("<li>").addClass(`ct-series-${seriesLetter}`).text(tagName).appendTo($legend);
+  });
+
+}
+
+
+function loadSpendingChart() {
+
+  const filters = $("#spending-filters").serializeArray().filter(item => item.value);
+  $.getJSON(SPENDING_OVER_TIME_ENDPOINT, $.param(filters), createSpendingChart);
+
+}
+
+
+(function() {
+
+  loadSpendingChart();
+  $("#spending-filters").on("change", loadSpendingChart);
+
+})();
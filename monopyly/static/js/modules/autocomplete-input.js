@@ -31,10 +31,11 @@ class AutocompleteBox {
   // A box for displaying autocomplete suggestions
   defaultBoxSize = 10;
   defaultBoxStartIndex = 0;
+  suggestionLimit = 50;
   $inputElements = $('form input');
   boxTags = '<div class="autocomplete-box"></div>';
   matches;
-  response;
+  response = [];
   currentFocus;
 
   constructor(inputElement) {
@@ -62,13 +63,30 @@ class AutocompleteBox {
   }
 
   ajaxRequest(endpoint, rawData) {
-    // Execute an AJAX request to find matches
-    executeAjaxRequest(endpoint, rawData, this.load_response.bind(this));
+    // Set the AJAX request used to find matches (as the user types)
+    this.endpoint = endpoint;
+    this.rawData = rawData;
   }
 
   update() {
-    // Update the box (opening or closing it if necessary)
+    // Request suggestions matching the current input (limited in number)
     const userInput = this.inputElement.value;
+    const rawData = {
+      ...this.rawData,
+      'prefix': this.autocompleteSegment(userInput),
+      'limit': this.suggestionLimit
+    };
+    executeAjaxRequest(this.endpoint, rawData, (response) => {
+      // Ignore responses for input that has since changed
+      if (this.inputElement.value == userInput) {
+        this.load_response(response);
+        this.#updateBox(userInput);
+      }
+    });
+  }
+
+  #updateBox(userInput) {
+    // Update the box (opening or closing it if necessary)
     if (this.#needsRefresh(userInput)) {
       if (!this.$boxElement) {
         this.open();
@@ -153,6 +171,13 @@ class AutocompleteBox {
     }
   }
 
+  /**
+   * Get the segment of the user input to be autocompleted.
+   */
+  autocompleteSegment(userInput) {
+    return userInput;
+  }
+
   /**
    * Refresh autocomplete suggestions using the AJAX response.
    */
@@ -1,11 +1,15 @@
 """Tests for user authentication."""
 
+from unittest.mock import Mock
+
 import pytest
 from dry_foundation.testing import transaction_lifetime
 from flask import g, session
-from sqlalchemy import select
+from sqlalchemy import select, text
 from werkzeug.security import check_password_hash
 
+from monopyly.auth.actions import UserCache, get_password_stamp
+
 
 @transaction_lifetime
 def test_registration(app, client, user_table):
@@ -94,3 +98,58 @@ def test_change_password(app, client, authorization, current_password):
         password = new_password if current_password == "MONOPYLY" else "MONOPYLY"
         user = app.db.session.merge(g.user)
         assert check_password_hash(user.password, password)
+        # Check that the session remains valid (with a refreshed cache)
+        client.get("/")
+        assert session["user_id"] == 3
+        assert g.user.username == "mr.monopyly"
+
+
+def test_logged_in_user_cached(app, client, authorization):
+    with client:
+        client.get("/")
+        user = g.user
+        client.get("/")
+        assert g.user is user
+
+
+@transaction_lifetime
+def test_logged_in_user_other_process_write(app, client, authorization):
+    with client:
+        client.get("/")
+        user = g.user
+        # Simulate a write by another process (e.g., changing the password)
+        with app.db.session.begin():
+            app.db.session.execute(
+                text("UPDATE data_versions SET version = version + 1 WHERE user_id = 3")
+            )
+        client.get("/")
+        assert g.user is not user
+        assert g.user.id == 3
+
+
+def test_logged_in_user_stale_password(app, client, authorization):
+    with client:
+        client.get("/")
+        with client.session_transaction() as client_session:
+            client_session["password_stamp"] = "outdated"
+        # Sessions established with a different password are ended
+        client.get("/")
+        assert g.user is None
+        assert "user_id" not in session
+
+
+def test_user_cache():
+    user_cache = UserCache(max_size=2)
+    users = [Mock(id=_, password=f"password{_}") for _ in range(3)]
+    for user in users:
+        user_cache.add(user, 1)
+    assert len(user_cache) == 2
+    # The least recently used user was evicted
+    assert user_cache.get(0, get_password_stamp(users[0]), 1) is None
+    assert user_cache.get(1, get_password_stamp(users[1]), 1) is users[1]
+    # Users are not returned when the password does not match
+    assert user_cache.get(2, get_password_stamp(users[1]), 1) is None
+    # Users are not returned when their data has since changed
+    assert user_cache.get(2, get_password_stamp(users[2]), 2) is None
+    user_cache.discard(2)
+    assert len(user_cache) == 1
@@ -13,6 +13,7 @@ from monopyly.banking.accounts import (
     BankAccountTypeHandler,
     save_account,
 )
+from monopyly.banking.transactions import BankTransactionHandler
 from monopyly.database.models import (
     BankAccountType,
     BankAccountTypeView,
@@ -241,6 +242,54 @@ class TestBankAccountHandler(TestHandler):
         balance = account_handler.get_bank_balance(bank_id)
         assert balance == expected_balance
 
+    @pytest.mark.parametrize(
+        ("account_ids", "expected_balances"),
+        [
+            (None, [-24.21, -24.21, 234.69]),
+            ((2,), [85.00, 385.00, 443.90]),
+            ((2, 3), [-24.21, -24.21, 34.69]),
+            ((1,), []),  # the account user is not the logged in user
+        ],
+    )
+    def test_get_balance_index(self, account_handler, account_ids, expected_balances):
+        balance_index = account_handler.get_balance_index(account_ids)
+        balances = balance_index.balances_between()
+        assert [balance for _, balance in balances] == expected_balances
+        if balances:
+            assert balances[0].transaction_date == date(2020, 5, 4)
+
+    def test_get_balance_index_reused(self, account_handler):
+        balance_index = account_handler.get_balance_index((2,))
+        assert account_handler.get_balance_index((2,)) is balance_index
+        # The index is rebuilt once the user's data changes
+        BankTransactionHandler.bulk_add_entries(
+            [
+                {
+                    "account_id": 2,
+                    "transaction_date": date(2020, 5, 7),
+                    "merchant": "Electric Company",
+                    "subtransactions": [
+                        {"subtotal": -43.90, "note": "Power", "tags": []}
+                    ],
+                }
+            ]
+        )
+        balance_index = account_handler.get_balance_index((2,))
+        assert balance_index.balance_at(date(2020, 5, 7)) == 400.00
+
+    @pytest.mark.parametrize(
+        ("account_id", "on_date", "expected_balance"),
+        [
+            (2, date(2020, 5, 3), 0),
+            (2, date(2020, 5, 5), 385.00),
+            (3, date(2020, 5, 4), -109.21),
+            (3, None, -409.21),
+        ],
+    )
+    def test_get_balance(self, account_handler, account_id, on_date, expected_balance):
+        balance = account_handler.get_balance(account_id, on_date=on_date)
+        assert balance == expected_balance
+
     @pytest.mark.parametrize(
         ("bank_id", "exception"),
         [
@@ -1,6 +1,6 @@
 """Tests for the actions performed by the banking blueprint."""
 
-from datetime import date
+from datetime import date, timedelta
 from unittest.mock import Mock, call, patch
 
 import pytest
@@ -79,3 +79,56 @@ def test_get_balance_chart_data_duplicate_dates(
     for i, point in enumerate(data["series"][0]["data"]):
         assert point["x"] == mock_timestamps[i] + offsets.get(i, 0)
         assert point["y"] == mock_transactions[i].balance
+
+
+def _mock_daily_transactions(start_date, days):
+    return [
+        Mock(transaction_date=start_date + timedelta(days=i), balance=i)
+        for i in range(days)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("days", "max_points", "expected_balances"),
+    [
+        # Under budget (no downsampling)
+        (10, 10, list(range(10))),
+        # Weekly aggregation (2020-01-06 begins a week)
+        (14, 5, [6, 13]),
+        # Monthly aggregation
+        (91, 5, [25, 54, 85, 90]),
+    ],
+)
+def test_get_balance_chart_data_aggregated(days, max_points, expected_balances):
+    mock_transactions = _mock_daily_transactions(date(2020, 1, 6), days)
+    data = get_balance_chart_data(mock_transactions, max_points=max_points)
+    balances = [point["y"] for point in data["series"][0]["data"]]
+    assert balances == expected_balances
+
+
+def test_get_balance_chart_data_daily_aggregation():
+    mock_transactions = [
+        Mock(transaction_date=date(2020, 1, 1), balance=100),
+        Mock(transaction_date=date(2020, 1, 1), balance=200),
+        Mock(transaction_date=date(2020, 1, 2), balance=300),
+    ]
+    data = get_balance_chart_data(mock_transactions, max_points=2)
+    assert data["series"][0]["data"] == [
+        {"x": 1577836800000 + 86_400_000 / 2, "y": 200},
+        {"x": 1577923200000, "y": 300},
+    ]
+
+
+def test_get_balance_chart_data_lttb():
+    mock_transactions = _mock_daily_transactions(date(2000, 1, 1), 3650)
+    # Add a spike that should be preserved by the downsampling
+    mock_transactions[1000].balance = 1_000_000
+    data = get_balance_chart_data(mock_transactions, max_points=50)
+    points = data["series"][0]["data"]
+    assert len(points) == 50
+    balances = [point["y"] for point in points]
+    assert balances[0] == 0
+    assert balances[-1] == 3649
+    assert 1_000_000 in balances
+    timestamps = [point["x"] for point in points]
+    assert timestamps == sorted(timestamps)
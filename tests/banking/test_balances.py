@@ -0,0 +1,76 @@
+"""Tests for the bank account balance index."""
+
+from datetime import date
+
+import pytest
+
+from monopyly.banking.balances import BalanceIndex, DailyBalance
+
+
+@pytest.fixture
+def balance_index():
+    daily_totals = [
+        (date(2020, 5, 4), 10.00),
+        (date(2020, 5, 6), 20.50),
+        (date(2020, 5, 10), -5.25),
+    ]
+    return BalanceIndex(daily_totals)
+
+
+class TestBalanceIndex:
+    def test_initialization(self, balance_index):
+        assert len(balance_index) == 3
+        assert len(BalanceIndex([])) == 0
+
+    @pytest.mark.parametrize(
+        ("on_date", "expected_balance"),
+        [
+            (date(2020, 5, 1), 0),
+            (date(2020, 5, 4), 10.00),
+            (date(2020, 5, 5), 10.00),
+            (date(2020, 5, 6), 30.50),
+            (date(2020, 5, 31), 25.25),
+        ],
+    )
+    def test_balance_at(self, balance_index, on_date, expected_balance):
+        balance = balance_index.balance_at(on_date)
+        assert balance == expected_balance
+        assert balance.cents == round(expected_balance * 100)
+
+    @pytest.mark.parametrize(
+        ("start_date", "end_date", "expected_balances"),
+        [
+            (
+                None,
+                None,
+                [
+                    DailyBalance(date(2020, 5, 4), 10.00),
+                    DailyBalance(date(2020, 5, 6), 30.50),
+                    DailyBalance(date(2020, 5, 10), 25.25),
+                ],
+            ),
+            (
+                date(2020, 5, 6),
+                date(2020, 5, 9),
+                [DailyBalance(date(2020, 5, 6), 30.50)],
+            ),
+            # The opening balance is included when the start is between changes
+            (
+                date(2020, 5, 5),
+                None,
+                [
+                    DailyBalance(date(2020, 5, 5), 10.00),
+                    DailyBalance(date(2020, 5, 6), 30.50),
+                    DailyBalance(date(2020, 5, 10), 25.25),
+                ],
+            ),
+            (date(2020, 6, 1), None, [DailyBalance(date(2020, 6, 1), 25.25)]),
+            (None, date(2020, 5, 1), []),
+            (date(2020, 5, 7), date(2020, 5, 5), []),
+        ],
+    )
+    def test_balances_between(
+        self, balance_index, start_date, end_date, expected_balances
+    ):
+        balances = balance_index.balances_between(start_date, end_date)
+        assert balances == expected_balances
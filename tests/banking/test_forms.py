@@ -5,9 +5,12 @@ from unittest.mock import Mock, patch
 
 import pytest
 from dry_foundation.testing.helpers import unit_test_case
+from flask import g
 from flask_wtf import FlaskForm
+from sqlalchemy import text
 from wtforms.fields import FormField
 
+from monopyly.banking.banks import BankHandler
 from monopyly.banking.forms import (
     BankAccountForm,
     BankAccountTypeSelectField,
@@ -47,6 +50,29 @@ class TestBankSelectField:
         form = self.SampleForm()
         assert form.bank_id.choices == expected_choices
 
+    def test_prepare_bank_choices_cached(self, client_context):
+        choices = self.SampleForm().bank_id.choices
+        with patch.object(BankHandler, "get_entries") as mock_method:
+            assert self.SampleForm().bank_id.choices == choices
+            mock_method.assert_not_called()
+            # Writing data invalidates the cached choices
+            BankHandler.add_entry(user_id=3, bank_name="Bank of Monopoly")
+            mock_method.return_value = []
+            assert self.SampleForm().bank_id.choices == [(-1, "-"), (0, "New bank")]
+        BankHandler._db.session.rollback()
+
+    def test_prepare_bank_choices_other_process_write(self, client_context):
+        self.SampleForm()
+        # Simulate a write by another process (untracked by this process's cache)
+        BankHandler._db.session.execute(
+            text("UPDATE data_versions SET version = version + 1 WHERE user_id = 3")
+        )
+        # Start a new request (in which the data version is read again)
+        g.pop("data_version")
+        with patch.object(BankHandler, "get_entries", return_value=[]):
+            assert self.SampleForm().bank_id.choices == [(-1, "-"), (0, "New bank")]
+        BankHandler._db.session.rollback()
+
 
 class TestBankAccountTypeSelectField:
     class SampleForm(FlaskForm):
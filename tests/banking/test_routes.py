@@ -1,7 +1,7 @@
 """Tests for routes in the banking blueprint."""
 
 import json
-from datetime import date
+from datetime import date, timedelta
 from unittest.mock import patch
 
 import pytest
@@ -18,6 +18,7 @@ class TestBankingRoutes(TestRoutes):
         # 2 banks for the user, with 3 total accounts
         assert self.tag_count_is_equal(2, "div", class_="bank-stack")
         assert self.tag_count_is_equal(3, "div", class_="account-block")
+        assert self.div_exists(id="balance-chart")
 
     def test_add_account_get(self, authorization):
         self.get_route("/add_account")
@@ -88,8 +89,47 @@ class TestBankingRoutes(TestRoutes):
         self.tag_count_is_equal(1, "b", string="Savings")
         self.tag_count_is_equal(1, "b", string="Checking")
 
+    def test_load_account_summaries_cached(self, authorization):
+        self.get_route("/account_summaries/2")
+        # The account summaries are rendered from the fragment cache
+        with patch(
+            "monopyly.banking.routes.get_bank_account_type_grouping"
+        ) as mock_function:
+            self.get_route("/account_summaries/2")
+            mock_function.assert_not_called()
+        self.tag_count_is_equal(2, "div", class_="account-type-stack")
+
+    @transaction_lifetime
+    def test_load_account_summaries_not_modified(self, authorization):
+        response = self.get_route("/account_summaries/2")
+        etag = response.get_etag()[0]
+        # Repeated requests are not modified (and do not render the page)
+        response = self.get_route(
+            "/account_summaries/2", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert not response.data
+        # Requests after a write are rendered again
+        self.post_route("/_update_bank_name/2", json="Prison")
+        response = self.get_route(
+            "/account_summaries/2", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert self.tag_exists("h2", class_="bank", string="Prison")
+
+    def test_load_account_summaries_modified_next_day(self, authorization):
+        response = self.get_route("/account_summaries/2")
+        etag = response.get_etag()[0]
+        # Balances depend on the current date, so tags expire each day
+        with patch("monopyly.common.cache.date") as mock_date:
+            mock_date.today.return_value = date.today() + timedelta(days=1)
+            response = self.get_route(
+                "/account_summaries/2", headers={"If-None-Match": etag}
+            )
+        assert response.status_code == 200
+
     def test_load_account_details(self, authorization):
-        self.get_route("/account/2")
+        response = self.get_route("/account/2")
         assert self.page_heading_includes_substring("Account Details")
         assert self.div_exists(id="account-summary")
         # 3 transactions in the table for the account
@@ -97,8 +137,66 @@ class TestBankingRoutes(TestRoutes):
         assert self.tag_count_is_equal(3, "div", class_="transaction")
         for id_ in (2, 3, 4):
             assert self.div_exists(id=f"transaction-{id_}")
+        # Linked transactions are described in the table
+        assert b'title="Linked to Canteen (2020-05-05)"' in response.data
         assert self.div_exists(id="balance-chart")
 
+    @pytest.mark.parametrize(
+        ("query", "expected_points"),
+        [
+            (
+                "",
+                [
+                    {"x": 1588550400000, "y": 85.00},
+                    {"x": 1588636800000, "y": 385.00},
+                    {"x": 1588723200000, "y": 443.90},
+                ],
+            ),
+            (
+                "?start=2020-05-05&end=2020-05-05",
+                [{"x": 1588636800000, "y": 385.00}],
+            ),
+            # All transactions occur in the same week (keep the closing balance)
+            ("?points=2", [{"x": 1588723200000, "y": 443.90}]),
+            # Point budgets are limited to at least two points
+            ("?points=0", [{"x": 1588723200000, "y": 443.90}]),
+            ("?points=-5", [{"x": 1588723200000, "y": 443.90}]),
+        ],
+    )
+    def test_load_balance_chart_data(self, authorization, query, expected_points):
+        response = self.get_route(f"/_balance_chart_data/2{query}")
+        assert response.json["series"][0]["data"] == expected_points
+
+    @pytest.mark.parametrize(
+        ("query", "expected_date", "expected_balance"),
+        [("?date=2020-05-04", "2020-05-04", 85.00), ("", None, 443.90)],
+    )
+    def test_load_account_balance(
+        self, authorization, query, expected_date, expected_balance
+    ):
+        response = self.get_route(f"/_account_balance/2{query}")
+        assert response.json["balance"] == expected_balance
+        expected_date = expected_date or date.today().isoformat()
+        assert response.json["date"] == expected_date
+
+    @pytest.mark.parametrize(
+        ("query", "expected_points"),
+        [
+            (
+                "",
+                [
+                    {"x": 1588550400000, "y": -24.21},
+                    {"x": 1588636800000, "y": -24.21},
+                    {"x": 1588723200000, "y": 234.69},
+                ],
+            ),
+            ("?start=2020-05-06", [{"x": 1588723200000, "y": 234.69}]),
+        ],
+    )
+    def test_load_bank_balance_chart_data(self, authorization, query, expected_points):
+        response = self.get_route(f"/_bank_balance_chart_data{query}")
+        assert response.json["series"][0]["data"] == expected_points
+
     def test_load_more_card_transactions(self, authorization):
         transaction_limit = 2
         with patch("monopyly.banking.routes.TRANSACTION_LIMIT", new=transaction_limit):
@@ -151,6 +151,42 @@ class TestBankTransactionHandler(TestHandler):
         )
         self.assert_entries_match(transactions, reference_entries, order=True)
 
+    @pytest.mark.parametrize(
+        ("account_ids", "start_date", "end_date", "expected_categories"),
+        [
+            (None, None, None, {"": (343.90, 6), "Credit payments": (-109.21, 1)}),
+            ((2,), None, None, {"": (443.90, 4)}),
+            (None, date(2020, 5, 5), None, {"": (258.90, 4)}),
+            (
+                None,
+                None,
+                date(2020, 5, 4),
+                {"": (85.00, 2), "Credit payments": (-109.21, 1)},
+            ),
+        ],
+    )
+    def test_aggregate_categories(
+        self,
+        transaction_handler,
+        account_ids,
+        start_date,
+        end_date,
+        expected_categories,
+    ):
+        categories = transaction_handler.aggregate_categories(
+            account_ids, start_date=start_date, end_date=end_date
+        )
+        assert (categories.direct_subtotal, categories.count) == (
+            pytest.approx(expected_categories[""][0]),
+            sum(count for _, count in expected_categories.values()),
+        )
+        assert categories.subcategories.keys() == expected_categories.keys() - {""}
+        for name, subcategory in categories.subcategories.items():
+            assert (subcategory.subtotal, subcategory.count) == (
+                pytest.approx(expected_categories[name][0]),
+                expected_categories[name][1],
+            )
+
     @pytest.mark.parametrize(
         "mapping",
         [
@@ -220,6 +256,46 @@ class TestBankTransactionHandler(TestHandler):
         with pytest.raises(exception):
             transaction_handler.add_entry(**mapping)
 
+    def test_bulk_add_entries(self, transaction_handler):
+        mappings = [
+            {
+                "internal_transaction_id": None,
+                "account_id": 2,
+                "transaction_date": date(2022, 5, 8),
+                "merchant": "Electric Company",
+                "subtransactions": [
+                    {"subtotal": -150.00, "note": "Power", "tags": ["Electricity"]},
+                ],
+            },
+            {
+                "account_id": 3,
+                "transaction_date": date(2022, 5, 9),
+                "subtransactions": [
+                    {"subtotal": 200.00, "note": "Passed GO", "tags": []},
+                    {"subtotal": 10.00, "note": "Second prize", "tags": ["Gifts"]},
+                ],
+            },
+        ]
+        transaction_ids = transaction_handler.bulk_add_entries(mappings)
+        assert transaction_ids == [8, 9]
+        # Check that the entries were added to the database
+        transactions = [transaction_handler.get_entry(_) for _ in transaction_ids]
+        assert [_.account_id for _ in transactions] == [2, 3]
+        assert [_.merchant for _ in transactions] == ["Electric Company", None]
+        assert [_.total for _ in transactions] == [-150.00, 210.00]
+        power_subtransaction = transactions[0].subtransactions[0]
+        tag_names = sorted(tag.tag_name for tag in power_subtransaction.tags)
+        assert tag_names == ["Electricity", "Utilities"]
+
+    def test_bulk_add_entries_invalid(self, transaction_handler):
+        mapping = {
+            "account_id": 1,
+            "transaction_date": date(2022, 5, 8),
+            "subtransactions": [{"subtotal": 100.00, "note": "Test", "tags": []}],
+        }
+        with pytest.raises(NotFound):
+            transaction_handler.bulk_add_entries([mapping])
+
     @pytest.mark.parametrize(
         "mapping",
         [
@@ -259,6 +335,84 @@ class TestBankTransactionHandler(TestHandler):
             1, BankTransaction.id, BankTransaction.transaction_date == date(2022, 5, 8)
         )
 
+    def test_update_entry_subtransactions(self, transaction_handler):
+        subtransactions_data = [
+            {"subtotal": 42.00, "note": "Jail subtransaction 1", "tags": ["Gifts"]},
+        ]
+        transaction = transaction_handler.update_entry(
+            2, subtransactions=subtransactions_data
+        )
+        # Check that the first subtransaction was kept and the second removed
+        assert len(transaction.subtransactions) == 1
+        subtransaction = transaction.subtransactions[0]
+        assert subtransaction.id == 2
+        assert subtransaction.note == "Jail subtransaction 1"
+        assert [tag.tag_name for tag in subtransaction.tags] == ["Gifts"]
+        self.assert_number_of_matches(
+            0, BankSubtransaction.id, BankSubtransaction.id == 3
+        )
+
+    @pytest.mark.parametrize(
+        ("mapping", "expected_duplicate_id"),
+        [
+            (
+                {
+                    "account_id": 3,
+                    "transaction_date": date(2020, 5, 5),
+                    "merchant": " CANTEEN! ",
+                    "subtransactions": [
+                        {"subtotal": -100.00, "note": "Part 1", "tags": []},
+                        {"subtotal": -200.00, "note": "Part 2", "tags": []},
+                    ],
+                },
+                6,
+            ),
+            (
+                {
+                    "account_id": 3,
+                    "transaction_date": date(2020, 5, 6),
+                    "merchant": "Canteen",
+                    "subtransactions": [
+                        {"subtotal": -300.00, "note": "Transfer out", "tags": []},
+                    ],
+                },
+                None,
+            ),
+        ],
+    )
+    def test_find_duplicate(self, transaction_handler, mapping, expected_duplicate_id):
+        duplicate = transaction_handler.find_duplicate(**mapping)
+        duplicate_id = duplicate.id if duplicate else None
+        assert duplicate_id == expected_duplicate_id
+
+    def test_find_duplicates(self, transaction_handler):
+        assert transaction_handler.find_duplicates() == []
+        mapping = {
+            "account_id": 3,
+            "transaction_date": date(2020, 5, 5),
+            "merchant": "Canteen",
+            "subtransactions": [
+                {"subtotal": -300.00, "note": "Transfer out", "tags": []},
+            ],
+        }
+        transaction_handler.bulk_add_entries([mapping])
+        transaction_handler.add_entry(**mapping)
+        assert transaction_handler.find_duplicates() == [[6, 8, 9]]
+
+    def test_update_entry_content_hash(self, transaction_handler):
+        mapping = {
+            "account_id": 3,
+            "transaction_date": date(2020, 5, 5),
+            "merchant": "Canteen",
+            "subtransactions": [
+                {"subtotal": -300.00, "note": "Transfer out", "tags": []},
+            ],
+        }
+        transaction_handler.update_entry(6, merchant="Commissary")
+        assert transaction_handler.find_duplicate(**mapping) is None
+        mapping["merchant"] = "Commissary"
+        assert transaction_handler.find_duplicate(**mapping).id == 6
+
     @pytest.mark.parametrize(
         ("transaction_id", "mapping", "exception"),
         [
@@ -325,8 +479,12 @@ class TestSaveFormFunctions:
         mock_form.transaction_data = {"key": "test transaction data"}
         mock_form.transfer_data = None
         mock_method = mock_handler.add_entry
+        mock_handler.find_duplicate.return_value = None
         # Call the function and check for proper call signatures
         transaction = save_transaction(mock_form)
+        mock_handler.find_duplicate.assert_called_once_with(
+            **mock_form.transaction_data
+        )
         mock_method.assert_called_once_with(**mock_form.transaction_data)
         assert transaction == mock_method.return_value
 
@@ -340,6 +498,7 @@ class TestSaveFormFunctions:
         mock_form.transaction_data = {"key": "test transaction data"}
         mock_form.transfer_data = {"key": "test transfer data"}
         mock_method = mock_handler.add_entry
+        mock_handler.find_duplicate.return_value = None
         mock_transfer = mock_function.return_value
         # Mock the expected final set of transaction data
         mock_transaction_data = {
@@ -4,14 +4,21 @@ from contextlib import nullcontext as does_not_raise
 from unittest.mock import Mock, patch
 
 import pytest
+from flask import g, render_template
 from flask_wtf import FlaskForm
+from sqlalchemy import text
 from wtforms.fields import FieldList, StringField
 from wtforms.validators import ValidationError
 
 from monopyly.common.forms.utils import (
+    AUTOCOMPLETE_SUGGESTION_LIMIT,
+    AutocompleteIndex,
     execute_on_form_validation,
     extend_field_list_for_ajax,
+    get_autocomplete_search_args,
+    render_field_list_extension,
 )
+from monopyly.credit.forms import CreditTransactionForm
 
 
 class MockForm(FlaskForm):
@@ -23,6 +30,46 @@ def test_extend_field_list_for_ajax(client_context):
     assert "mock_field_list-2" in str(new_field)
 
 
+@pytest.mark.parametrize("field_list_count", [0, 1, 3])
+def test_render_field_list_extension(client_context, field_list_count):
+    template_name = "common/transaction_form/subtransaction_subform.html"
+    new_field_html = render_field_list_extension(
+        CreditTransactionForm, "subtransactions", field_list_count, template_name
+    )
+    # The field rendered from the prototype matches a directly extended field
+    new_field = extend_field_list_for_ajax(
+        CreditTransactionForm, "subtransactions", field_list_count
+    )
+    assert new_field_html == render_template(template_name, subform=new_field)
+    # The prototype is reused for subsequent requests
+    with patch.object(CreditTransactionForm, "__init__") as mock_method:
+        render_field_list_extension(
+            CreditTransactionForm, "subtransactions", field_list_count, template_name
+        )
+        mock_method.assert_not_called()
+
+
+def test_render_field_list_extension_other_process_write(app, client_context):
+    template_name = "common/transaction_form/subtransaction_subform.html"
+    render_field_list_extension(
+        CreditTransactionForm, "subtransactions", 0, template_name
+    )
+    # Simulate a write by another process (untracked by this process's cache)
+    app.db.session.execute(
+        text("UPDATE data_versions SET version = version + 1 WHERE user_id = 3")
+    )
+    # Start a new request (in which the data version is read again)
+    g.pop("data_version")
+    with patch(
+        "monopyly.common.forms.utils.render_template", wraps=render_template
+    ) as mock_method:
+        render_field_list_extension(
+            CreditTransactionForm, "subtransactions", 0, template_name
+        )
+        mock_method.assert_called()
+    app.db.session.rollback()
+
+
 @pytest.mark.parametrize(
     ("validated", "expectation"),
     [(True, does_not_raise()), (False, pytest.raises(ValidationError))],
@@ -35,3 +82,52 @@ def test_execute_on_form_validation(validated, expectation):
     wrapped_func = execute_on_form_validation(func)
     with expectation:
         wrapped_func(form)
+
+
+class TestAutocompleteIndex:
+    suggestions = ["Park Place", "Boardwalk", "Parking", "Marvin Gardens", "park"]
+
+    @pytest.fixture
+    def index(self):
+        return AutocompleteIndex(self.suggestions)
+
+    def test_initialization(self, index):
+        assert len(index) == 5
+
+    @pytest.mark.parametrize(
+        ("prefix", "limit", "expected_suggestions"),
+        [
+            ("", None, suggestions),
+            ("", 2, ["Park Place", "Boardwalk"]),
+            ("par", None, ["Park Place", "Parking", "park"]),
+            ("PARK", 2, ["Park Place", "Parking"]),
+            # Contained matches follow anchored matches
+            (
+                "ar",
+                None,
+                ["Park Place", "Boardwalk", "Parking", "Marvin Gardens", "park"],
+            ),
+            ("ark", 4, ["Park Place", "Parking", "park"]),
+            # Suggestions containing the prefix more than once appear once
+            ("a", 3, ["Park Place", "Boardwalk", "Parking"]),
+            ("k", None, ["Park Place", "Boardwalk", "Parking", "park"]),
+            ("x", None, []),
+        ],
+    )
+    def test_search(self, index, prefix, limit, expected_suggestions):
+        assert index.search(prefix, limit=limit) == expected_suggestions
+
+
+@pytest.mark.parametrize(
+    ("post_args", "expected_search_args"),
+    [
+        ({}, {"prefix": "", "limit": AUTOCOMPLETE_SUGGESTION_LIMIT}),
+        ({"prefix": "par", "limit": 5}, {"prefix": "par", "limit": 5}),
+        ({"limit": "5"}, {"prefix": "", "limit": 5}),
+        ({"limit": "many"}, {"prefix": "", "limit": AUTOCOMPLETE_SUGGESTION_LIMIT}),
+        ({"limit": -1}, {"prefix": "", "limit": 1}),
+        ({"limit": 10**6}, {"prefix": "", "limit": AUTOCOMPLETE_SUGGESTION_LIMIT}),
+    ],
+)
+def test_get_autocomplete_search_args(post_args, expected_search_args):
+    assert get_autocomplete_search_args(post_args) == expected_search_args
@@ -0,0 +1,132 @@
+"""Tests for the tools used for caching responses."""
+
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+from markupsafe import Markup
+from sqlalchemy import text
+
+from monopyly.banking.banks import BankHandler
+from monopyly.common.cache import DataVersionHandler, FragmentCache
+
+
+@pytest.fixture
+def version_handler(client_context):
+    return DataVersionHandler
+
+
+class TestDataVersionHandler:
+    def test_initialization(self, version_handler):
+        assert version_handler.table.name == "data_versions"
+        assert version_handler.user_id == 3
+
+    def test_get_version(self, version_handler):
+        version = version_handler.get_version()
+        # Writes increment the data version (once per transaction)
+        BankHandler.add_entry(user_id=3, bank_name="Bank of Monopoly")
+        assert version_handler.get_version() == version + 1
+        BankHandler.add_entry(user_id=3, bank_name="Bank of Parker Brothers")
+        assert version_handler.get_version() == version + 1
+        # Rolling back the transaction also rolls back the version
+        version_handler._db.session.rollback()
+        assert version_handler.get_version() == version
+        BankHandler.update_entry(2, bank_name="Jail (Just Visiting)")
+        assert version_handler.get_version() == version + 1
+
+    def test_get_version_read_once(self, version_handler):
+        version = version_handler.get_version()
+        with patch.object(
+            version_handler._db.session,
+            "scalar",
+            wraps=version_handler._db.session.scalar,
+        ) as mock_method:
+            # The version is only read again after data is written
+            assert version_handler.get_version() == version
+            mock_method.assert_not_called()
+            BankHandler.add_entry(user_id=3, bank_name="Bank of Monopoly")
+            assert version_handler.get_version() == version + 1
+            mock_method.assert_called_once()
+        version_handler._db.session.rollback()
+
+    def test_get_version_other_user(self, version_handler):
+        version = version_handler.get_version()
+        # Users' versions are read independently
+        version_handler._db.session.execute(
+            text("UPDATE data_versions SET version = 10 WHERE user_id = 1")
+        )
+        assert version_handler.get_version(user_id=1) == 10
+        assert version_handler.get_version() == version
+        version_handler._db.session.rollback()
+
+
+@pytest.fixture
+def fragment_cache(client_context):
+    return FragmentCache(max_size=2)
+
+
+class TestFragmentCache:
+    template_name = "common/transactions_table/subtransactions.html"
+
+    def render(self, fragment_cache, params):
+        get_context = Mock(return_value={"subtransactions": []})
+        fragment = fragment_cache.render(self.template_name, params, get_context)
+        return fragment, get_context
+
+    def test_initialization(self, fragment_cache):
+        assert fragment_cache.max_size == 2
+        assert fragment_cache.path is None
+        assert fragment_cache.stats == {"hits": 0, "misses": 0, "size": 0}
+
+    def test_render(self, fragment_cache):
+        fragment, get_context = self.render(fragment_cache, [1])
+        get_context.assert_called_once()
+        assert isinstance(fragment, Markup)
+        cached_fragment, get_context = self.render(fragment_cache, [1])
+        get_context.assert_not_called()
+        assert cached_fragment == fragment
+        assert fragment_cache.stats == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_render_evicts_least_recently_used(self, fragment_cache):
+        for params in ([1], [2], [1], [3]):
+            self.render(fragment_cache, params)
+        # The fragment for `[2]` was least recently used and so was evicted
+        _, get_context = self.render(fragment_cache, [1])
+        get_context.assert_not_called()
+        _, get_context = self.render(fragment_cache, [2])
+        get_context.assert_called_once()
+
+    def test_render_invalidated_by_date(self, fragment_cache):
+        self.render(fragment_cache, [1])
+        # Rendered fragments depend on the current date
+        with patch("monopyly.common.cache.date") as mock_date:
+            mock_date.today.return_value = date.today() + timedelta(days=1)
+            _, get_context = self.render(fragment_cache, [1])
+        get_context.assert_called_once()
+
+    def test_render_invalidated_by_write(self, fragment_cache):
+        self.render(fragment_cache, [1])
+        BankHandler.add_entry(user_id=3, bank_name="Bank of Monopoly")
+        _, get_context = self.render(fragment_cache, [1])
+        get_context.assert_called_once()
+        assert fragment_cache.misses == 2
+        # Fragments rendered from uncommitted writes are not cached
+        assert len(fragment_cache) == 1
+
+    def test_render_shared_on_disk(self, client_context, tmp_path):
+        path = tmp_path / "fragments.sqlite"
+        fragment, _ = self.render(FragmentCache(path=path), [1])
+        # A separate cache (e.g., in another process) finds the fragment on disk
+        other_fragment_cache = FragmentCache(path=path)
+        other_fragment, get_context = self.render(other_fragment_cache, [1])
+        get_context.assert_not_called()
+        assert other_fragment == fragment
+        assert other_fragment_cache.hits == 1
+
+    def test_clear(self, client_context, tmp_path):
+        fragment_cache = FragmentCache(path=tmp_path / "fragments.sqlite")
+        self.render(fragment_cache, [1])
+        fragment_cache.clear()
+        assert len(fragment_cache) == 0
+        _, get_context = self.render(fragment_cache, [1])
+        get_context.assert_called_once()
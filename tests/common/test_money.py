@@ -0,0 +1,63 @@
+"""Tests for the monetary amount representation."""
+
+import json
+import pickle
+from decimal import Decimal
+
+import pytest
+
+from monopyly.common.money import Money
+
+
+class TestMoney:
+    @pytest.mark.parametrize(
+        ("amount", "expected_cents"),
+        [
+            (12, 1200),
+            (12.34, 1234),
+            (-109.21, -10921),
+            (0.1 + 0.2, 30),
+            (1.005, 101),
+            (Decimal("43.215"), 4322),
+            ("26.87", 2687),
+            (Money("1.50"), 150),
+        ],
+    )
+    def test_initialization(self, amount, expected_cents):
+        money = Money(amount)
+        assert money.cents == expected_cents
+        assert money == expected_cents / 100
+
+    def test_from_cents(self):
+        money = Money.from_cents(10921)
+        assert money.cents == 10921
+        assert money == 109.21
+
+    def test_exact_arithmetic(self):
+        total = sum([Money(0.1)] * 3)
+        assert isinstance(total, Money)
+        assert total.cents == 30
+        assert (Money(100) - Money(0.01)).cents == 9999
+        assert (1 - Money(0.25)).cents == 75
+        assert (-Money(5)).cents == -500
+        assert abs(Money(-5)).cents == 500
+
+    def test_float_arithmetic(self):
+        product = Money(12.34) * 2
+        assert not isinstance(product, Money)
+        assert product == pytest.approx(24.68)
+
+    def test_display(self):
+        money = Money("12.30")
+        assert repr(money) == "Money('12.30')"
+        assert str(money) == "12.3"
+        assert f"{money:,.2f}" == "12.30"
+        assert json.dumps(money) == "12.3"
+
+    def test_pickle(self):
+        money = pickle.loads(pickle.dumps(Money("43.21")))
+        assert isinstance(money, Money)
+        assert money.cents == 4321
+
+    def test_hashable(self):
+        assert len({Money(1), Money(1.00), Money("1")}) == 1
@@ -1,14 +1,18 @@
 """Tests for common aspects of transactions."""
 
-from unittest.mock import MagicMock, Mock
+from datetime import date
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
+from monopyly.common.money import Money
 from monopyly.common.transactions import (
     CategoryTree,
     RootCategoryTree,
     TransactionTagHandler,
+    compute_content_hash,
     get_linked_transaction,
+    get_linked_transactions,
     get_subtransactions,
     highlight_unmatched_transactions,
 )
@@ -60,6 +64,61 @@ class TestLinkedTransactionSearch:
         assert linked_transaction is None
 
 
+def test_get_linked_transactions(client_context):
+    transactions = [
+        Mock(subtype="bank", id=3, internal_transaction_id=1),
+        Mock(subtype="bank", id=5, internal_transaction_id=2),
+        Mock(subtype="credit", id=7, internal_transaction_id=2),
+        Mock(subtype="bank", id=1, internal_transaction_id=None),
+    ]
+    with patch.object(
+        TransactionTagHandler._db.session,
+        "execute",
+        wraps=TransactionTagHandler._db.session.execute,
+    ) as mock_method:
+        linked_transactions = get_linked_transactions(transactions)
+        # All linked transactions are found with a single query
+        mock_method.assert_called_once()
+    assert {key: (_.subtype, _.id) for key, _ in linked_transactions.items()} == {
+        ("bank", 3): ("bank", 6),
+        ("bank", 5): ("credit", 7),
+        ("credit", 7): ("bank", 5),
+    }
+    assert linked_transactions[("bank", 3)].internal_transaction_id == 1
+
+
+def test_get_linked_transactions_none(client_context):
+    transactions = [Mock(subtype="bank", id=1, internal_transaction_id=None)]
+    assert get_linked_transactions(transactions) == {}
+
+
+@pytest.mark.parametrize(
+    ("merchant", "matches"),
+    [("Canteen", True), ("  the-CANTEEN ", False), ("canteen!", True), (None, False)],
+)
+def test_compute_content_hash(merchant, matches):
+    reference_hash = compute_content_hash(3, date(2020, 5, 5), Money(-300), "Canteen")
+    content_hash = compute_content_hash(3, date(2020, 5, 5), Money(-300), merchant)
+    assert len(content_hash) == 16
+    assert (content_hash == reference_hash) is matches
+
+
+@pytest.mark.parametrize(
+    ("parent_id", "transaction_date", "total"),
+    [
+        (2, date(2020, 5, 5), -300),
+        (3, date(2020, 5, 6), -300),
+        (3, date(2020, 5, 5), 300),
+    ],
+)
+def test_compute_content_hash_distinct(parent_id, transaction_date, total):
+    reference_hash = compute_content_hash(3, date(2020, 5, 5), Money(-300), "Canteen")
+    content_hash = compute_content_hash(
+        parent_id, transaction_date, Money(total), "Canteen"
+    )
+    assert content_hash != reference_hash
+
+
 def test_unmatched_transaction_highlighter():
     transactions = [Mock(id=_) for _ in range(1, 5)]
     unmatched_transactions = [Mock(id=_) for _ in range(2, 5)]
@@ -138,6 +197,26 @@ class TestTransactionTagHandler(TestTagHandler):
         ancestors = tag_handler.get_ancestors(tag)
         self.assert_entries_match(ancestors, expected_ancestors)
 
+    @pytest.mark.parametrize(
+        ("tag_names", "expected_lineages"),
+        [
+            (["Parking"], {"Parking": [4, 3]}),
+            (
+                ["Credit payments", "Electricity", "Gifts"],
+                {"Credit payments": [1], "Electricity": [7, 6], "Gifts": [8]},
+            ),
+            ([], {}),
+        ],
+    )
+    def test_get_tag_lineages(self, tag_handler, tag_names, expected_lineages):
+        tag_lineages = tag_handler.get_tag_lineages(tag_names)
+        assert tag_lineages == expected_lineages
+
+    @pytest.mark.parametrize("tag_names", [["Trains"], ["Parking", "Test tag"]])
+    def test_get_tag_lineages_invalid(self, tag_handler, tag_names):
+        with pytest.raises(ValueError, match="do not exist"):
+            tag_handler.get_tag_lineages(tag_names)
+
     @pytest.mark.parametrize(
         ("tag_name", "reference_entry"),
         [("Transportation", db_reference[1]), ("Electricity", db_reference[5])],
@@ -186,6 +265,38 @@ class TestCategoryTree:
         subtree.subtransactions = [Mock(subtotal=_) for _ in subtotals["subtree"]]
         assert tree.subtotal == sum(subtotals["tree"] + subtotals["subtree"])
         assert subtree.subtotal == sum(subtotals["subtree"])
+        assert tree.direct_subtotal == sum(subtotals["tree"])
+        assert tree.count == 4
+        assert subtree.count == 2
+
+    def test_subtotal_invalidation(self):
+        mock_tag, mock_subtag = Mock(tag_name="tag"), Mock(tag_name="subtag")
+        tree = CategoryTree(mock_tag, subtransactions=[Mock(subtotal=10)])
+        subtree = tree.add_subcategory(mock_subtag)
+        assert subtree.parent is tree
+        assert (tree.subtotal, tree.count) == (10, 1)
+        # Adding a subtransaction to a subcategory updates the full tree
+        subtree.add_subtransaction(Mock(subtotal=5))
+        assert (tree.subtotal, tree.count) == (15, 2)
+        assert (subtree.subtotal, subtree.count) == (5, 1)
+        # Adding a subcategory updates the tree
+        tree.subcategories["other"] = CategoryTree(
+            "other", subtransactions=[Mock(subtotal=1)]
+        )
+        assert (tree.subtotal, tree.count) == (16, 3)
+        # Adding an aggregated amount updates the tree
+        subtree.add_amount(4, count=2)
+        assert (tree.subtotal, tree.count) == (20, 5)
+
+    def test_subtotal_memoized(self):
+        tree = CategoryTree("tag", subtransactions=[Mock(subtotal=10)])
+        subtree = tree.add_subcategory("subtag")
+        subtree.add_amount(5)
+        assert tree.tally() == (10, 15, 2)
+        # Tallies are reused (without summing subcategories again)
+        with patch.object(subtree, "tally") as mock_method:
+            assert (tree.subtotal, tree.count) == (15, 2)
+            mock_method.assert_not_called()
 
 
 @pytest.fixture
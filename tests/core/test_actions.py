@@ -1,11 +1,15 @@
 """Tests for the actions performed by the credit blueprint."""
 
+import os
+
 import pytest
+from flask import render_template
 
 from monopyly.core.actions import (
     convert_changelog_to_html_template,
     convert_readme_to_html_template,
     determine_summary_balance_svg_viewbox_width,
+    load_changelog_template,
 )
 
 
@@ -41,6 +45,22 @@ def test_convert_changelog_to_html_template(tmp_path):
     assert '<a href="{{ url_for("core.about") }}">' in html_changelog_template
 
 
+def test_load_changelog_template(app, tmp_path):
+    test_changelog_path = tmp_path / "test_changelog.md"
+    test_changelog_path.write_text("# Header\nThis is text on the first line.\n")
+    with app.test_request_context():
+        template = load_changelog_template(test_changelog_path)
+        assert "<h1>Header</h1>" in render_template(template)
+        # The compiled template is reused until the file is modified
+        assert load_changelog_template(test_changelog_path) is template
+        test_changelog_path.write_text("# New Header\n")
+        stat = test_changelog_path.stat()
+        os.utime(test_changelog_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        updated_template = load_changelog_template(test_changelog_path)
+        assert updated_template is not template
+        assert "<h1>New Header</h1>" in render_template(updated_template)
+
+
 @pytest.mark.parametrize(
     ("number", "width"),
     [
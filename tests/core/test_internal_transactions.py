@@ -1,11 +1,27 @@
 """Tests for internal transactions."""
 
+import datetime
+import threading
+from unittest.mock import patch
+
+import pytest
 from dry_foundation.testing import transaction_lifetime
+from flask import current_app
 from sqlalchemy import select
 from sqlalchemy.sql.expression import func
 
-from monopyly.core.internal_transactions import add_internal_transaction
-from monopyly.database.models import InternalTransaction
+from monopyly.banking.transactions import BankTransactionHandler
+from monopyly.core.internal_transactions import (
+    _merge_transfer_candidates,
+    _TransferCandidate,
+    add_internal_transaction,
+    find_transfer_pairs,
+    link_recent_transfers,
+    link_transfer_pairs,
+    schedule_transfer_linking,
+)
+from monopyly.credit.transactions import CreditTagHandler, CreditTransactionHandler
+from monopyly.database.models import CreditTransaction, InternalTransaction
 
 
 @transaction_lifetime
@@ -15,3 +31,172 @@ def test_add_internal_transaction(app, client_context):
     assert count == 3
     entry_id = add_internal_transaction()
     assert entry_id == count + 1
+
+
+def _add_unlinked_payment(
+    bank_date, credit_date, amount=-50, tags=("Credit payments",)
+):
+    if not CreditTagHandler.get_tags(tag_names=tags):
+        for tag_name in tags:
+            CreditTagHandler.add_entry(parent_id=None, user_id=3, tag_name=tag_name)
+    BankTransactionHandler.add_entry(
+        internal_transaction_id=None,
+        account_id=2,
+        transaction_date=bank_date,
+        merchant="JP Morgan Chance",
+        subtransactions=[{"subtotal": amount, "note": "Card payment", "tags": []}],
+    )
+    return CreditTransactionHandler.add_entry(
+        internal_transaction_id=None,
+        statement_id=4,
+        transaction_date=credit_date,
+        merchant="JP Morgan Chance",
+        subtransactions=[
+            {"subtotal": amount, "note": "Card payment", "tags": list(tags)}
+        ],
+    )
+
+
+def test_merge_transfer_candidates():
+    bank_candidates = [
+        _TransferCandidate(3, -5000, 10, 1),
+        _TransferCandidate(3, -5000, 30, 2),
+        _TransferCandidate(3, -2500, 10, 3),
+        _TransferCandidate(4, -1000, 10, 4),
+    ]
+    credit_candidates = [
+        _TransferCandidate(3, -5000, 2, 11),
+        _TransferCandidate(3, -5000, 31, 12),
+        _TransferCandidate(3, -2500, 20, 13),
+        _TransferCandidate(4, -1000, 12, 14),
+    ]
+    bank_candidates.sort()
+    credit_candidates.sort()
+    pairs = _merge_transfer_candidates(bank_candidates, credit_candidates, 3)
+    pair_ids = [
+        (pair.bank_transaction_id, pair.credit_transaction_id) for pair in pairs
+    ]
+    assert pair_ids == [(2, 12), (4, 14)]
+
+
+@transaction_lifetime
+def test_find_transfer_pairs(app, client_context):
+    # The test data contains no unlinked transfers
+    assert find_transfer_pairs() == []
+    credit_transaction = _add_unlinked_payment(
+        datetime.date(2020, 5, 8), datetime.date(2020, 5, 10)
+    )
+    _add_unlinked_payment(datetime.date(2020, 5, 8), datetime.date(2020, 5, 20))
+    pairs = find_transfer_pairs()
+    assert len(pairs) == 1
+    assert pairs[0].user_id == 3
+    assert pairs[0].credit_transaction_id == credit_transaction.id
+    assert pairs[0].total == -50
+    # A wider window matches the remaining payment
+    assert len(find_transfer_pairs(window=15)) == 2
+    # Transactions before the given date are not considered
+    assert find_transfer_pairs(window=15, since=datetime.date(2020, 5, 9)) == []
+
+
+@transaction_lifetime
+def test_find_transfer_pairs_untagged(app, client_context):
+    # A refund matching a recent purchase is not mistaken for a payment
+    _add_unlinked_payment(
+        datetime.date(2020, 5, 8), datetime.date(2020, 5, 10), tags=["Gifts"]
+    )
+    assert find_transfer_pairs() == []
+
+
+@transaction_lifetime
+def test_link_transfer_pairs(app, client_context):
+    _add_unlinked_payment(datetime.date(2020, 5, 8), datetime.date(2020, 5, 10))
+    pairs = find_transfer_pairs()
+    assert link_transfer_pairs(pairs) == 1
+    bank_transaction = BankTransactionHandler.get_entry(pairs[0].bank_transaction_id)
+    credit_transaction = CreditTransactionHandler.get_entry(
+        pairs[0].credit_transaction_id
+    )
+    assert bank_transaction.internal_transaction_id == 4
+    assert credit_transaction.internal_transaction_id == 4
+    assert find_transfer_pairs() == []
+
+
+@transaction_lifetime
+def test_link_recent_transfers(app, client_context):
+    _add_unlinked_payment(datetime.date(2020, 5, 8), datetime.date(2020, 5, 10))
+    app.db.session.commit()
+    lookback = (datetime.date.today() - datetime.date(2020, 5, 8)).days
+    # Older transactions are not linked
+    assert link_recent_transfers(lookback=lookback - 1) == 0
+    assert link_recent_transfers(lookback=lookback) == 1
+    assert find_transfer_pairs() == []
+
+
+def test_schedule_transfer_linking(app):
+    called = threading.Event()
+
+    def mock_link_recent_transfers(**kwargs):
+        assert kwargs == {"lookback": 7}
+        # Transfers are linked within the app's context
+        assert current_app._get_current_object() is app
+        called.set()
+        return 0
+
+    with patch(
+        "monopyly.core.internal_transactions.link_recent_transfers",
+        new=mock_link_recent_transfers,
+    ):
+        stop_event = schedule_transfer_linking(app, 0.01, lookback=7)
+        try:
+            assert called.wait(timeout=5)
+        finally:
+            stop_event.set()
+
+
+def test_run_transfer_linking_command(app):
+    calls = []
+
+    def mock_link_recent_transfers(**kwargs):
+        calls.append(kwargs)
+        # Linking continues (even after errors) until interrupted
+        if len(calls) == 1:
+            raise ValueError("Test error")
+        raise KeyboardInterrupt
+
+    runner = app.test_cli_runner()
+    with patch(
+        "monopyly.core.internal_transactions.link_recent_transfers",
+        new=mock_link_recent_transfers,
+    ):
+        result = runner.invoke(
+            args=["run-transfer-linking", "--interval", "0.01", "--lookback", "7"]
+        )
+    assert result.exit_code == 0
+    assert calls == [{"lookback": 7}, {"lookback": 7}]
+
+
+@pytest.mark.parametrize(
+    ("args", "expected_internal_transaction_id"),
+    [
+        (["--dry-run"], None),
+        ([], 4),
+        (["--since", "2020-05-01"], 4),
+    ],
+)
+@transaction_lifetime
+def test_link_transfers_command(
+    app, client_context, args, expected_internal_transaction_id
+):
+    credit_transaction = _add_unlinked_payment(
+        datetime.date(2020, 5, 8), datetime.date(2020, 5, 10)
+    )
+    credit_transaction_id = credit_transaction.id
+    app.db.session.commit()
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["link-transfers", *args])
+    assert result.exit_code == 0
+    assert f"credit transaction {credit_transaction_id}" in result.output
+    query = select(CreditTransaction.internal_transaction_id).where(
+        CreditTransaction.id == credit_transaction_id
+    )
+    assert app.db.session.scalar(query) == expected_internal_transaction_id
@@ -0,0 +1,57 @@
+"""Tests for the net worth calculations."""
+
+from datetime import date
+
+import pytest
+from flask import g
+from sqlalchemy import text
+
+from monopyly.banking.balances import DailyBalance
+from monopyly.banking.transactions import BankTransactionHandler
+from monopyly.core.net_worth import get_net_worth_series
+
+
+@pytest.mark.parametrize(
+    ("index", "expected_daily_balance"),
+    [
+        (0, DailyBalance(date(2020, 3, 15), -1.00)),
+        (1, DailyBalance(date(2020, 3, 16), -1.00)),
+        (31, DailyBalance(date(2020, 4, 15), -109.21)),
+        (50, DailyBalance(date(2020, 5, 4), -133.42)),
+        (52, DailyBalance(date(2020, 5, 6), -244.52)),
+        (56, DailyBalance(date(2020, 5, 10), -6734.31)),
+        (87, DailyBalance(date(2020, 6, 10), -7027.51)),
+    ],
+)
+def test_get_net_worth_series(client_context, index, expected_daily_balance):
+    net_worth = get_net_worth_series()
+    # The series includes every day from the first to the last balance change
+    assert len(net_worth) == 88
+    assert net_worth[index] == expected_daily_balance
+
+
+def test_get_net_worth_series_cached(client_context):
+    net_worth = get_net_worth_series()
+    assert get_net_worth_series() is net_worth
+    # Writing to the database invalidates the cached series
+    BankTransactionHandler.add_entry(
+        internal_transaction_id=None,
+        account_id=2,
+        transaction_date=date(2020, 7, 1),
+        merchant="Parker Brothers",
+        subtransactions=[{"subtotal": 7100.00, "note": "Windfall", "tags": []}],
+    )
+    updated_net_worth = get_net_worth_series()
+    assert updated_net_worth is not net_worth
+    assert updated_net_worth[-1] == DailyBalance(date(2020, 7, 1), 72.49)
+
+
+def test_get_net_worth_series_other_process_write(app, client_context):
+    net_worth = get_net_worth_series()
+    # Simulate a write by another process (untracked by this process's cache)
+    app.db.session.execute(
+        text("UPDATE data_versions SET version = version + 1 WHERE user_id = 3")
+    )
+    # Start a new request (in which the data version is read again)
+    g.pop("data_version")
+    assert get_net_worth_series() is not net_worth
@@ -0,0 +1,130 @@
+"""Tests for the monthly spending rollups."""
+
+from datetime import date
+
+import pytest
+from dry_foundation.testing.helpers import TestHandler
+from sqlalchemy import select
+
+from monopyly.banking.accounts import BankAccountHandler
+from monopyly.banking.transactions import BankTransactionHandler
+from monopyly.core.rollups import SpendingRollupHandler
+from monopyly.credit.statements import CreditStatementHandler
+from monopyly.credit.transactions import CreditTransactionHandler
+from monopyly.database.models import SpendingRollup
+
+
+@pytest.fixture
+def rollup_handler(client_context):
+    return SpendingRollupHandler
+
+
+def _get_rollups(db):
+    query = select(
+        SpendingRollup.user_id,
+        SpendingRollup.month,
+        SpendingRollup.tag_id,
+        SpendingRollup.source,
+        SpendingRollup.total,
+        SpendingRollup.count,
+    ).order_by(
+        SpendingRollup.user_id,
+        SpendingRollup.month,
+        SpendingRollup.tag_id,
+        SpendingRollup.source,
+    )
+    return [tuple(row) for row in db.session.execute(query)]
+
+
+class TestSpendingRollupHandler(TestHandler):
+    def assert_rollups_current(self, handler):
+        # The maintained rollups should always match freshly rebuilt rollups
+        rollups = _get_rollups(handler._db)
+        handler.rebuild_rollups(all_users=True)
+        assert rollups == _get_rollups(handler._db)
+
+    def test_initialization(self, rollup_handler):
+        assert rollup_handler.model == SpendingRollup
+        assert rollup_handler.table.name == "spending_rollups"
+        assert rollup_handler.user_id == 3
+
+    def test_initialized_rollups(self, rollup_handler):
+        rollups = _get_rollups(rollup_handler._db)
+        assert (3, "2020-05", 1, "bank", -109.21, 1) in rollups
+        self.assert_rollups_current(rollup_handler)
+
+    def test_add_entries(self, rollup_handler):
+        BankTransactionHandler.add_entry(
+            internal_transaction_id=None,
+            account_id=2,
+            transaction_date=date(2020, 5, 6),
+            merchant="Electric Company",
+            subtransactions=[
+                {"subtotal": -150.00, "note": "Power", "tags": ["Electricity"]},
+            ],
+        )
+        CreditTransactionHandler.bulk_add_entries(
+            [
+                {
+                    "internal_transaction_id": None,
+                    "statement_id": 4,
+                    "transaction_date": date(2020, 5, 30),
+                    "merchant": "Boardwalk",
+                    "subtransactions": [
+                        {"subtotal": 25.00, "note": "Parking", "tags": ["Parking"]},
+                    ],
+                },
+            ]
+        )
+        self.assert_rollups_current(rollup_handler)
+
+    def test_update_entries(self, rollup_handler):
+        BankTransactionHandler.update_entry(
+            5,
+            transaction_date=date(2020, 6, 4),
+            subtransactions=[
+                {"subtotal": -100.00, "note": "Payment", "tags": ["Credit payments"]},
+                {"subtotal": -9.21, "note": "Fee", "tags": ["Gifts"]},
+            ],
+        )
+        CreditTransactionHandler.update_entry(
+            4, subtransactions=[{"subtotal": 1.00, "note": "Test", "tags": []}]
+        )
+        self.assert_rollups_current(rollup_handler)
+
+    def test_delete_entries(self, rollup_handler):
+        BankTransactionHandler.delete_entry(5)
+        CreditTransactionHandler.delete_entry(4)
+        self.assert_rollups_current(rollup_handler)
+        rollups = _get_rollups(rollup_handler._db)
+        assert (3, "2020-05", 1, "bank", -109.21, 1) not in rollups
+
+    @pytest.mark.parametrize(
+        ("handler", "entry_id"),
+        [(BankAccountHandler, 3), (CreditStatementHandler, 4)],
+    )
+    def test_delete_parent_entries(self, rollup_handler, handler, entry_id):
+        handler.delete_entry(entry_id)
+        self.assert_rollups_current(rollup_handler)
+
+    def test_get_spending_over_time(self, rollup_handler):
+        spending = rollup_handler.get_spending_over_time(
+            tag_names=["Credit payments"], sources=["bank"]
+        )
+        assert spending == {
+            "months": ["2020-05"],
+            "totals": {"Credit payments": [-109.21]},
+        }
+
+    def test_get_spending_over_time_range(self, rollup_handler):
+        spending = rollup_handler.get_spending_over_time(
+            start_month="2030-01", end_month="2030-12"
+        )
+        assert spending == {"months": [], "totals": {}}
+
+
+def test_rebuild_rollups_command(app):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["rebuild-rollups"])
+    assert result.exit_code == 0
+    assert "Rebuilt spending rollups" in result.output
@@ -2,6 +2,7 @@
 
 from unittest.mock import patch
 
+import pytest
 from dry_foundation.testing.helpers import TestRoutes
 
 
@@ -16,12 +17,12 @@ class TestCoreRoutes(TestRoutes):
         self.get_route("/")
         assert self.div_exists(id="homepage-block")
         assert self.div_exists(id="homepage-panels")
+        assert self.div_exists(id="balance-chart")
 
     @patch("monopyly.core.routes.CreditStatementHandler")
     def test_index_no_statements(self, mock_handler, auth):
         # Mock the statement handler to return no statements
-        mock_statements = mock_handler.get_statements.return_value
-        mock_statements.first.return_value = None
+        mock_handler.find_statement_identity.return_value = None
         # Test that statement information is not shown if none exists
         auth.login()
         self.get_route("/")
@@ -49,6 +50,13 @@ class TestCoreRoutes(TestRoutes):
         assert self.div_exists(id="homepage-block")
         assert self.div_exists(id="homepage-panels")
 
+    def test_load_net_worth_chart_data(self, authorization):
+        response = self.get_route("/_net_worth_chart_data?start=2020-06-09")
+        assert response.json["series"][0]["data"] == [
+            {"x": 1591660800000, "y": -7000.64},
+            {"x": 1591747200000, "y": -7027.51},
+        ]
+
     def test_about(self):
         self.get_route("/about")
         assert self.tag_exists("h4", id="tagline", string="The Money Game")
@@ -82,3 +90,66 @@ class TestCoreRoutes(TestRoutes):
         self.get_route("/profile")
         assert self.page_heading_includes_substring("Profile")
         assert self.tag_exists("h2", string="Settings")
+
+    def test_load_spending(self, authorization):
+        self.get_route("/spending")
+        assert self.page_heading_includes_substring("Spending Over Time")
+        assert self.form_exists(id="spending-filters")
+        assert self.div_exists(id="spending-chart")
+
+    def test_load_spending_over_time(self, authorization):
+        response = self.get_route(
+            "/_spending_over_time?tag=Credit payments&source=bank&end=2020-12"
+        )
+        assert response.json == {
+            "months": ["2020-05"],
+            "totals": {"Credit payments": [-109.21]},
+        }
+
+    def test_search(self, authorization):
+        self.get_route("/search?q=park")
+        assert self.page_heading_includes_substring("Search Transactions")
+        assert self.form_exists(id="search-form")
+        assert self.tag_exists("mark", string="Park")
+        assert self.tag_exists("mark", string="Parking")
+        assert not self.tag_exists("a", string="Next")
+
+    def test_search_no_results(self, authorization):
+        self.get_route("/search?q=nonexistent")
+        assert self.tag_exists("li", class_="no-results")
+
+    @patch("monopyly.core.routes.SEARCH_RESULT_LIMIT", new=1)
+    def test_search_pages(self, authorization):
+        self.get_route("/search?q=park&page=2")
+        assert self.tag_exists("mark", string="Parking")
+        assert self.tag_exists("a", string="Previous")
+        assert not self.tag_exists("a", string="Next")
+
+    def test_query_transactions(self, authorization):
+        response = self.get_route(
+            "/_transactions?tag=Transportation&min=50&start=2020-01-01&end=2020-12-31"
+        )
+        assert response.json["count"] == 1
+        assert response.json["transactions"] == [
+            {
+                "subtype": "credit",
+                "id": 11,
+                "parent_id": 7,
+                "source_id": 4,
+                "transaction_date": "2020-06-05",
+                "merchant": "Reading Railroad",
+                "total": 253.99,
+            }
+        ]
+        assert response.json["facets"]["card"] == {"4": 1}
+
+    @pytest.mark.parametrize("amount", ["nan", "inf", "-inf"])
+    @pytest.mark.parametrize("arg", ["min", "max"])
+    def test_query_transactions_nonfinite_amount(self, authorization, arg, amount):
+        response = self.get_route(f"/_transactions?{arg}={amount}")
+        assert response.status_code == 400
+
+    def test_query_transactions_accounts(self, authorization):
+        response = self.get_route("/_transactions?card=2&source=credit&page=1")
+        assert response.json["count"] == 2
+        assert response.json["facets"]["source"] == {"credit": 2}
@@ -0,0 +1,186 @@
+"""Tests for searching transactions."""
+
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from markupsafe import Markup
+
+from monopyly.banking.transactions import BankTransactionHandler
+from monopyly.core.search import (
+    SearchResult,
+    TransactionQuery,
+    TransactionSummary,
+    search_transactions,
+)
+
+
+@pytest.mark.parametrize(
+    ("search_terms", "expected_ids"),
+    [
+        ("park", [("credit", 4), ("credit", 2)]),
+        ("PARK place", [("credit", 4)]),
+        ("jp morg", [("bank", 5), ("credit", 7)]),
+        ("Test", []),  # transactions belonging to another user
+        ("", []),
+        ("\"'*^:", []),  # FTS5 query syntax is ignored
+    ],
+)
+def test_search_transactions(client_context, search_terms, expected_ids):
+    results = search_transactions(search_terms)
+    assert [(result.subtype, result.id) for result in results] == expected_ids
+
+
+def test_search_transactions_result(client_context):
+    result = search_transactions("parking")[0]
+    assert result == SearchResult(
+        subtype="credit",
+        id=2,
+        parent_id=2,
+        transaction_date=date(2020, 4, 13),
+        merchant="Top Left Corner",
+        total=1.00,
+        snippet=Markup("<mark>Parking</mark> (thought it was free)"),
+    )
+
+
+def test_search_transactions_pages(client_context):
+    assert [result.id for result in search_transactions("park", limit=1)] == [4]
+    assert [result.id for result in search_transactions("park", offset=1)] == [2]
+
+
+def test_search_transactions_pages_tied(client_context):
+    # Equally ranked results are returned in a consistent order across pages
+    results = search_transactions("jp morg")
+    pages = [search_transactions("jp morg", offset=i, limit=1) for i in range(2)]
+    assert [page[0] for page in pages] == results
+
+
+def test_search_transactions_escaped(client_context):
+    BankTransactionHandler.add_entry(
+        account_id=2,
+        transaction_date=date(2020, 5, 7),
+        merchant="<b>Bold</b> Merchant",
+        subtransactions=[{"subtotal": 10.00, "note": "Test note", "tags": []}],
+    )
+    result = search_transactions("merchant")[0]
+    assert result.snippet == Markup("&lt;b&gt;Bold&lt;/b&gt; <mark>Merchant</mark>")
+
+
+@pytest.mark.parametrize(
+    ("mapping", "search_terms", "expected_count"),
+    [
+        ({"merchant": "Commissary"}, "commissary", 1),
+        ({"merchant": "Commissary"}, "canteen", 0),
+        (
+            {"subtransactions": [{"subtotal": -300, "note": "Snacks", "tags": []}]},
+            "snacks",
+            1,
+        ),
+        (
+            {"subtransactions": [{"subtotal": -300, "note": "Snacks", "tags": []}]},
+            "transfer",
+            1,  # the linked transfer (ID 3) remains
+        ),
+    ],
+)
+def test_search_transactions_updated(
+    client_context, mapping, search_terms, expected_count
+):
+    BankTransactionHandler.update_entry(6, **mapping)
+    assert len(search_transactions(search_terms)) == expected_count
+
+
+def test_search_transactions_deleted(client_context):
+    assert len(search_transactions("canteen")) == 1
+    BankTransactionHandler.delete_entry(6)
+    assert search_transactions("canteen") == []
+
+
+class TestTransactionQuery:
+    @pytest.mark.parametrize(
+        ("filters", "expected_ids"),
+        [
+            (
+                {"tag_names": ["Transportation"]},
+                [("credit", 11), ("credit", 2)],
+            ),
+            (
+                {"tag_names": ["Transportation"], "min_amount": 50},
+                [("credit", 11)],
+            ),
+            (
+                {"min_amount": 200, "max_amount": 300},
+                [("credit", 11), ("bank", 7), ("bank", 6), ("bank", 3)],
+            ),
+            (
+                {"start_date": date(2020, 5, 5), "end_date": date(2020, 5, 10)},
+                [("credit", 10), ("bank", 7), ("bank", 4), ("bank", 6), ("bank", 3)],
+            ),
+            (
+                {"merchants": ["JP Morgan Chance"], "sources": ["bank"]},
+                [("bank", 5)],
+            ),
+            (
+                {"account_ids": [3], "card_ids": [2]},
+                [("bank", 6), ("bank", 5), ("credit", 2), ("credit", 13)],
+            ),
+            ({"card_ids": [2]}, [("credit", 2), ("credit", 13)]),
+            ({"account_ids": []}, []),
+            ({"merchants": ["Test Merchant"]}, []),  # another user's transactions
+        ],
+    )
+    def test_get_results(self, client_context, filters, expected_ids):
+        results = TransactionQuery(**filters).get_results()
+        transaction_ids = [(_.subtype, _.id) for _ in results.transactions]
+        assert transaction_ids == expected_ids
+        assert results.count == len(expected_ids)
+
+    def test_get_results_transaction(self, client_context):
+        results = TransactionQuery(merchants=["Top Left Corner"]).get_results()
+        assert results.transactions == [
+            TransactionSummary(
+                subtype="credit",
+                id=2,
+                parent_id=2,
+                source_id=2,
+                transaction_date=date(2020, 4, 13),
+                merchant="Top Left Corner",
+                total=1.00,
+            )
+        ]
+
+    def test_get_results_facets(self, client_context):
+        results = TransactionQuery(min_amount=100).get_results(limit=1)
+        assert len(results.transactions) == 1
+        assert results.count == 9
+        assert results.facets == {
+            "source": {"bank": 4, "credit": 5},
+            "account": {2: 1, 3: 2, 4: 1},
+            "card": {3: 2, 4: 3},
+            "tag": {"Credit payments": 2, "Railroad": 1, "Transportation": 1},
+            "merchant": {
+                "JP Morgan Chance": 2,
+                "Canteen": 1,
+                "Income Tax Board": 1,
+                "Marvin Gardens": 1,
+                "Pennsylvania Avenue": 1,
+                "Reading Railroad": 1,
+            },
+        }
+
+    def test_get_results_pages(self, client_context):
+        query = TransactionQuery(sources=["bank"])
+        first_page = query.get_results(limit=4)
+        second_page = query.get_results(offset=4, limit=4)
+        assert [_.id for _ in first_page.transactions] == [7, 4, 6, 3]
+        assert [_.id for _ in second_page.transactions] == [5, 2]
+        assert first_page.count == second_page.count == 6
+
+    def test_get_results_single_statement(self, app, client_context):
+        # The transactions and facet counts are selected together
+        with patch.object(
+            app.db.session, "execute", wraps=app.db.session.execute
+        ) as mock_method:
+            TransactionQuery(min_amount=100).get_results(limit=1)
+            mock_method.assert_called_once()
@@ -12,11 +12,13 @@ from monopyly.credit.actions import (
     get_potential_preceding_card,
     make_payment,
     parse_request_transaction_data,
+    record_activity_transactions,
     transfer_credit_card_statement,
 )
 from monopyly.credit.cards import CreditCardHandler
 from monopyly.credit.statements import CreditStatementHandler
 from monopyly.credit.transactions import CreditTransactionHandler
+from monopyly.credit.transactions.activity import TransactionActivities
 
 
 @patch("monopyly.credit.actions.CreditStatementHandler.get_statements")
@@ -157,6 +159,28 @@ def test_make_payment_no_bank_account(client_context):
     assert payment_credit_transaction.subtransactions[0].note == "Card payment"
 
 
+@transaction_lifetime
+def test_record_activity_transactions(client_context):
+    statement = CreditStatementHandler.get_entry(5)
+    activities = TransactionActivities(
+        [
+            ["2020-05-25", 12.34, "Test Merchant 1"],
+            ["2020-06-15", 50.00, "Test Merchant 2"],
+        ]
+    )
+    transaction_ids = record_activity_transactions(statement, activities)
+    assert transaction_ids == [14, 15]
+    # Check that each activity was recorded on its inferred statement
+    for transaction_id, activity, statement_id in zip(
+        transaction_ids, activities, [5, 8], strict=True
+    ):
+        transaction = CreditTransactionHandler.get_entry(transaction_id)
+        assert transaction.statement_id == statement_id
+        assert transaction.transaction_date == activity.transaction_date
+        assert transaction.merchant == activity.description
+        assert transaction.total == activity.total
+
+
 @patch("monopyly.credit.actions.parse_date")
 def test_parse_request_transaction_data(mock_date_parser):
     mock_request_args = {
@@ -1,5 +1,6 @@
 """Tests for the banking module forms."""
 
+from collections import OrderedDict
 from datetime import date
 from unittest.mock import MagicMock, Mock, patch
 
@@ -14,6 +15,7 @@ from monopyly.credit.forms import (
     CreditCardForm,
     CreditTransactionForm,
 )
+from monopyly.credit.transactions import CreditTransactionHandler
 from monopyly.database.models import (
     CreditAccount,
     CreditCard,
@@ -339,7 +341,7 @@ class TestCreditTransactionForm:
         self, mock_handler, transaction_form, mock_card
     ):
         statement_subform = transaction_form.statement_info
-        mock_method = mock_handler.find_statement
+        mock_method = mock_handler.find_statement_identity
         # Mock the requirements for returning an existing statement
         mock_issue_date = Mock()
         statement_subform.issue_date.data = mock_issue_date
@@ -358,7 +360,7 @@ class TestCreditTransactionForm:
         # Mock the requirements for returning a new statement
         mock_issue_date = Mock()
         statement_subform.issue_date.data = mock_issue_date
-        mock_handler.find_statement.return_value = None
+        mock_handler.find_statement_identity.return_value = None
         # Ensure that the new statement is returned
         transaction_date = date(2022, 6, 1)
         statement = statement_subform.determine_statement(mock_card, transaction_date)
@@ -607,3 +609,75 @@ class TestCreditTransactionForm:
     def test_autocomplete_invalid(self, transaction_form):
         with pytest.raises(KeyError):
             transaction_form.autocomplete("test_field")
+
+    def test_autocomplete_query_aggregated(self, transaction_form):
+        query = transaction_form._autocompleter._build_suggestions_query(
+            CreditSubtransaction, "note", {"merchant": "Park Place"}
+        )
+        # Suggestions are ranked (by priority and frequency) in a single query
+        assert "GROUP BY credit_subtransactions.note" in str(query)
+        notes = transaction_form.autocomplete("note", merchant="Park Place")
+        assert len(notes) == len(set(notes))
+
+    def test_autocomplete_prefix(self, transaction_form):
+        suggestions = transaction_form.autocomplete("merchant", prefix="pa", limit=1)
+        assert suggestions == ["Park Place"]
+
+    @pytest.mark.parametrize(
+        ("prefix", "limit"),
+        [("", None), ("", 3), ("mar", 5), ("gar", 5), ("ar", 2), ("board", 1)],
+    )
+    def test_autocomplete_truncated_index(self, transaction_form, prefix, limit):
+        autocompleter = transaction_form._autocompleter
+        with patch.object(autocompleter, "_indexes", OrderedDict()):
+            expected_suggestions = transaction_form.autocomplete(
+                "merchant", prefix=prefix, limit=limit
+            )
+        # Values omitted from the index are still suggested (in the same order)
+        with (
+            patch.object(autocompleter, "_indexes", OrderedDict()),
+            patch("monopyly.common.forms.utils.AUTOCOMPLETE_INDEX_SIZE", 1),
+        ):
+            suggestions = transaction_form.autocomplete(
+                "merchant", prefix=prefix, limit=limit
+            )
+        assert suggestions == expected_suggestions
+
+    def test_autocomplete_truncated_index_exhaustive(self, transaction_form):
+        autocompleter = transaction_form._autocompleter
+        with (
+            patch.object(autocompleter, "_indexes", OrderedDict()),
+            patch("monopyly.common.forms.utils.AUTOCOMPLETE_INDEX_SIZE", 1),
+        ):
+            transaction_form.autocomplete("merchant")
+            with patch.object(autocompleter, "_build_suggestions") as mock_method:
+                suggestions = transaction_form.autocomplete("merchant", limit=1)
+                mock_method.assert_not_called()
+        assert suggestions == ["Boardwalk"]
+
+    def test_autocomplete_index_built_under_lock(self, transaction_form):
+        autocompleter = transaction_form._autocompleter
+
+        def build_suggestions(*args, **kwargs):
+            # Concurrent requests wait for the index rather than building it
+            assert autocompleter._lock.locked()
+            return ["Boardwalk"]
+
+        with (
+            patch.object(autocompleter, "_indexes", OrderedDict()),
+            patch.object(autocompleter, "_build_suggestions", build_suggestions),
+        ):
+            assert transaction_form.autocomplete("merchant") == ["Boardwalk"]
+
+    def test_autocomplete_index_reused(self, transaction_form):
+        autocompleter = transaction_form._autocompleter
+        suggestions = transaction_form.autocomplete("merchant")
+        with patch.object(autocompleter, "_build_suggestions") as mock_method:
+            assert transaction_form.autocomplete("merchant") == suggestions
+            mock_method.assert_not_called()
+            # Writing data (changing the data version) requires a new index
+            CreditTransactionHandler.delete_entry(4)
+            mock_method.return_value = ["Boardwalk"]
+            assert transaction_form.autocomplete("merchant") == ["Boardwalk"]
+            mock_method.assert_called_once()
+        CreditTransactionHandler._db.session.rollback()
@@ -10,6 +10,7 @@ from dry_foundation.testing import transaction_lifetime
 from dry_foundation.testing.helpers import TestRoutes
 from flask import url_for
 
+from monopyly.banking.accounts import BankAccountHandler
 from monopyly.credit.transactions.activity.data import TransactionActivities
 
 
@@ -169,6 +170,14 @@ class TestCreditRoutes(TestRoutes):
         for id_ in (5, 6, 7):
             assert self.div_exists(id=f"transaction-{id_}")
 
+    def test_load_statement_details_summary_cached(self, authorization):
+        self.get_route("/statement/4")
+        # The statement summary is rendered from the fragment cache
+        with patch.object(BankAccountHandler, "get_accounts") as mock_method:
+            self.get_route("/statement/4")
+            mock_method.assert_not_called()
+        assert self.div_exists(id="statement-summary")
+
     @transaction_lifetime
     def test_update_statement_due_date(self, authorization):
         response = self.post_route("/_update_statement_due_date/5", json="07/06/2020")
@@ -287,6 +296,46 @@ class TestCreditRoutes(TestRoutes):
         assert self.div_exists(id="statement-summary")
         assert self.div_exists(class_="flash", string="ERROR")
 
+    @transaction_lifetime
+    def test_record_activities(self, client, client_context):
+        test_data = [
+            ["2020-05-30", 27.00, "The Water Works"],
+            ["2020-05-25", 12.34, "Test Merchant 1"],
+            ["2020-05-27", 50.00, "Test Merchant 2"],
+        ]
+        with client.session_transaction() as session:
+            session["reconciliation_info"] = (5, test_data)
+        self.post_route(
+            "/record_activities/5",
+            data={"activity": [json.dumps(row) for row in test_data[1:]]},
+            follow_redirects=True,
+        )
+        # Check the result of the POST request
+        assert self.page_heading_includes_substring("Statement Reconciliation")
+        assert self.div_exists(
+            class_="flash", string="Recorded 2 transactions from the activity file."
+        )
+        # The recorded activities no longer appear as unrecorded activities
+        activity_descriptions = [
+            tag.find(class_="text").text
+            for tag in self.soup.select("div.unrecorded-activity")
+        ]
+        assert "Test Merchant 1" not in activity_descriptions
+        assert "Test Merchant 2" not in activity_descriptions
+
+    @pytest.mark.parametrize(
+        "activity",
+        [
+            "not JSON",
+            json.dumps(["2020-05-40", 12.34, "Test Merchant"]),
+            json.dumps(["2020-05-25", "twelve", "Test Merchant"]),
+            json.dumps(["2020-05-25", 12.34]),
+        ],
+    )
+    def test_record_activities_invalid(self, authorization, activity):
+        response = self.post_route("/record_activities/5", data={"activity": activity})
+        assert response.status_code == 400
+
     def test_load_user_transactions(self, authorization):
         self.get_route("/transactions")
         assert self.page_heading_includes_substring("Credit Transactions")
@@ -354,6 +403,19 @@ class TestCreditRoutes(TestRoutes):
         dates = [_.text for _ in self.soup.find_all("span", "numeric-date")]
         assert sorted(dates, reverse=True) == dates
 
+    def test_update_transactions_display_not_conditional(self, authorization):
+        route = "/_update_transactions_display"
+        response = self.post_route(route, json={"card_ids": ["3"], "sort_order": "asc"})
+        # POST requests are always rendered (and never tagged for reuse)
+        assert response.get_etag() == (None, None)
+        response = self.post_route(
+            route,
+            json={"card_ids": ["3"], "sort_order": "asc"},
+            headers={"If-None-Match": "*"},
+        )
+        assert response.status_code == 200
+        assert self.div_exists(class_="transaction")
+
     def test_expand_transaction(self, authorization):
         self.post_route("/_expand_transaction", json="4")
         # 2 subtransactions in this transaction
@@ -618,6 +680,24 @@ class TestCreditRoutes(TestRoutes):
         # (for this test)
         assert sorted(json.loads(response.data)) == sorted(suggestions)
 
+    def test_suggest_transaction_autocomplete_prefix(self, authorization):
+        response = self.post_route(
+            "/_suggest_transaction_autocomplete",
+            json={"field": "tags", "prefix": "r", "limit": 2},
+        )
+        # Anchored matches precede contained matches (sorted by frequency)
+        suggestions = json.loads(response.data)
+        assert len(suggestions) == 2
+        assert suggestions[0] == "Railroad"
+
+    def test_suggest_transaction_autocomplete_invalid_limit(self, authorization):
+        response = self.post_route(
+            "/_suggest_transaction_autocomplete",
+            json={"field": "tags", "prefix": "r", "limit": "two"},
+        )
+        assert response.status_code == 200
+        assert json.loads(response.data)[0] == "Railroad"
+
     def test_suggest_transaction_note_autocomplete(self, authorization):
         response = self.post_route(
             "/_suggest_transaction_autocomplete",
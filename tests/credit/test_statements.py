@@ -1,13 +1,14 @@
 """Tests for the credit module managing credit card statements."""
 
 from datetime import date
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 from dry_foundation.testing.helpers import TestHandler
 from sqlalchemy.exc import StatementError
+from werkzeug.exceptions import NotFound
 
-from monopyly.credit.statements import CreditStatementHandler
+from monopyly.credit.statements import CreditStatementHandler, StatementCalendar
 from monopyly.database.models import (
     CreditStatement,
     CreditStatementView,
@@ -126,6 +127,27 @@ class TestCreditStatementHandler(TestHandler):
         statement = statement_handler.find_statement(card_id, issue_date)
         assert statement is None
 
+    @pytest.mark.parametrize(
+        ("card_id", "issue_date", "expected_statement_id"),
+        [
+            (3, date(2020, 5, 10), 4),
+            (4, date(2020, 5, 6), 6),
+            (3, None, 5),
+            (3, date(2020, 12, 1), None),
+            (1, None, None),  # -- should fail, invalid user
+        ],
+    )
+    def test_find_statement_identity(
+        self, statement_handler, card_id, issue_date, expected_statement_id
+    ):
+        statement = statement_handler.find_statement_identity(card_id, issue_date)
+        if expected_statement_id is None:
+            assert statement is None
+        else:
+            assert isinstance(statement, CreditStatement)
+            assert statement.id == expected_statement_id
+            assert statement.card_id == card_id
+
     @pytest.mark.parametrize(
         (
             "card_id",
@@ -167,6 +189,70 @@ class TestCreditStatementHandler(TestHandler):
         else:
             assert statement.id == inferred_statement_id
 
+    @pytest.mark.parametrize(
+        ("creation", "inferred_statement_ids"),
+        [(True, [5, 5, 8]), (False, [5, 5, None])],
+    )
+    def test_infer_statements(
+        self, statement_handler, creation, inferred_statement_ids
+    ):
+        # Mock the inputs required for inference
+        mock_card = Mock()
+        mock_card.id = 3
+        mock_card.account.statement_issue_day = 10
+        mock_card.account.statement_due_day = 5
+        transaction_dates = [date(2020, 5, 20), date(2020, 6, 5), date(2020, 6, 20)]
+        # Test that the inference action produces the expected behavior
+        statements = statement_handler.infer_statements(
+            mock_card, transaction_dates, creation=creation
+        )
+        statement_ids = [
+            getattr(statements[transaction_date], "id", None)
+            for transaction_date in transaction_dates
+        ]
+        assert statement_ids == inferred_statement_ids
+
+    def test_infer_statements_invalid_user(self, statement_handler):
+        mock_card = Mock()
+        mock_card.id = 1
+        mock_card.account.statement_issue_day = 1
+        mock_card.account.statement_due_day = 20
+        # Ensure that 'mr.monopyly' cannot add statements for the test user
+        with pytest.raises(NotFound):
+            statement_handler.infer_statements(
+                mock_card, [date(2020, 8, 5)], creation=True
+            )
+        self.assert_number_of_matches(
+            0, CreditStatement.id, CreditStatement.issue_date == date(2020, 9, 1)
+        )
+
+    def test_get_statement_calendar(self, statement_handler):
+        calendar = statement_handler.get_statement_calendar(3)
+        assert calendar.find_statement_id(date(2020, 5, 10)) == 4
+        # The calendar is reused until the database is written to
+        assert statement_handler.get_statement_calendar(3) is calendar
+        mock_card = Mock()
+        mock_card.id = 3
+        mock_card.account.statement_due_day = 5
+        statement_handler.add_statement(mock_card, date(2020, 7, 10))
+        calendar = statement_handler.get_statement_calendar(3)
+        assert calendar.find_statement_id(date(2020, 7, 10)) == 8
+        assert calendar.find_statement_id() == 8
+
+    def test_get_statement_calendar_queries(self, statement_handler):
+        statement_handler.get_statement_calendar(3)
+        session = statement_handler._db.session
+        with (
+            patch.object(session, "execute", wraps=session.execute) as mock_execute,
+            patch.object(session, "scalar", wraps=session.scalar) as mock_scalar,
+        ):
+            # Cached calendars are found without any queries
+            statement_handler.get_statement_calendar(3)
+            mock_execute.assert_not_called()
+            # The data version is not read again during the request
+            statement_handler.get_statement_calendar(4)
+            mock_scalar.assert_not_called()
+
     @pytest.mark.parametrize(("statement_id", "prior_statement_id"), [(5, 4), (7, 6)])
     def test_get_prior_statement(
         self, statement_handler, statement_id, prior_statement_id
@@ -175,6 +261,10 @@ class TestCreditStatementHandler(TestHandler):
         prior_statement = statement_handler.get_prior_statement(current_statement)
         assert prior_statement.id == prior_statement_id
 
+    def test_get_prior_statement_none_exist(self, statement_handler):
+        current_statement = statement_handler.get_entry(2)
+        assert statement_handler.get_prior_statement(current_statement) is None
+
     @pytest.mark.parametrize(
         ("card_id", "statement_due_day", "issue_date", "due_date", "expected_due_date"),
         [
@@ -245,3 +335,30 @@ class TestCreditStatementHandler(TestHandler):
         self.assert_number_of_matches(
             0, CreditTransaction.id, CreditTransaction.statement_id == entry_id
         )
+
+
+class TestStatementCalendar:
+    statements = [
+        (date(2020, 4, 10), 2),
+        (date(2020, 5, 10), 4),
+        (date(2020, 6, 10), 5),
+    ]
+
+    @pytest.mark.parametrize(
+        ("issue_date", "expected_statement_id"),
+        [
+            (date(2020, 4, 10), 2),
+            (date(2020, 6, 10), 5),
+            (date(2020, 5, 9), None),
+            (date(2020, 7, 10), None),
+            (None, 5),
+        ],
+    )
+    def test_find_statement_id(self, issue_date, expected_statement_id):
+        calendar = StatementCalendar(3, self.statements)
+        assert calendar.find_statement_id(issue_date) == expected_statement_id
+
+    @pytest.mark.parametrize("issue_date", [date(2020, 5, 10), None])
+    def test_find_statement_id_empty(self, issue_date):
+        calendar = StatementCalendar(3, [])
+        assert calendar.find_statement_id(issue_date) is None
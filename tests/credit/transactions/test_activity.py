@@ -345,6 +345,20 @@ class TestActivityMatchFinders:
         matches = ExactMatchFinder.find(self.mock_transaction, mock_data)
         assert matches == expected_matches
 
+    def test_exact_match_finder_find_all(self):
+        mock_transaction = Mock(transaction_date=date(2000, 1, 1), total=0.1 + 0.2)
+        mock_data = TransactionActivities(
+            [[date(2000, 1, 1), 0.3, "Arcade"], *self.mock_activity[:3]]
+        )
+        # Exact matches are compared as integer numbers of cents
+        matches = ExactMatchFinder.find_all(
+            [self.mock_transaction, mock_transaction], mock_data
+        )
+        assert matches == {
+            self.mock_transaction: mock_data[1:2],
+            mock_transaction: mock_data[:1],
+        }
+
     def test_near_match_finder_initialization(self):
         mock_data = self.mock_activity
         # Near matches should have a date:
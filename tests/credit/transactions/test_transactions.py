@@ -8,6 +8,7 @@ from dry_foundation.testing.helpers import TestHandler
 from sqlalchemy.exc import IntegrityError
 from werkzeug.exceptions import NotFound
 
+from monopyly.common.transactions import categorize
 from monopyly.credit.transactions import (
     CreditTagHandler,
     CreditTransactionHandler,
@@ -61,6 +62,14 @@ def mock_tags():
     return mock_tags
 
 
+def _flatten(tree, path=()):
+    # Map each category path in a category tree to its subtotal and count
+    flat_tree = {path: (tree.subtotal, tree.count)}
+    for name, subcategory in tree.subcategories.items():
+        flat_tree.update(_flatten(subcategory, (*path, name)))
+    return flat_tree
+
+
 class TestCreditTransactionHandler(TestHandler):
     # References only include entries accessible to the authorized login
     #   - ordered by date (most recent first)
@@ -229,6 +238,33 @@ class TestCreditTransactionHandler(TestHandler):
         merchants = transaction_handler.get_merchants()
         assert sorted(merchants) == sorted({_.merchant for _ in self.db_reference})
 
+    @pytest.mark.parametrize(
+        ("statement_ids", "card_ids", "start_date", "end_date"),
+        [
+            (None, None, None, None),
+            ([7], None, None, None),
+            ([4, 5], None, None, None),
+            (None, [3], None, None),
+            (None, None, date(2020, 5, 1), date(2020, 5, 31)),
+        ],
+    )
+    def test_aggregate_categories(
+        self, transaction_handler, statement_ids, card_ids, start_date, end_date
+    ):
+        categories = transaction_handler.aggregate_categories(
+            statement_ids, card_ids, start_date=start_date, end_date=end_date
+        )
+        # Aggregated categories should match those from categorizing transactions
+        transactions = [
+            transaction
+            for transaction in transaction_handler.get_transactions(
+                statement_ids, card_ids
+            )
+            if (start_date is None or transaction.transaction_date >= start_date)
+            and (end_date is None or transaction.transaction_date <= end_date)
+        ]
+        assert _flatten(categories) == _flatten(categorize(transactions))
+
     @pytest.mark.parametrize(
         "mapping",
         [
@@ -303,6 +339,71 @@ class TestCreditTransactionHandler(TestHandler):
         with pytest.raises(exception):
             transaction_handler.add_entry(**mapping)
 
+    def test_bulk_add_entries(self, transaction_handler):
+        mappings = [
+            {
+                "statement_id": 4,
+                "transaction_date": date(2020, 5, 3),
+                "merchant": "Baltic Avenue",
+                "subtransactions": [
+                    {"subtotal": 60.00, "note": "Rent", "tags": []},
+                ],
+            },
+            {
+                "statement_id": 5,
+                "transaction_date": date(2020, 5, 20),
+                "merchant": "Reading Railroad",
+                "subtransactions": [
+                    {"subtotal": 25.00, "note": "Ticket", "tags": ["Railroad"]},
+                    {"subtotal": 5.00, "note": "Parking", "tags": ["Parking"]},
+                ],
+            },
+        ]
+        transaction_ids = transaction_handler.bulk_add_entries(mappings)
+        assert transaction_ids == [14, 15]
+        # Check that the entries were added to the database
+        transactions = [transaction_handler.get_entry(_) for _ in transaction_ids]
+        assert [_.merchant for _ in transactions] == [
+            "Baltic Avenue",
+            "Reading Railroad",
+        ]
+        assert [_.total for _ in transactions] == [60.00, 30.00]
+        ticket_subtransaction = transactions[1].subtransactions[0]
+        tag_names = sorted(tag.tag_name for tag in ticket_subtransaction.tags)
+        assert tag_names == ["Railroad", "Transportation"]
+
+    def test_bulk_add_entries_empty(self, transaction_handler):
+        assert transaction_handler.bulk_add_entries([]) == []
+
+    @pytest.mark.parametrize(
+        ("mapping", "exception"),
+        [
+            (  # Wrong statement user
+                {
+                    "statement_id": 1,
+                    "transaction_date": date(2020, 5, 3),
+                    "merchant": "Baltic Avenue",
+                    "subtransactions": [{"subtotal": 60.00, "note": "Rent"}],
+                },
+                NotFound,
+            ),
+            (  # Nonexistent tag
+                {
+                    "statement_id": 4,
+                    "transaction_date": date(2020, 5, 3),
+                    "merchant": "Baltic Avenue",
+                    "subtransactions": [
+                        {"subtotal": 60.00, "note": "Rent", "tags": ["Housing"]}
+                    ],
+                },
+                ValueError,
+            ),
+        ],
+    )
+    def test_bulk_add_entries_invalid(self, transaction_handler, mapping, exception):
+        with pytest.raises(exception):
+            transaction_handler.bulk_add_entries([mapping])
+
     @pytest.mark.parametrize(
         "mapping",
         [
@@ -338,6 +439,44 @@ class TestCreditTransactionHandler(TestHandler):
             CreditTransaction.transaction_date == date(2022, 5, 3),
         )
 
+    @pytest.mark.parametrize(
+        ("transaction_id", "subtransactions_data", "expected_subtransactions"),
+        [
+            (  # Edit a note and replace tags; remove a surplus subtransaction
+                4,
+                [{"subtotal": 30.00, "note": "One for the park!", "tags": ["Gifts"]}],
+                [(4, 30.00, "One for the park!", {"Gifts"})],
+            ),
+            (  # Edit a subtotal (keeping a subset of tags); add a subtransaction
+                5,
+                [
+                    {"subtotal": 98.00, "note": "Electric bill", "tags": ["Utilities"]},
+                    {"subtotal": 1.00, "note": "Late fee", "tags": []},
+                ],
+                [
+                    (6, 98.00, "Electric bill", {"Utilities"}),
+                    (14, 1.00, "Late fee", set()),
+                ],
+            ),
+        ],
+    )
+    def test_update_entry_subtransactions(
+        self,
+        transaction_handler,
+        transaction_id,
+        subtransactions_data,
+        expected_subtransactions,
+    ):
+        transaction = transaction_handler.update_entry(
+            transaction_id, subtransactions=subtransactions_data
+        )
+        # Check that existing subtransactions were updated in place
+        subtransactions = sorted(transaction.subtransactions, key=lambda _: _.id)
+        assert [
+            (_.id, _.subtotal, _.note, {tag.tag_name for tag in _.tags})
+            for _ in subtransactions
+        ] == expected_subtransactions
+
     @pytest.mark.parametrize(
         ("transaction_id", "mapping", "exception"),
         [
@@ -424,6 +563,7 @@ class TestSaveFormFunctions:
         # Mock the form and primary method
         mock_form.transaction_data = {"key": "test transaction data"}
         mock_method = mock_handler.add_entry
+        mock_handler.find_duplicate.return_value = None
         # Call the function and check for proper call signatures
         transaction = save_transaction(mock_form)
         mock_method.assert_called_once_with(**mock_form.transaction_data)
@@ -53,14 +53,14 @@ VALUES (NULL, 1, '2020-05-04', 'Test Merchant'),     -- 'Test Bank' savings tran
 INSERT INTO bank_subtransactions
       (transaction_id, subtotal, note)
 VALUES
-      (1, 100.00, 'Test bank transaction'),
-      (2, 42.00, 'Jail subtransaction 1'),
-      (2, 43.00, 'Jail subtransaction 2'),
-      (3, 300.00, 'Transfer in'),
-      (4, 58.90, 'What else is there to do in Jail?'),
-      (5, -109.21, 'Credit card payment'),
-      (6, -300.00, 'Transfer out'),
-      (7, 200.00, '''Go'' Corner ATM deposit');
+      (1, 10000, 'Test bank transaction'),
+      (2, 4200, 'Jail subtransaction 1'),
+      (2, 4300, 'Jail subtransaction 2'),
+      (3, 30000, 'Transfer in'),
+      (4, 5890, 'What else is there to do in Jail?'),
+      (5, -10921, 'Credit card payment'),
+      (6, -30000, 'Transfer out'),
+      (7, 20000, '''Go'' Corner ATM deposit');
 
 INSERT INTO bank_tag_links
        (subtransaction_id, tag_id)
@@ -110,19 +110,19 @@ VALUES (NULL, 1, '2020-04-20', 'Test Merchant'),
 
 INSERT INTO credit_subtransactions
        (transaction_id, subtotal, note)
-VALUES (1, 100.00, 'Test credit transaction'),
-       (2, 1.00, 'Parking (thought it was free)'),
-       (3, 43.21, 'Merry-go-round'),
-       (4, 30.00, 'One for the park'),
-       (4, 35.00, 'One for the place'),
-       (5, 99.00, 'Electric bill'),
-       (6, 6500.00, 'Expensive real estate'),
-       (7, -109.21, 'Credit card payment'),
-       (8, 26.87, 'Tough loss'),
-       (9, 1600.00, 'Big house tour'),
-       (10, -1230.00, 'Refund'),
-       (11, 253.99, 'Conducting business'),
-       (12, 12.34, 'Back for more...');
+VALUES (1, 10000, 'Test credit transaction'),
+       (2, 100, 'Parking (thought it was free)'),
+       (3, 4321, 'Merry-go-round'),
+       (4, 3000, 'One for the park'),
+       (4, 3500, 'One for the place'),
+       (5, 9900, 'Electric bill'),
+       (6, 650000, 'Expensive real estate'),
+       (7, -10921, 'Credit card payment'),
+       (8, 2687, 'Tough loss'),
+       (9, 160000, 'Big house tour'),
+       (10, -123000, 'Refund'),
+       (11, 25399, 'Conducting business'),
+       (12, 1234, 'Back for more...');
 
 INSERT INTO credit_tag_links
        (subtransaction_id, tag_id)
@@ -0,0 +1,59 @@
+"""Tests for the database handlers used by the app."""
+
+from unittest.mock import patch
+
+import pytest
+from flask import g
+from werkzeug.exceptions import NotFound
+
+from monopyly.banking.accounts import BankAccountHandler
+from monopyly.banking.banks import BankHandler
+from monopyly.database.handler import EntryMap, get_entry_map
+
+
+@pytest.fixture
+def entry_map(client_context):
+    g.entry_map = EntryMap()
+    return g.entry_map
+
+
+class TestEntryMap:
+    def test_get_entry_map(self, entry_map):
+        assert get_entry_map() is entry_map
+
+    def test_get_entry_reused(self, entry_map):
+        with patch.object(BankHandler, "_execute_query") as mock_method:
+            mock_method.return_value.scalar_one.return_value = "Jail"
+            assert BankHandler.get_entry(2) == "Jail"
+            assert BankHandler.get_entry(2) == "Jail"
+        mock_method.assert_called_once()
+        assert (entry_map.hits, entry_map.misses) == (1, 1)
+
+    def test_get_entry_keyed_by_model(self, entry_map):
+        bank = BankHandler.get_entry(2)
+        account = BankAccountHandler.get_entry(2)
+        assert bank is not account
+        assert BankHandler.get_entry(2) is bank
+        assert (entry_map.hits, entry_map.misses) == (1, 2)
+
+    def test_get_entry_invalidated_by_write(self, entry_map):
+        BankHandler.get_entry(2)
+        # The update reuses the entry, but the write requires it to be refetched
+        BankHandler.update_entry(2, bank_name="Jail (Just Visiting)")
+        assert (entry_map.hits, entry_map.misses) == (1, 2)
+        # Rolling back the transaction also invalidates the entries
+        BankHandler._db.session.rollback()
+        assert BankHandler.get_entry(2).bank_name == "Jail"
+        assert (entry_map.hits, entry_map.misses) == (1, 3)
+
+    def test_get_entry_nonexistent(self, entry_map):
+        for _ in range(2):
+            with pytest.raises(NotFound):
+                BankHandler.get_entry(5)
+        assert entry_map.misses == 2
+
+    def test_get_entry_view(self, entry_map):
+        account = BankAccountHandler.get_entry(2)
+        assert isinstance(account, BankAccountHandler._model_view)
+        assert BankAccountHandler.get_entry(2) is account
+        assert (entry_map.hits, entry_map.misses) == (1, 1)
@@ -0,0 +1,35 @@
+"""Tests for the database interface."""
+
+from unittest.mock import Mock, patch
+
+from sqlalchemy import update
+
+from monopyly.database.models import Bank
+
+
+def test_cache_until_write(app):
+    db = app.db
+    compute = Mock(side_effect=[1, 2, 3])
+    with app.app_context():
+        assert db.cache_until_write("key", compute) == 1
+        assert db.cache_until_write("key", compute) == 1
+        # Cached values are cleared when data is written...
+        db.session.execute(update(Bank).where(Bank.id == 1).values(bank_name="Jail"))
+        assert db.cache_until_write("key", compute) == 2
+        # ...and again once the write is rolled back
+        db.session.rollback()
+        assert db.cache_until_write("key", compute) == 3
+        assert db.cache_until_write("key", compute) == 3
+
+
+def test_cache_until_write_bounded(app):
+    db = app.db
+    compute = Mock(side_effect=[1, 2, 3, 4])
+    with app.app_context(), patch.object(db, "write_cache_size", 2):
+        assert db.cache_until_write("key1", compute) == 1
+        assert db.cache_until_write("key2", compute) == 2
+        # Using a value keeps it cached, discarding the least recently used value
+        assert db.cache_until_write("key1", compute) == 1
+        assert db.cache_until_write("key3", compute) == 3
+        assert db.cache_until_write("key1", compute) == 1
+        assert db.cache_until_write("key2", compute) == 4
@@ -0,0 +1,116 @@
+"""Tests for the database migration tools."""
+
+import re
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from monopyly.database.migrations import (
+    get_migrations,
+    get_schema_version,
+    migrate_database,
+)
+
+TEST_DIR = Path(__file__).parents[1]
+SQL_DIR = TEST_DIR.parent / "monopyly" / "database"
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    # Build a database using the original schema (with floating point subtotals)
+    schema = (SQL_DIR / "schema.sql").read_text()
+    schema = schema.replace(
+        "subtotal INTEGER NOT NULL, -- cents", "subtotal REAL NOT NULL,"
+    )
+    schema = schema.replace("PRAGMA user_version = 8;", "")
+    # Remove transaction content hashes (and their indexes)
+    schema = re.sub(r",\n  content_hash TEXT[^\n]*", "", schema)
+    schema = re.sub(r"CREATE INDEX [^;]*;", "", schema)
+    # Remove the full-text search index (and its triggers)
+    schema = re.sub(r"CREATE VIRTUAL TABLE [^;]*;", "", schema)
+    schema = re.sub(r"CREATE TRIGGER .*?END;", "", schema, flags=re.DOTALL)
+    conn = sqlite3.connect(tmp_path / "legacy.sqlite")
+    conn.execute("PRAGMA foreign_keys = ON")
+    for script in (
+        schema,
+        (SQL_DIR / "views.sql").read_text(),
+        (SQL_DIR / "preloads.sql").read_text(),
+        (TEST_DIR / "data.sql").read_text(),
+        "DROP TABLE spending_rollups; DROP TABLE data_versions;",
+        "UPDATE bank_subtransactions SET subtotal = subtotal / 100.0;"
+        "UPDATE credit_subtransactions SET subtotal = subtotal / 100.0;",
+    ):
+        conn.executescript(script)
+    yield conn
+    conn.close()
+
+
+def test_get_migrations():
+    versions = [version for version, _ in get_migrations()]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+def test_schema_version(app):
+    # New databases should be initialized with the latest schema version
+    raw_conn = app.db.engine.raw_connection()
+    try:
+        assert get_schema_version(raw_conn) == get_migrations()[-1][0]
+    finally:
+        raw_conn.close()
+
+
+def test_schema_reinitialized(tmp_path):
+    # Initializing an existing database starts from an empty schema
+    schema = (SQL_DIR / "schema.sql").read_text()
+    conn = sqlite3.connect(tmp_path / "test.sqlite")
+    conn.executescript(schema)
+    conn.execute("INSERT INTO data_versions (user_id, version) VALUES (1, 1)")
+    conn.commit()
+    conn.executescript(schema)
+    assert conn.execute("SELECT * FROM data_versions").fetchall() == []
+    conn.close()
+
+
+def test_migrate_database(legacy_db):
+    tag_link_query = "SELECT COUNT(*) FROM credit_tag_links"
+    tag_link_count = legacy_db.execute(tag_link_query).fetchone()[0]
+    balance_query = "SELECT balance FROM bank_accounts_view WHERE id = 2"
+    balance = legacy_db.execute(balance_query).fetchone()[0]
+    assert migrate_database(legacy_db) == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert get_schema_version(legacy_db) == 8
+    # Subtotals are now stored as integer numbers of cents
+    subtotals = legacy_db.execute(
+        "SELECT subtotal, typeof(subtotal) FROM credit_subtransactions WHERE id = 7"
+    ).fetchone()
+    assert subtotals == (650000, "integer")
+    # Dependent rows are preserved and views are recreated
+    assert legacy_db.execute(tag_link_query).fetchone()[0] == tag_link_count
+    assert legacy_db.execute(balance_query).fetchone()[0] == round(balance * 100)
+    assert legacy_db.execute("PRAGMA foreign_key_check").fetchall() == []
+    # Spending rollups are populated from the existing transactions
+    assert legacy_db.execute("SELECT COUNT(*) FROM spending_rollups").fetchone()[0]
+    # Transactions have (indexed) content hashes
+    query_plan = legacy_db.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM bank_transactions WHERE content_hash = ''"
+    ).fetchall()
+    assert "bank_transactions_content_hash" in query_plan[0][-1]
+    # Transactions are indexed for full-text search
+    search_query = (
+        "SELECT rowid FROM transaction_search WHERE transaction_search MATCH 'park*'"
+    )
+    assert legacy_db.execute(search_query).fetchall() == [(5,), (9,)]
+    # Statements are indexed by card and issue date
+    query_plan = legacy_db.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM credit_statements WHERE card_id = 3 "
+        "ORDER BY issue_date"
+    ).fetchall()
+    assert "credit_statements_card_id_issue_date" in query_plan[0][-1]
+    # Migrating again does nothing
+    assert migrate_database(legacy_db) == []
+
+
+def test_migrate_db_command(app):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["migrate-db"])
+    assert result.exit_code == 0